@@ -5,11 +5,31 @@ import psutil # type: ignore
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 from pathlib import Path
-from pypresence import Presence # type: ignore
 import subprocess
 import shutil
 import json
 import hashlib
+import threading
+import multiprocessing
+import queue
+import socket
+import gc
+from presence_templates import PresenceTemplates, format_elapsed
+from als_metadata import get_metadata
+from checkpoint import save_checkpoint, load_checkpoint, clear_checkpoint
+from project_index import ProjectIndex, update_index
+from handoff import HandoffServer, fetch_state, request_exit, ping, wait_for_owner
+from fauxmidi_template import render_midi_script
+from latency_trace import LatencyTracer
+from log_tail import LEVELS, LogView, line_level
+from discord_ipc import BACKENDS, create_presence
+from leader import LeaderElection
+from relay import DEFAULT_PORT, RelayAggregator
+from state_sources import create_source
+from state_protocol import StateDecoder
+from sinks import DiscordSink, OverlaySink, RelaySink, SinkPipeline, load_sink
+from governor import POLICIES, ResourceGovernor
+from deploy import deploy_all, format_report, remote_scripts_dir, write_if_changed
 
 # --- GLOBAL SETTINGS ---
 DEFAULT_CLIENT_ID = "1283406074824753203" 
@@ -17,13 +37,29 @@ HOME = os.environ.get("HOME", str(Path.home()))
 CONFIG_DIR = Path(HOME) / ".config" / "ableton-discord-rpc"
 INSTALLS_CONFIG = CONFIG_DIR / "installations.json"
 LAUNCH_AGENTS_DIR = Path(HOME) / "Library" / "LaunchAgents"
+HEARTBEAT_STALE = 5     # seconds without a FauxMIDI heartbeat before checking the process table
+HANG_THRESHOLD = 15     # seconds without a heartbeat while Live's process is still up
+MAX_LOG_VIEW_LINES = 5000  # lines kept in the log panel while following
 
 class AbletonInstallation:
-    def __init__(self, name, ableton_path, log_path, client_id=None):
+    def __init__(self, name, ableton_path, log_path, client_id=None, templates=None, rpc_backend=None,
+                 overlay_port=None, source=None, sinks=None, budget=None):
         self.name = name
         self.ableton_path = ableton_path
         self.log_path = log_path
         self.client_id = client_id or DEFAULT_CLIENT_ID
+        # User overrides for details/state/large_text/small_image, compiled once here
+        self.templates = templates or {}
+        self.presence_templates = PresenceTemplates(self.templates)
+        # "pypresence" or "builtin" (discord_ipc.DiscordIPC)
+        self.rpc_backend = rpc_backend if rpc_backend in BACKENDS else "pypresence"
+        # Port for the localhost overlay endpoint (SSE/WebSocket); None keeps it off
+        self.overlay_port = overlay_port
+        # Where state lines come from ({"type": "file"|"socket"|"simulator"}) and extra outputs
+        self.source = source or {}
+        self.sinks = sinks or []
+        # Daemon CPU/RSS budget, e.g. {"cpu_percent": 1.0, "rss_mb": 150}; None uses the defaults
+        self.budget = budget
         
         # Generate unique identifiers
         self.install_hash = hashlib.md5(ableton_path.encode()).hexdigest()[:8]
@@ -37,12 +73,20 @@ class AbletonInstallation:
             'log_path': self.log_path,
             'client_id': self.client_id,
             'install_hash': self.install_hash,
-            'service_name': self.service_name
+            'service_name': self.service_name,
+            'templates': self.templates,
+            'rpc_backend': self.rpc_backend,
+            'overlay_port': self.overlay_port,
+            'source': self.source,
+            'sinks': self.sinks,
+            'budget': self.budget
         }
     
     @classmethod
     def from_dict(cls, data):
-        install = cls(data['name'], data['ableton_path'], data['log_path'], data['client_id'])
+        install = cls(data['name'], data['ableton_path'], data['log_path'], data['client_id'],
+                      data.get('templates'), data.get('rpc_backend'), data.get('overlay_port'),
+                      data.get('source'), data.get('sinks'), data.get('budget'))
         install.install_hash = data['install_hash']
         install.service_name = data['service_name']
         install.plist_path = LAUNCH_AGENTS_DIR / f"{install.service_name}.plist"
@@ -51,6 +95,9 @@ class AbletonInstallation:
 class MultiAbletonRPCManager:
     def __init__(self):
         self.installations = {}
+        self.project_roots = []
+        # {"role": "sender"|"aggregator", "host", "port", "machine", "token", "bind"} - see run_relay_aggregator
+        self.relay = {}
         self.load_installations()
     
     def load_installations(self):
@@ -62,6 +109,8 @@ class MultiAbletonRPCManager:
                     for install_data in data.get('installations', []):
                         install = AbletonInstallation.from_dict(install_data)
                         self.installations[install.install_hash] = install
+                    self.project_roots = data.get('project_roots', [])
+                    self.relay = data.get('relay', {})
             except Exception as e:
                 print(f"Warning: Could not load installations config: {e}")
     
@@ -69,7 +118,9 @@ class MultiAbletonRPCManager:
         """Save all installations to config"""
         CONFIG_DIR.mkdir(parents=True, exist_ok=True)
         data = {
-            'installations': [install.to_dict() for install in self.installations.values()]
+            'installations': [install.to_dict() for install in self.installations.values()],
+            'project_roots': self.project_roots,
+            'relay': self.relay
         }
         with open(INSTALLS_CONFIG, 'w') as f:
             json.dump(data, f, indent=2)
@@ -93,6 +144,20 @@ class MultiAbletonRPCManager:
             return True
         return False
     
+    def add_project_root(self, root):
+        """Remember a folder to include in the project library index"""
+        if root and root not in self.project_roots:
+            self.project_roots.append(root)
+            self.save_installations()
+
+    def index_projects(self, roots=None):
+        """Index every .als under the project roots (parallel, skips unchanged files)"""
+        roots = roots or self.project_roots
+        if not roots:
+            print("⚠️  No project folders configured")
+            return None
+        return update_index(roots)
+
     def get_running_ableton_versions(self):
         """Detect which Ableton versions are currently running"""
         running_versions = []
@@ -121,242 +186,50 @@ class MultiAbletonRPCManager:
         if not installation.ableton_path or not installation.log_path:
             return False
         
-        base_path = Path(installation.ableton_path) / "Contents" / "App-Resources" / "MIDI Remote Scripts"
-        faux_midi_dir = base_path / "FauxMIDI"
-        
-        # Enhanced MIDI script template (same as before but with installation-specific logging)
-        init_py_template = """import Live
-import os
-import traceback
-import threading
-import time
-from _Framework.ControlSurface import ControlSurface
-
-def create_instance(c_instance):
-    return FauxMIDI(c_instance)
-
-class FauxMIDI(ControlSurface):
-    def __init__(self, c_instance):
-        super(FauxMIDI, self).__init__(c_instance)
-        self.log_file_path = {LOG_PATH_PLACEHOLDER}
-        self.debug_log_path = self.log_file_path + ".debug"
-        self.installation_name = {INSTALL_NAME_PLACEHOLDER}
-        self.last_project_name = None
-        self.name_check_counter = 0
-        
-        try:
-            self._debug_log(f"FauxMIDI initializing for {self.installation_name}...")
-            self.song = Live.Application.get_application().get_document()
-            self._setup_listeners()
-            self._debug_log("Listeners setup complete")
-            
-            # Start background name monitoring thread
-            self._start_name_monitor()
-            
-            self.log_state()  # Initial state log
-            self._debug_log("Initial state logged successfully")
-        except Exception as e:
-            self._debug_log(f"Initialization error: {e}")
-            self._debug_log(traceback.format_exc())
-
-    def _debug_log(self, message):
-        try:
-            import datetime
-            timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            os.makedirs(os.path.dirname(self.debug_log_path), exist_ok=True)
-            with open(self.debug_log_path, "a", encoding="utf-8") as f:
-                f.write(f"[{timestamp}] [{self.installation_name}] {message}\\n")
-                f.flush()
-                os.fsync(f.fileno())
-        except:
-            pass
-
-    def _start_name_monitor(self):
-        def name_monitor():
-            while True:
-                try:
-                    time.sleep(2)
-                    current_name = self._get_enhanced_project_name()
-                    if current_name != self.last_project_name:
-                        self._debug_log(f"Project name changed: '{self.last_project_name}' -> '{current_name}'")
-                        self.last_project_name = current_name
-                        self.log_state()
-                except Exception as e:
-                    self._debug_log(f"Name monitor error: {e}")
-                    time.sleep(5)
-        
-        monitor_thread = threading.Thread(target=name_monitor, daemon=True)
-        monitor_thread.start()
-        self._debug_log("Background name monitor started")
-
-    def _get_enhanced_project_name(self):
-        try:
-            # Method 1: Direct song.name
-            raw_name = getattr(self.song, 'name', None)
-            if raw_name and raw_name.strip():
-                name = raw_name[:-4] if raw_name.endswith('.als') else raw_name
-                if name and name != "":
-                    return name
-            
-            # Method 2: Check canonical_parent
-            try:
-                app = Live.Application.get_application()
-                if hasattr(app, 'get_document') and hasattr(app.get_document(), 'canonical_parent'):
-                    doc = app.get_document()
-                    if hasattr(doc, 'canonical_parent') and doc.canonical_parent:
-                        parent_path = str(doc.canonical_parent)
-                        if parent_path and parent_path != "":
-                            filename = os.path.basename(parent_path)
-                            if filename.endswith('.als'):
-                                name = filename[:-4]
-                                return name
-            except Exception as e:
-                self._debug_log(f"Method 2 failed: {e}")
-            
-            # Method 3: Check file_path
-            try:
-                if hasattr(self.song, 'file_path'):
-                    file_path = getattr(self.song, 'file_path', None)
-                    if file_path:
-                        filename = os.path.basename(file_path)
-                        if filename.endswith('.als'):
-                            name = filename[:-4]
-                            return name
-            except Exception as e:
-                self._debug_log(f"Method 3 failed: {e}")
-            
-            # Method 4: Delayed check
-            self.name_check_counter += 1
-            if self.name_check_counter % 5 == 0:
-                raw_name_delayed = getattr(self.song, 'name', None)
-                if raw_name_delayed and raw_name_delayed.strip() and raw_name_delayed != raw_name:
-                    name = raw_name_delayed[:-4] if raw_name_delayed.endswith('.als') else raw_name_delayed
-                    return name
-            
-            return "Unsaved Project"
-            
-        except Exception as e:
-            self._debug_log(f"Enhanced name detection error: {e}")
-            return "Unsaved Project"
-
-    def _setup_listeners(self):
-        try:
-            if hasattr(self.song, 'name_has_listener') and not self.song.name_has_listener(self.log_state):
-                self.song.add_name_listener(self.log_state)
-            if hasattr(self.song, 'tempo_has_listener') and not self.song.tempo_has_listener(self.log_state):
-                self.song.add_tempo_listener(self.log_state)
-            if hasattr(self.song, 'is_playing_has_listener') and not self.song.is_playing_has_listener(self.log_state):
-                self.song.add_is_playing_listener(self.log_state)
-            if hasattr(self.song, 'record_mode_has_listener') and not self.song.record_mode_has_listener(self.log_state):
-                self.song.add_record_mode_listener(self.log_state)
-                
-            try:
-                app = Live.Application.get_application()
-                if hasattr(app, 'add_document_listener'):
-                    app.add_document_listener(self.log_state)
-            except Exception as e:
-                self._debug_log(f"Could not add document listener: {e}")
-                
-        except Exception as e:
-            self._debug_log(f"Listener setup error: {e}")
-
-    def log_state(self):
-        try:
-            project = self._get_enhanced_project_name()
-            tempo = int(getattr(self.song, 'tempo', 120))
-            is_playing = getattr(self.song, 'is_playing', False)
-            record_mode = getattr(self.song, 'record_mode', False)
-            
-            state = "Recording" if record_mode else ("Playing" if is_playing else "Stopped")
-            
-            os.makedirs(os.path.dirname(self.log_file_path), exist_ok=True)
-            
-            with open(self.log_file_path, "w", encoding="utf-8") as f:
-                f.write(f"PROJECT:{project}\\n")
-                f.write(f"TEMPO:{tempo}\\n")
-                f.write(f"STATE:{state}\\n")
-                f.write(f"INSTALLATION:{self.installation_name}\\n")
-                f.flush()
-                os.fsync(f.fileno())
-                
-        except Exception as e:
-            self._debug_log(f"log_state error: {e}")
-            try:
-                os.makedirs(os.path.dirname(self.log_file_path), exist_ok=True)
-                with open(self.log_file_path, "w", encoding="utf-8") as f:
-                    f.write(f"PROJECT:Error - {str(e)}\\n")
-                    f.write("TEMPO:120\\n")
-                    f.write("STATE:Error\\n")
-                    f.write(f"INSTALLATION:{self.installation_name}\\n")
-                    f.flush()
-            except:
-                pass
-
-    def disconnect(self):
-        try:
-            self._debug_log("FauxMIDI disconnecting...")
-            if hasattr(self, 'song') and self.song:
-                try:
-                    if hasattr(self.song, 'remove_name_listener'):
-                        self.song.remove_name_listener(self.log_state)
-                except: pass
-                try:
-                    if hasattr(self.song, 'remove_tempo_listener'):
-                        self.song.remove_tempo_listener(self.log_state)
-                except: pass
-                try:
-                    if hasattr(self.song, 'remove_is_playing_listener'):
-                        self.song.remove_is_playing_listener(self.log_state)
-                except: pass
-                try:
-                    if hasattr(self.song, 'remove_record_mode_listener'):
-                        self.song.remove_record_mode_listener(self.log_state)
-                except: pass
-                
-                try:
-                    app = Live.Application.get_application()
-                    if hasattr(app, 'remove_document_listener'):
-                        app.remove_document_listener(self.log_state)
-                except: pass
-                
-        except Exception as e:
-            self._debug_log(f"Disconnect error: {e}")
-        
-        super(FauxMIDI, self).disconnect()
-"""
+        faux_midi_dir = remote_scripts_dir(installation.ableton_path) / "FauxMIDI"
         
-        # Replace placeholders with installation-specific values
-        final_script = init_py_template.replace("{LOG_PATH_PLACEHOLDER}", repr(str(installation.log_path)))
-        final_script = final_script.replace("{INSTALL_NAME_PLACEHOLDER}", repr(installation.name))
+        # Installation-specific script (see fauxmidi_template.py)
+        final_script = render_midi_script(installation.log_path, installation.name)
 
         try:
-            faux_midi_dir.mkdir(parents=True, exist_ok=True)
-            with open(faux_midi_dir / "__init__.py", "w", encoding="utf-8") as f:
-                f.write(final_script)
-            print(f"✅ MIDI script installed for {installation.name}: {faux_midi_dir}")
+            if write_if_changed(faux_midi_dir / "__init__.py", final_script):
+                print(f"✅ MIDI script installed for {installation.name}: {faux_midi_dir}")
+            else:
+                print(f"✅ MIDI script already up to date for {installation.name}")
             return True
         except Exception as e:
             print(f"❌ Failed to install MIDI script for {installation.name}: {e}")
             return False
     
-    def install_launch_agent(self, installation):
-        """Install launch agent for specific installation"""
+    def _program_args(self):
+        """How launchd should start the daemon from this copy of the app"""
         exe_path = sys.executable 
-        is_bundle = '.app/Contents/MacOS' in exe_path
-        
-        if is_bundle:
+        if '.app/Contents/MacOS' in exe_path:
             app_path = exe_path.split('.app/Contents/MacOS')[0] + '.app'
-            target_exe = app_path + '/Contents/MacOS/AbletonRPC'
-            subprocess.run(["xattr", "-rd", "com.apple.quarantine", app_path], capture_output=True)
-            subprocess.run(["chmod", "+x", target_exe], capture_output=True)
-            cmd_args = f"<string>{target_exe}</string><string>--daemon</string><string>{installation.install_hash}</string>"
-        else:
-            target_exe = exe_path
-            script_path = os.path.abspath(sys.argv[0])
-            cmd_args = f"<string>{target_exe}</string><string>{script_path}</string><string>--daemon</string><string>{installation.install_hash}</string>"
+            return app_path, [app_path + '/Contents/MacOS/AbletonRPC']
+        return None, [exe_path, os.path.abspath(sys.argv[0])]
+
+    @staticmethod
+    def _build_stamp(paths):
+        """Changes whenever the daemon's files do, so an app upgrade reloads an otherwise identical agent"""
+        digest = hashlib.sha256()
+        for path in paths:
+            try:
+                st = os.stat(path)
+                digest.update(f"{path}:{st.st_size}:{st.st_mtime_ns}".encode())
+            except OSError:
+                pass
+        return digest.hexdigest()[:12]
+
+    def render_launch_agent(self, installation):
+        """(plist text, program arguments) for an installation's launch agent"""
+        _, program_files = self._program_args()
+        program_args = program_files + ["--daemon", installation.install_hash]
+        cmd_args = "".join(f"<string>{arg}</string>" for arg in program_args)
 
         plist_content = f"""<?xml version="1.0" encoding="UTF-8"?>
 <!DOCTYPE plist PUBLIC "-//Apple//DTD PLIST 1.0//EN" "http://www.apple.com/DTDs/PropertyList-1.0.dtd">
+<!-- AbletonRPC build {self._build_stamp(program_files)} -->
 <plist version="1.0"><dict>
 <key>Label</key><string>{installation.service_name}</string>
 <key>ProgramArguments</key><array>{cmd_args}</array>
@@ -364,22 +237,68 @@ class FauxMIDI(ControlSurface):
 <key>StandardOutPath</key><string>{installation.log_path}.service.log</string>
 <key>StandardErrorPath</key><string>{installation.log_path}.service.error</string>
 </dict></plist>"""
-        
+        return plist_content, program_args
+
+    def apply_launch_agent(self, installation, program_args, changed):
+        """(Re)load a written plist; an unchanged one that launchd already has is left alone"""
+        if not changed and self.get_service_status(installation):
+            return "unchanged"
+        app_path, _ = self._program_args()
+        if app_path:
+            subprocess.run(["xattr", "-rd", "com.apple.quarantine", app_path], capture_output=True)
+            subprocess.run(["chmod", "+x", program_args[0]], capture_output=True)
+
+        # A running daemon hands its presence to a bridge process so the reload never blanks Discord
+        handoff_path = CONFIG_DIR / f"{installation.install_hash}.sock"
+        if ping(handoff_path):
+            self._spawn_handoff_bridge(installation, program_args, handoff_path)
+
+        uid = os.getuid()
+        domain = f"gui/{uid}"
+        subprocess.run(["launchctl", "bootout", domain, str(installation.plist_path)], capture_output=True)
+        subprocess.run(["launchctl", "bootstrap", domain, str(installation.plist_path)], capture_output=True)
+        return "reloaded" if changed else "loaded"
+
+    def install_launch_agent(self, installation):
+        """Install launch agent for specific installation"""
         try:
-            installation.plist_path.parent.mkdir(parents=True, exist_ok=True)
-            with open(installation.plist_path, "w") as f: 
-                f.write(plist_content)
-            
-            uid = os.getuid()
-            domain = f"gui/{uid}"
-            subprocess.run(["launchctl", "bootout", domain, str(installation.plist_path)], capture_output=True)
-            subprocess.run(["launchctl", "bootstrap", domain, str(installation.plist_path)], capture_output=True)
-            print(f"✅ Launch agent installed for {installation.name}: {installation.service_name}")
+            plist_content, program_args = self.render_launch_agent(installation)
+            changed = write_if_changed(installation.plist_path, plist_content)
+            result = self.apply_launch_agent(installation, program_args, changed)
+            print(f"✅ Launch agent {result} for {installation.name}: {installation.service_name}")
             return True
         except Exception as e:
             print(f"❌ Failed to install launch agent for {installation.name}: {e}")
             return False
+
+    def deploy(self, force=False, dry_run=False):
+        """Install or upgrade script and agent for every installation in parallel; per-installation reports"""
+        reports = deploy_all(
+            self.installations.values(),
+            lambda installation: render_midi_script(installation.log_path, installation.name),
+            self.render_launch_agent,
+            self.apply_launch_agent,
+            force=force,
+            dry_run=dry_run,
+        )
+        print(format_report(reports))
+        return reports
     
+    def _spawn_handoff_bridge(self, installation, program_args, handoff_path):
+        """Start a temporary daemon that holds presence while launchd reloads the agent"""
+        try:
+            with open(f"{installation.log_path}.service.log", "a") as out, \
+                    open(f"{installation.log_path}.service.error", "a") as err:
+                bridge = subprocess.Popen(program_args, stdin=subprocess.DEVNULL, stdout=out, stderr=err,
+                                          start_new_session=True)
+            if wait_for_owner(handoff_path, bridge.pid):
+                print(f"🤝 Handoff bridge (PID {bridge.pid}) took over for {installation.name}")
+                return True
+            print(f"⚠️  Handoff bridge did not take over for {installation.name} - presence may blink")
+        except Exception as e:
+            print(f"⚠️  Could not start handoff bridge for {installation.name}: {e}")
+        return False
+
     def start_service(self, installation):
         """Start service for specific installation"""
         try:
@@ -403,6 +322,14 @@ class FauxMIDI(ControlSurface):
             print(f"❌ Failed to stop service for {installation.name}: {e}")
             return False
     
+    def get_governor_level(self, installation):
+        """Degradation level the installation's daemon last reported, or None"""
+        try:
+            with open(CONFIG_DIR / f"status-{installation.install_hash}.json", "r", encoding="utf-8") as f:
+                return json.load(f).get('level')
+        except (OSError, ValueError):
+            return None
+
     def get_service_status(self, installation):
         """Check if service is running for specific installation"""
         try:
@@ -413,13 +340,282 @@ class FauxMIDI(ControlSurface):
             return False
 
 class AbletonRPCApp:
-    def __init__(self, installation):
+    def __init__(self, installation, relay=None):
         self.installation = installation
-        self.rpc = None
-        self.last_modified_time = 0
+        self.relay = relay or {}
+        # source -> decoder -> sinks; sinks run on their own threads behind bounded queues
+        self.source = None
+        self.decoder = StateDecoder()
+        self.pipeline = SinkPipeline(on_handled=self._sink_handled)
+        self.discord = None
+        self.primary_sink = None
         self.last_data_payload = None
         self.start_time = int(time.time())
         self.ableton_was_running = False
+        self.live_state = None
+        self.project_path = None
+        self.project_meta = {}
+        self.heartbeat_path = self.installation.log_path + ".heartbeat"
+        # FauxMIDI listener -> Discord frame, per stage; slowest records go to <log>.trace.json
+        self.tracer = LatencyTracer(self.installation.log_path + ".trace.json")
+        self.heartbeat_seen = False
+        self.live_pid = None
+        self.live_hung = False
+        self.live_cpu = None
+        self.update_seq = 0
+        self.project_index = ProjectIndex()
+        self.checkpoint_path = CONFIG_DIR / f"state-{self.installation.install_hash}.json"
+        self.handoff_path = CONFIG_DIR / f"{self.installation.install_hash}.sock"
+        self.handoff_server = None
+        # Only the most recently active installation publishes when several Live versions run
+        self.election = None
+        self.last_activity = 0.0
+        self.wake = threading.Event()
+        # Sheds polling rate, enrichment and finally state reads when over its CPU/RSS budget
+        self.governor = None
+        self.activity = None
+        self.submitted_leader = None
+        self.meta_stale = False
+
+    @property
+    def is_publisher(self):
+        return self.election.is_leader if self.election else True
+
+    def _election_status(self):
+        """(running, last activity) reported to the other daemons; a PID check notices Live quitting at once"""
+        running = self.ableton_was_running and (psutil.pid_exists(self.live_pid) if self.live_pid else True)
+        return running, self.last_activity
+
+    @property
+    def policy(self):
+        return self.governor.policy if self.governor else POLICIES["normal"]
+
+    def _governor_changed(self, level):
+        if self.election:
+            self.election.interval = POLICIES[level]["election"]
+        if not POLICIES[level]["enrichment"]:
+            # Give back memory the paused enrichment was holding; reloaded on demand
+            self.project_index = ProjectIndex()
+            gc.collect()
+        self.wake.set()
+
+    def _leadership_changed(self, is_leader):
+        print(f"👑 {self.installation.name} now publishes presence" if is_leader
+              else f"🤫 Another Live version is more recently active - {self.installation.name} goes quiet")
+        self.wake.set()
+
+    @property
+    def relaying(self):
+        return self.relay.get('role') in ('sender', 'aggregator')
+
+    def _start_sinks(self):
+        """Discord (or the studio relay), the overlay endpoint and any configured extra sinks"""
+        if self.relaying:
+            # In relay mode presence goes to the studio aggregator instead of this Mac's Discord.
+            # The aggregator's own installations relay to it over loopback like any other machine.
+            host = self.relay.get('host', '127.0.0.1') if self.relay.get('role') == 'sender' else '127.0.0.1'
+            port = self.relay.get('port', DEFAULT_PORT)
+            machine = self.relay.get('machine') or socket.gethostname()
+            self.primary_sink = self.pipeline.add(RelaySink(host, port, machine, self.installation.install_hash,
+                                                            self.relay.get('token')), essential=True)
+            print(f"🛰️  Relaying {self.installation.name} to {host}:{port} as '{machine}'")
+        else:
+            self.discord = DiscordSink(self.installation.client_id, self.installation.rpc_backend,
+                                       on_sent=self._discord_sent)
+            self.primary_sink = self.pipeline.add(self.discord, essential=True)
+
+        if self.installation.overlay_port:
+            try:
+                self.pipeline.add(OverlaySink(self.installation.overlay_port))
+            except Exception as e:
+                print(f"⚠️  Overlay endpoint unavailable: {e}")
+
+        for config in self.installation.sinks:
+            try:
+                sink, queue_size = load_sink(config)
+                self.pipeline.add(sink, queue_size)
+                print(f"🔌 Output sink: {sink.name}")
+            except Exception as e:
+                print(f"⚠️  Could not load sink {config.get('type')}: {e}")
+
+    def _submit(self, activity=None):
+        """Hand the current state to every sink; never blocks on them"""
+        running = activity is not None
+        self.submitted_leader = self.is_publisher
+        self.pipeline.submit({
+            'running': running,
+            'leader': self.submitted_leader,
+            'activity': activity,
+            'start': self.start_time,
+            'installation': self.installation.name,
+            'state': self._overlay_state(activity),
+            'trace': self.tracer.detach() if running else None,
+            'time': time.time(),
+        }, essential_only=not self.policy["enrichment"])
+
+    def _discord_sent(self, update):
+        """Runs on the Discord sink's thread once an update reached Discord"""
+        activity = update.get('activity') if update.get('running') and update.get('leader', True) else None
+        self.last_data_payload = tuple(sorted(activity.items())) if activity else None
+        if activity:
+            self.update_seq += 1
+            self._save_checkpoint(activity)
+
+    def _sink_handled(self, sink, update):
+        # The primary sink (Discord or relay) closes the record it was handed
+        if sink is self.primary_sink and self.tracer.complete(update.get('trace')):
+            if self.tracer.finished % 50 == 0:
+                print(f"⏱️  Update latency over {self.tracer.finished} records:\n{self.tracer.summary()}")
+
+    def _overlay_state(self, activity=None):
+        """Raw fields plus the rendered presence for stream overlays"""
+        running = self.ableton_was_running and bool(self.live_state)
+        if not running:
+            return {'running': False, 'installation': self.installation.name}
+        project, tempo, state, installation_name = self.live_state
+        return {
+            'running': True,
+            'hung': self.live_hung,
+            'project': project,
+            'tempo': tempo,
+            'state': state,
+            'installation': installation_name,
+            'start': self.start_time,
+            'tracks': self.project_meta.get('tracks'),
+            'plugins': self.project_meta.get('plugins'),
+            'key': self.project_meta.get('key'),
+            'cpu': self.live_cpu[0] if self.live_cpu else None,
+            'cpu_peak': self.live_cpu[1] if self.live_cpu else None,
+            'presence': activity,
+        }
+
+    def _render_presence(self):
+        """Render the installation's templates from the latest parsed state"""
+        project, tempo, state, installation_name = self.live_state
+        if self.live_hung:
+            state = "Not responding"
+        context = {
+            'project': project,
+            'tempo': tempo,
+            'state': state,
+            'installation': installation_name,
+            'tracks': self.project_meta.get('tracks', ''),
+            'plugins': self.project_meta.get('plugins', ''),
+            'key': self.project_meta.get('key') or '',
+            'cpu': f"{self.live_cpu[0]:.0f}" if self.live_cpu else '',
+            'cpu_peak': f"{self.live_cpu[1]:.0f}" if self.live_cpu else '',
+        }
+        if 'elapsed' in self.installation.presence_templates.fields:
+            context['elapsed'] = format_elapsed(self.start_time)
+        return self.installation.presence_templates.render(context)
+
+    def _update_project_meta(self, project_path, project_name=None):
+        """Refresh metadata for the open .als, preferring the pre-built project index"""
+        meta = {}
+        if project_path and os.path.exists(project_path):
+            meta = self.project_index.lookup(project_path)
+            if meta is None:
+                try:
+                    meta = get_metadata(project_path)
+                except Exception as e:
+                    meta = {}
+                    print(f"⚠️  Could not read set metadata: {e}")
+        elif project_name:
+            # Older FauxMIDI scripts only report a name
+            meta = self.project_index.find_by_name(project_name) or {}
+        if meta and meta is not self.project_meta:
+            print(f"📦 {Path(project_path).name}: {meta['tracks']} tracks, "
+                  f"{meta['plugins']} plugins, key {meta['key'] or '-'}")
+        self.project_path = project_path
+        self.project_meta = meta
+
+    def _save_checkpoint(self, activity):
+        try:
+            save_checkpoint(self.checkpoint_path, activity, self.start_time, self.update_seq,
+                            self.live_pid, self.live_state, self.project_path)
+        except Exception as e:
+            print(f"⚠️  Could not save state checkpoint: {e}")
+
+    def _restore_checkpoint(self):
+        """Republish the last presence if the checkpointed Live process is still running"""
+        data = load_checkpoint(self.checkpoint_path)
+        if not data or not data.get('live_pid'):
+            return False
+        try:
+            proc = psutil.Process(data['live_pid'])
+            same_install = proc.exe().startswith(self.installation.ableton_path.rstrip('/') + '/')
+            # A recycled PID belongs to a process started after our session began
+            if not same_install or proc.create_time() > data['start_time'] + 1:
+                raise psutil.NoSuchProcess(data['live_pid'])
+        except (psutil.Error, KeyError, TypeError):
+            print("🧹 Discarding stale state checkpoint")
+            clear_checkpoint(self.checkpoint_path)
+            return False
+
+        self.start_time = data['start_time']
+        self.update_seq = data.get('seq', 0)
+        self.live_pid = data['live_pid']
+        self.live_state = tuple(data['live_state']) if data.get('live_state') else None
+        self.ableton_was_running = True
+        activity = data.get('activity')
+        if activity and self.discord:
+            self._submit(activity)
+            print(f"♻️  Restored presence from checkpoint: {activity.get('details', '')} | {activity.get('state', '')}")
+        return True
+
+    def _export_state(self):
+        """In-memory state handed to a newer daemon during an upgrade"""
+        return {
+            'activity': dict(self.last_data_payload) if self.last_data_payload else None,
+            'start_time': self.start_time,
+            'seq': self.update_seq,
+            'live_pid': self.live_pid,
+            'live_state': list(self.live_state) if self.live_state else None,
+            'ableton_was_running': self.ableton_was_running,
+            'heartbeat_seen': self.heartbeat_seen,
+            'watched_paths': {
+                'log': self.installation.log_path,
+                'heartbeat': self.heartbeat_path,
+                'project': self.project_path,
+            },
+        }
+
+    def _take_over_from_running_daemon(self):
+        """Adopt a running daemon's state, publish it, and only then retire the old process"""
+        result = fetch_state(self.handoff_path)
+        if not result:
+            return False
+        old_pid, state = result
+        activity = state.get('activity')
+        if activity and self.discord and not self.discord.connected:
+            # Retiring the old daemon now would blank presence; leave it running instead
+            print(f"⚠️  Discord unavailable - leaving running daemon (PID {old_pid}) in place")
+            sys.exit(0)
+
+        self.start_time = state.get('start_time') or self.start_time
+        self.update_seq = state.get('seq', 0)
+        self.live_pid = state.get('live_pid')
+        self.live_state = tuple(state['live_state']) if state.get('live_state') else None
+        self.ableton_was_running = bool(state.get('ableton_was_running'))
+        self.heartbeat_seen = bool(state.get('heartbeat_seen'))
+        watched = state.get('watched_paths') or {}
+        if watched.get('log') == self.installation.log_path:
+            self._update_project_meta(watched.get('project'))
+        if activity:
+            self._submit(activity)
+            # Only retire the old daemon once our copy of its presence is out
+            self.pipeline.flush()
+
+        if request_exit(self.handoff_path, old_pid):
+            print(f"🤝 Took over from daemon PID {old_pid} without interrupting presence")
+        else:
+            print(f"⚠️  Previous daemon (PID {old_pid}) did not exit in time")
+        return True
+
+    def _retire(self):
+        print(f"🤝 Handed off {self.installation.name} to a newer daemon - exiting without clearing presence")
+        sys.stdout.flush()
+        os._exit(0)
 
     def run_monitoring_loop(self):
         """Monitoring loop for specific installation"""
@@ -428,80 +624,156 @@ class AbletonRPCApp:
         print(f"📝 Log file: {self.installation.log_path}")
         print(f"🔧 Service: {self.installation.service_name}")
         
+        self.source = create_source(self.installation.source, self.installation.log_path, self.installation.name)
+        self._start_sinks()
+
+        try:
+            if not self._take_over_from_running_daemon():
+                self._restore_checkpoint()
+        except Exception as e:
+            print(f"⚠️  Could not restore previous state: {e}")
+
         try:
-            self.rpc = Presence(self.installation.client_id)
-            self.rpc.connect()
-            print("✅ Connected to Discord RPC")
+            self.handoff_server = HandoffServer(self.handoff_path, self._export_state, self._retire)
+            self.handoff_server.start()
         except Exception as e:
-            print(f"⚠️  Discord RPC connection failed: {e}")
-            self.rpc = None
+            print(f"⚠️  Handoff socket unavailable: {e}")
+
+        # In relay mode the aggregator picks what to show, so there is nothing to elect
+        if not self.relaying:
+            try:
+                self.election = LeaderElection(self.installation.install_hash, self._election_status,
+                                               self._leadership_changed, CONFIG_DIR / "leader.json")
+                self.election.start()
+            except Exception as e:
+                print(f"⚠️  Leader election unavailable, publishing unconditionally: {e}")
+                self.election = None
+
+        try:
+            self.governor = ResourceGovernor(self.installation.budget, self._governor_changed,
+                                             CONFIG_DIR / f"status-{self.installation.install_hash}.json")
+            self.governor.start()
+        except Exception as e:
+            print(f"⚠️  Resource governor unavailable: {e}")
+            self.governor = None
         
         while True:
             try:
-                if not self.rpc:
-                    try: 
-                        self.rpc = Presence(self.installation.client_id)
-                        self.rpc.connect()
-                        print("✅ Reconnected to Discord RPC")
-                    except Exception as e:
-                        print(f"⚠️  Discord reconnection failed: {e}")
-                        time.sleep(10)
-                        continue
-                
                 # Check if THIS specific Ableton version is running
-                running = self._is_this_ableton_running()
+                liveness = "alive" if self.source.simulated else self._check_liveness()
+                running = liveness != "down"
+                hung = liveness == "hung"
+                if hung != self.live_hung:
+                    self.live_hung = hung
+                    print(f"🥶 {self.installation.name} is not responding" if hung
+                          else f"🎵 {self.installation.name} is responding again")
                 
                 if running and not self.ableton_was_running:
                     self.start_time = int(time.time())
+                    self.last_activity = time.time()
                     self.ableton_was_running = True
                     print(f"🎵 {self.installation.name} detected - monitoring started")
                 elif not running and self.ableton_was_running:
-                    if self.rpc: 
-                        self.rpc.clear()
-                        print(f"🔇 {self.installation.name} closed - Discord presence cleared")
+                    print(f"🔇 {self.installation.name} closed")
                     self.ableton_was_running = False
+                    self.heartbeat_seen = False
+                    self.live_pid = None
+                    self.live_hung = False
+                    self.activity = None
+                    # Sinks clear Discord, the relay and overlays from this update
+                    self._submit()
+                    clear_checkpoint(self.checkpoint_path)
                     time.sleep(5)
                     continue
 
-                if running and os.path.exists(self.installation.log_path):
+                policy = self.policy
+                if running and policy["state"]:
                     try:
-                        mtime = os.path.getmtime(self.installation.log_path)
-                        if mtime != self.last_modified_time:
-                            self.last_modified_time = mtime
-                            time.sleep(0.5)
-                            
-                            with open(self.installation.log_path, "r", encoding="utf-8") as f:
-                                lines = f.read().splitlines()
-                                data = {}
-                                for line in lines:
-                                    if ":" in line:
-                                        k, v = line.split(":", 1)
-                                        data[k.strip()] = v.strip()
-                            
-                            project = data.get("PROJECT", "Unsaved Project")
-                            tempo = data.get("TEMPO", "120")
-                            state = data.get("STATE", "Stopped")
-                            installation_name = data.get("INSTALLATION", self.installation.name)
-                            
-                            current_payload = (project, tempo, state)
-
-                            if current_payload != self.last_data_payload and self.rpc:
-                                self.last_data_payload = current_payload
-                                self.rpc.update(
-                                    state=f"{state} · {tempo} BPM",
-                                    details=f"{installation_name}: {project}",
-                                    large_image="ableton_image",
-                                    start=self.start_time
-                                )
-                                print(f"📡 Updated Discord: [{installation_name}] {project} | {state} | {tempo} BPM")
+                        # Only bytes added since the last poll are read; a rewrite resets the cache.
+                        # Formats older than the delta log are re-read whole by the file source.
+                        data, reset = self.source.poll()
+                        if data or reset:
+                            observed_ns = time.monotonic_ns()
+                            changed = self.decoder.feed(data, reset)
+                            if changed:
+                                self.last_activity = time.time()
+                            state = self.decoder.state
+                            self.live_state = state.live_state(self.installation.name)
+                            if changed & {"project", "path"}:
+                                self.meta_stale = True
+                            self.tracer.begin(state.seq, LatencyTracer.parse_origin(state.origin), observed_ns)
+                            self.tracer.mark("parsed")
                     except Exception as e:
-                        print(f"⚠️  Error reading log file: {e}")
+                        print(f"⚠️  Error reading state source: {e}")
+
+                if self.meta_stale and policy["enrichment"]:
+                    # Paused while over budget; caught up once the governor allows it again
+                    self.meta_stale = False
+                    self._update_project_meta(self.decoder.state.path or "", self.live_state[0])
+
+                if running and self.live_state:
+                    if policy["state"] or self.activity is None:
+                        # Templates only re-format when a field they reference has changed
+                        self.activity = self._render_presence()
+                        self.tracer.mark("rendered")
+                        # Discord skips unchanged payloads and non-leaders clear; overlays get diffs
+                        self._submit(self.activity)
+                    elif self.is_publisher != self.submitted_leader:
+                        # Heartbeat-only: the last rendering stands, so only a leadership change is sent
+                        self._submit(self.activity)
+                else:
+                    self.tracer.finish()
                         
-                time.sleep(3)
+                # The election thread and the governor wake us early; the governor sets the pace
+                self.wake.wait(policy["poll"])
+                self.wake.clear()
             except Exception as e:
                 print(f"⚠️  Monitoring loop error: {e}")
                 time.sleep(5)
     
+    def _read_heartbeat(self):
+        """(timestamp, sequence, pid, cpu) last written by FauxMIDI, or None"""
+        try:
+            with open(self.heartbeat_path, "r", encoding="utf-8") as f:
+                fields = f.read().split()
+            cpu = (float(fields[3]), float(fields[4])) if len(fields) >= 5 else None
+            return float(fields[0]), int(fields[1]), int(fields[2]), cpu
+        except (OSError, ValueError, IndexError):
+            return None
+
+    def _check_liveness(self):
+        """'alive', 'hung' or 'down' - a fresh heartbeat short-circuits the process scan"""
+        heartbeat = self._read_heartbeat()
+        age = time.time() - heartbeat[0] if heartbeat else None
+        if age is not None and age < HEARTBEAT_STALE:
+            self.heartbeat_seen = True
+            self.live_pid = heartbeat[2]
+            self.live_cpu = heartbeat[3]
+            return "alive"
+        if heartbeat is None and self.heartbeat_seen:
+            # FauxMIDI removes its heartbeat when unloaded; Live may well keep running without it
+            print(f"🔌 FauxMIDI unloaded from {self.installation.name}")
+            self.heartbeat_seen = False
+            self.live_cpu = None
+
+        running = self._is_live_pid_running() or self._is_this_ableton_running()
+        if not running:
+            return "down"
+        # Only call it a hang once this session has produced heartbeats (older scripts never do)
+        if self.heartbeat_seen and age is not None and age >= HANG_THRESHOLD:
+            return "hung"
+        return "alive"
+
+    def _is_live_pid_running(self):
+        """Cheap check of the PID the heartbeat reported, before scanning every process"""
+        if not self.live_pid:
+            return False
+        try:
+            exe_path = psutil.Process(self.live_pid).exe()
+            return exe_path.startswith(self.installation.ableton_path.rstrip('/') + '/')
+        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+            return False
+
     def _is_this_ableton_running(self):
         """Check if this specific Ableton installation is running"""
         try:
@@ -512,6 +784,7 @@ class AbletonRPCApp:
                         if exe_path and '.app/Contents/MacOS' in exe_path:
                             app_path = exe_path.split('.app/Contents/MacOS')[0] + '.app'
                             if app_path == self.installation.ableton_path:
+                                self.live_pid = proc.info['pid']
                                 return True
                 except (psutil.NoSuchProcess, psutil.AccessDenied):
                     continue
@@ -519,6 +792,39 @@ class AbletonRPCApp:
             pass
         return False
 
+def run_relay_aggregator(manager):
+    """Publish one combined presence for every machine relaying to this Mac"""
+    config = manager.relay
+    changed = threading.Event()
+    aggregator = RelayAggregator(config.get('port', DEFAULT_PORT), on_change=lambda combined: changed.set(),
+                                 host=config.get('bind', ''), token=config.get('token'))
+    aggregator.start()
+    rpc = None
+    published = None
+    while True:
+        changed.wait(15)
+        changed.clear()
+        try:
+            if not rpc:
+                rpc = create_presence(config.get('client_id', DEFAULT_CLIENT_ID), config.get('rpc_backend', 'pypresence'))
+                rpc.connect()
+                print("✅ Connected to Discord RPC")
+            combined = aggregator.snapshot()['combined']
+            if combined != published:
+                if combined:
+                    rpc.update(large_image="ableton_image", **combined)
+                    print(f"📡 Studio presence: {combined.get('details', '')} | {combined.get('large_text', '')}")
+                else:
+                    rpc.clear()
+                    print("🔇 No machine in session - Discord presence cleared")
+                published = combined
+        except Exception as e:
+            print(f"⚠️  Relay aggregator publish failed: {e}")
+            rpc = None
+            time.sleep(5)
+        # Discord accepts roughly one activity update every few seconds; changes coalesce meanwhile
+        time.sleep(4)
+
 def run_multi_gui():
     """Multi-installation GUI"""
     root = tk.Tk()
@@ -583,6 +889,9 @@ def run_multi_gui():
         
         for install in manager.installations.values():
             status = "🟢 Running" if manager.get_service_status(install) else "🔴 Stopped"
+            level = manager.get_governor_level(install) if status == "🟢 Running" else None
+            if level and level != "normal":
+                status = f"🟡 Running ({level})"
             version = Path(install.ableton_path).name
             tree.insert("", tk.END, values=(install.name, version, status, install.log_path))
     
@@ -711,6 +1020,159 @@ def run_multi_gui():
                     messagebox.showerror("Error", "Failed to start service")
             refresh_installations()
     
+    def index_projects():
+        root_dir = filedialog.askdirectory(title="Choose a folder with your Live projects")
+        if root_dir:
+            manager.add_project_root(root_dir)
+        if not manager.project_roots:
+            return
+
+        def worker():
+            try:
+                stats = manager.index_projects()
+                root.after(0, lambda: messagebox.showinfo("Project Index",
+                    f"🗂️ Indexed {stats['total']} sets in {stats['seconds']}s\n"
+                    f"{stats['parsed']} parsed, {stats['reused']} unchanged, {stats['failed']} failed"))
+            except Exception as e:
+                root.after(0, lambda err=e: messagebox.showerror("Error", f"Indexing failed: {err}"))
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def deploy_all_installations():
+        def worker():
+            try:
+                reports = manager.deploy()
+                ok = all(report['ok'] for report in reports)
+                show = messagebox.showinfo if ok else messagebox.showerror
+                root.after(0, lambda: (show("Deploy", format_report(reports)), refresh_installations()))
+            except Exception as e:
+                root.after(0, lambda err=e: messagebox.showerror("Error", f"Deploy failed: {err}"))
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def open_log_viewer():
+        selection = tree.selection()
+        if not selection:
+            messagebox.showwarning("Warning", "Please select an installation")
+            return
+        
+        item = tree.item(selection[0])
+        install_name = item['values'][0]
+        install = None
+        for i in manager.installations.values():
+            if i.name == install_name:
+                install = i
+                break
+        if not install:
+            return
+
+        log_files = {
+            "FauxMIDI debug": install.log_path + ".debug",
+            "Service log": install.log_path + ".service.log",
+            "Service errors": install.log_path + ".service.error",
+        }
+        log_window = tk.Toplevel(root)
+        log_window.title(f"Logs - {install.name}")
+        log_window.geometry("900x500")
+
+        bar = tk.Frame(log_window)
+        bar.pack(fill=tk.X, padx=10, pady=5)
+        file_var = tk.StringVar(value="FauxMIDI debug")
+        level_var = tk.StringVar(value="all")
+        text_var = tk.StringVar()
+        ttk.Combobox(bar, textvariable=file_var, values=list(log_files), state="readonly", width=16).pack(side=tk.LEFT)
+        ttk.Combobox(bar, textvariable=level_var, values=LEVELS, state="readonly", width=8).pack(side=tk.LEFT, padx=5)
+        tk.Label(bar, text="Filter:").pack(side=tk.LEFT)
+        tk.Entry(bar, textvariable=text_var, width=30).pack(side=tk.LEFT, padx=5)
+        earlier_button = tk.Button(bar, text="⬆️ Earlier")
+        earlier_button.pack(side=tk.RIGHT)
+
+        body = tk.Frame(log_window)
+        body.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
+        log_text = tk.Text(body, font=("Monaco", 9), wrap="none", state="disabled")
+        log_scroll = ttk.Scrollbar(body, orient=tk.VERTICAL, command=log_text.yview)
+        log_scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        log_text.pack(fill=tk.BOTH, expand=True)
+        log_text.tag_configure("error", foreground="#dc3545")
+        log_text.tag_configure("warning", foreground="#b8860b")
+
+        # Tailing, paging and filtering all run in the LogView thread; Tk only inserts text
+        view = LogView(log_files[file_var.get()])
+        paging = {"pending": False, "has_more": False, "filter_job": None}
+
+        def on_scroll(first, last):
+            log_scroll.set(first, last)
+            if float(first) <= 0.0 and paging["has_more"] and not paging["pending"]:
+                load_earlier()
+
+        def load_earlier():
+            if paging["has_more"]:
+                paging["pending"] = True
+                view.load_earlier()
+
+        def insert_lines(index, lines):
+            for line in lines:
+                level = line_level(line)
+                log_text.insert(index, line + "\n", level if level != "info" else ())
+                if index != tk.END:
+                    index = log_text.index(f"{index} +1 lines")
+
+        def drain():
+            if not log_window.winfo_exists():
+                return
+            following = log_text.yview()[1] >= 0.999
+            changed = False
+            try:
+                while True:
+                    kind, lines, *more = view.results.get_nowait()
+                    log_text.config(state="normal")
+                    if kind == "reset":
+                        log_text.delete("1.0", tk.END)
+                        insert_lines(tk.END, lines)
+                        paging["has_more"] = more[0]
+                        paging["pending"] = False
+                        following = True
+                    elif kind == "append":
+                        insert_lines(tk.END, lines)
+                        overflow = int(log_text.index("end-1c").split(".")[0]) - 1 - MAX_LOG_VIEW_LINES
+                        if following and overflow > 0:
+                            # Keep the widget small while following; the trimmed lines are back behind "Earlier"
+                            log_text.delete("1.0", f"{overflow + 1}.0")
+                            view.trimmed(overflow)
+                            paging["has_more"] = True
+                    elif kind == "prepend":
+                        insert_lines("1.0", lines)
+                        log_text.yview(f"{len(lines) + 1}.0")
+                        paging["has_more"] = more[0]
+                        paging["pending"] = False
+                    log_text.config(state="disabled")
+                    changed = True
+            except queue.Empty:
+                pass
+            if changed:
+                earlier_button.config(state="normal" if paging["has_more"] else "disabled")
+                if following:
+                    log_text.see(tk.END)
+            log_window.after(200, drain)
+
+        def filter_changed(*_):
+            # Debounce typing so each keystroke does not restart the scan
+            if paging["filter_job"]:
+                log_window.after_cancel(paging["filter_job"])
+            paging["filter_job"] = log_window.after(300, lambda: view.set_filter(level_var.get(), text_var.get()))
+
+        def close_viewer():
+            view.close()
+            log_window.destroy()
+
+        log_text.configure(yscrollcommand=on_scroll)
+        earlier_button.config(command=load_earlier)
+        file_var.trace_add("write", lambda *_: view.open(log_files[file_var.get()]))
+        level_var.trace_add("write", filter_changed)
+        text_var.trace_add("write", filter_changed)
+        log_window.protocol("WM_DELETE_WINDOW", close_viewer)
+        drain()
+
     # Control buttons
     btn_frame = tk.Frame(control_frame)
     btn_frame.pack()
@@ -723,6 +1185,12 @@ def run_multi_gui():
              bg="#ffc107", fg="black", font=("Helvetica", 10, "bold")).pack(side=tk.LEFT, padx=5)
     tk.Button(btn_frame, text="🔄 Refresh", command=lambda: [refresh_running(), refresh_installations()], 
              bg="#17a2b8", fg="white", font=("Helvetica", 10, "bold")).pack(side=tk.LEFT, padx=5)
+    tk.Button(btn_frame, text="🗂️ Index Projects", command=index_projects, 
+             bg="#6f42c1", fg="white", font=("Helvetica", 10, "bold")).pack(side=tk.LEFT, padx=5)
+    tk.Button(btn_frame, text="📜 Logs", command=open_log_viewer, 
+             bg="#6c757d", fg="white", font=("Helvetica", 10, "bold")).pack(side=tk.LEFT, padx=5)
+    tk.Button(btn_frame, text="🚀 Deploy All", command=deploy_all_installations, 
+             bg="#fd7e14", fg="white", font=("Helvetica", 10, "bold")).pack(side=tk.LEFT, padx=5)
     
     refresh_installations()
     
@@ -743,14 +1211,28 @@ def run_multi_gui():
     root.mainloop()
 
 def main():
-    if len(sys.argv) >= 3 and sys.argv[1] == "--daemon":
+    multiprocessing.freeze_support()
+    if len(sys.argv) >= 2 and sys.argv[1] == "--index-projects":
+        # Index project folders given on the command line (or the configured ones)
+        manager = MultiAbletonRPCManager()
+        for root_dir in sys.argv[2:]:
+            manager.add_project_root(os.path.abspath(root_dir))
+        manager.index_projects()
+        sys.exit(0)
+    elif len(sys.argv) >= 2 and sys.argv[1] == "--deploy":
+        # Install/upgrade every installation; --force rewrites unchanged files, --dry-run only reports
+        reports = MultiAbletonRPCManager().deploy(force="--force" in sys.argv, dry_run="--dry-run" in sys.argv)
+        sys.exit(0 if all(report['ok'] for report in reports) else 1)
+    elif len(sys.argv) >= 2 and sys.argv[1] == "--relay-aggregator":
+        run_relay_aggregator(MultiAbletonRPCManager())
+    elif len(sys.argv) >= 3 and sys.argv[1] == "--daemon":
         # Daemon mode with installation hash
         install_hash = sys.argv[2]
         
         manager = MultiAbletonRPCManager()
         if install_hash in manager.installations:
             installation = manager.installations[install_hash]
-            app = AbletonRPCApp(installation)
+            app = AbletonRPCApp(installation, manager.relay)
             app.run_monitoring_loop()
         else:
             print(f"❌ Installation not found: {install_hash}")
@@ -0,0 +1,208 @@
+import gzip
+import os
+import sys
+import tempfile
+import threading
+import xml.etree.ElementTree as ET
+from collections import OrderedDict
+
+# --- .ALS LAYOUT ---
+TRACK_TAGS = {"AudioTrack", "MidiTrack", "GroupTrack"}
+RETURN_TAGS = {"ReturnTrack"}
+PLUGIN_TAGS = {"PluginDevice", "AuPluginDevice"}
+MAIN_TRACK_TAGS = {"MasterTrack", "MainTrack"}  # Live 12 renamed MasterTrack
+NOTE_NAMES = ("C", "C#", "D", "D#", "E", "F", "F#", "G", "G#", "A", "A#", "B")
+
+CACHE_SIZE = 64
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+def _open_set(path):
+    """Live sets are gzipped XML; very old or hand-made ones may be plain"""
+    f = open(path, "rb")
+    magic = f.read(2)
+    f.seek(0)
+    if magic == b"\x1f\x8b":
+        return gzip.GzipFile(fileobj=f, mode="rb")
+    return f
+
+def extract_metadata(path):
+    """Stream-parse a .als file, keeping only the open element path in memory"""
+    meta = {
+        'live_version': None,
+        'tempo': None,
+        'tracks': 0,
+        'returns': 0,
+        'plugins': 0,
+        'key': None,
+    }
+    tags = []
+    elems = []
+    tracks_done = False
+    scale_root = None
+    scale_name = None
+    in_key = None
+    scale_done = False
+
+    with _open_set(path) as f:
+        for event, elem in ET.iterparse(f, events=("start", "end")):
+            if event == "start":
+                if not tags and elem.tag == "Ableton":
+                    meta['live_version'] = elem.get("Creator")
+                tags.append(elem.tag)
+                elems.append(elem)
+                continue
+
+            depth = len(tags)
+            tag = tags.pop()
+            elems.pop()
+            parent = tags[-1] if tags else None
+
+            if parent == "Tracks" and depth == 4:
+                if tag in TRACK_TAGS:
+                    meta['tracks'] += 1
+                elif tag in RETURN_TAGS:
+                    meta['returns'] += 1
+            elif tag in PLUGIN_TAGS:
+                meta['plugins'] += 1
+            elif tag == "Manual" and parent == "Tempo" and len(tags) >= 3 and tags[-2] == "Mixer" \
+                    and any(t in MAIN_TRACK_TAGS for t in tags) and meta['tempo'] is None:
+                try:
+                    meta['tempo'] = round(float(elem.get("Value")), 2)
+                except (TypeError, ValueError):
+                    pass
+            elif depth == 4 and parent == "ScaleInformation" and tags[-2] == "LiveSet":
+                if tag == "RootNote":
+                    scale_root = elem.get("Value")
+                elif tag == "Name":
+                    scale_name = elem.get("Value")
+
+            if parent == "LiveSet":
+                if tag == "Tracks":
+                    tracks_done = True
+                elif tag == "InKey":
+                    in_key = elem.get("Value") == "true"
+                    scale_done = True
+                elif tag == "ScaleInformation":
+                    pass
+                elif scale_root is not None:
+                    # First sibling after ScaleInformation: sets without InKey are done too
+                    scale_done = True
+
+            # Drop finished elements so the tree never grows past the open path
+            elem.clear()
+            if elems:
+                elems[-1].remove(elem)
+
+            if tracks_done and scale_done and meta['tempo'] is not None:
+                break
+
+    if scale_root is not None and in_key is not False:
+        try:
+            meta['key'] = f"{NOTE_NAMES[int(scale_root) % 12]} {scale_name or ''}".strip()
+        except ValueError:
+            pass
+    return meta
+
+def get_metadata(path):
+    """Metadata for a set, re-parsed only when its size or mtime changes"""
+    st = os.stat(path)
+    stamp = (st.st_size, st.st_mtime_ns)
+    with _cache_lock:
+        cached = _cache.get(path)
+        if cached and cached[0] == stamp:
+            _cache.move_to_end(path)
+            return cached[1]
+
+    meta = extract_metadata(path)
+    with _cache_lock:
+        _cache[path] = (stamp, meta)
+        _cache.move_to_end(path)
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return meta
+
+def _fixture(path, creator="Ableton Live 12.1", main_tag="MainTrack", tempo=120, tracks=("AudioTrack", "MidiTrack"),
+             returns=1, plugins=("PluginDevice",), scale=(0, "Major"), in_key=True, padding=0, trailer="",
+             gzipped=True):
+    """Write a synthetic Live set with just the elements extract_metadata looks at"""
+    devices = "".join(f'<{tag} Id="{i}" />' for i, tag in enumerate(plugins))
+    # Plugins all sit on the first track
+    chains = "".join(
+        f'<{tag} Id="{i}"><DeviceChain><Mixer><Volume><Manual Value="1" /></Volume></Mixer>'
+        f'<DeviceChain><Devices>{devices if i == 0 else ""}</Devices></DeviceChain></DeviceChain></{tag}>'
+        for i, tag in enumerate(tracks))
+    chains += "".join(f'<ReturnTrack Id="{len(tracks) + i}"><DeviceChain /></ReturnTrack>' for i in range(returns))
+    # A group's own mixer has no tempo in real sets; one here must not be mistaken for the song tempo
+    chains += '<GroupTrack Id="99"><DeviceChain><Mixer><Tempo><Manual Value="60" /></Tempo></Mixer></DeviceChain></GroupTrack>'
+    xml = (f'<?xml version="1.0" encoding="UTF-8"?>\n<Ableton MajorVersion="5" Creator="{creator}"><LiveSet>'
+           f'<Tracks>{chains}</Tracks>'
+           f'<{main_tag}><DeviceChain><Mixer><Tempo><LomId Value="0" /><Manual Value="{tempo}" /></Tempo>'
+           f'</Mixer></DeviceChain></{main_tag}>'
+           f'<PreHearTrack><DeviceChain><Mixer><Tempo><Manual Value="1" /></Tempo></Mixer></DeviceChain></PreHearTrack>')
+    if scale is not None:
+        xml += f'<ScaleInformation><RootNote Value="{scale[0]}" /><Name Value="{scale[1]}" /></ScaleInformation>'
+    if in_key is not None:
+        xml += f'<InKey Value="{str(in_key).lower()}" />'
+    xml += '<SmpteFormat Value="0" />' + '<Locator Time="0" Name="padding" />' * padding + trailer
+    xml += '</LiveSet></Ableton>'
+    data = xml.encode("utf-8")
+    with open(path, "wb") as f:
+        f.write(gzip.compress(data) if gzipped else data)
+
+def _self_check():
+    """extract_metadata against synthetic sets covering both main-track names, key handling and the early exit"""
+    workdir = tempfile.TemporaryDirectory()
+    cases = [
+        ("Live 11 MasterTrack, A minor in key",
+         dict(creator="Ableton Live 11.3.13", main_tag="MasterTrack", tempo=128, scale=(9, "Minor"),
+              plugins=("PluginDevice", "AuPluginDevice"), returns=2),
+         {"live_version": "Ableton Live 11.3.13", "tempo": 128.0, "tracks": 3, "returns": 2, "plugins": 2,
+          "key": "A Minor"}),
+        ("Live 12 MainTrack, fractional tempo",
+         dict(tempo=97.456, scale=(14, "Dorian")),
+         {"live_version": "Ableton Live 12.1", "tempo": 97.46, "tracks": 3, "returns": 1, "plugins": 1,
+          "key": "D Dorian"}),
+        ("scale switched off (InKey false)",
+         dict(in_key=False, scale=(4, "Major")),
+         {"key": None}),
+        ("set older than InKey keeps its scale",
+         dict(in_key=None, scale=(7, "Major")),
+         {"key": "G Major"}),
+        ("no scale information",
+         dict(scale=None, in_key=None),
+         {"key": None, "tempo": 120.0}),
+        ("plain XML set",
+         dict(gzipped=False, tempo=140),
+         {"tempo": 140.0, "tracks": 3}),
+        # Everything needed comes before a large tail ending in invalid XML: only an early exit parses this
+        ("stops once tempo, tracks and key are known",
+         dict(padding=100000, trailer="<Broken <<", tempo=110),
+         {"tempo": 110.0, "tracks": 3, "key": "C Major"}),
+    ]
+    failures = 0
+    try:
+        for n, (name, options, expected) in enumerate(cases):
+            path = os.path.join(workdir.name, f"set-{n}.als")
+            _fixture(path, **options)
+            try:
+                meta = extract_metadata(path)
+            except ET.ParseError as e:
+                meta = {"error": str(e)}
+            got = {key: meta.get(key) for key in expected}
+            ok = got == expected
+            failures += not ok
+            print(f"{'✅' if ok else '❌'} {name}" + ("" if ok else f": expected {expected}, got {got}"))
+    finally:
+        workdir.cleanup()
+    print(f"{'✅' if not failures else '❌'} {len(cases) - failures}/{len(cases)} sets extracted correctly")
+    return not failures
+
+if __name__ == "__main__":
+    # python als_metadata.py          check extraction against synthetic sets
+    # python als_metadata.py SET.als  print what is read from a real set
+    if len(sys.argv) > 1:
+        for set_path in sys.argv[1:]:
+            print(set_path, extract_metadata(set_path))
+    else:
+        sys.exit(0 if _self_check() else 1)
@@ -0,0 +1,55 @@
+import json
+import os
+import tempfile
+import time
+
+CHECKPOINT_VERSION = 1
+
+def atomic_write_json(path, data):
+    """Write JSON via a temp file + rename so readers never see a partial file"""
+    path = str(path)
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".json")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+def save_checkpoint(path, activity, start_time, seq, live_pid, live_state=None, project_path=None):
+    """Persist what the daemon needs to republish presence after a restart"""
+    atomic_write_json(path, {
+        'version': CHECKPOINT_VERSION,
+        'saved_at': time.time(),
+        'activity': activity,
+        'start_time': start_time,
+        'seq': seq,
+        'live_pid': live_pid,
+        'live_state': list(live_state) if live_state else None,
+        'project_path': project_path,
+    })
+
+def load_checkpoint(path):
+    """The saved checkpoint, or None if it is missing, unreadable or from another version"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or data.get('version') != CHECKPOINT_VERSION:
+        return None
+    return data
+
+def clear_checkpoint(path):
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
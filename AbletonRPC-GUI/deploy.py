@@ -0,0 +1,220 @@
+import hashlib
+import importlib.util
+import os
+import py_compile
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from types import SimpleNamespace
+
+DEPLOY_WORKERS = 4
+SCRIPTS_SUBDIR = ("Contents", "App-Resources", "MIDI Remote Scripts")
+
+def remote_scripts_dir(ableton_path):
+    return Path(ableton_path).joinpath(*SCRIPTS_SUBDIR)
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+def file_hash(path):
+    try:
+        with open(path, "rb") as f:
+            return content_hash(f.read())
+    except OSError:
+        return None
+
+def write_if_changed(path, text, force=False, dry_run=False):
+    """True if path was (or, for a dry run, would be) rewritten; identical content is left untouched"""
+    data = text.encode("utf-8")
+    if not force and file_hash(path) == content_hash(data):
+        return False
+    if dry_run:
+        return True
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Live or launchd may read the file at any moment; never let them see half of it
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    return True
+
+def live_bytecode_magic(scripts_root):
+    """Magic number of the bytecode Live ships its own control surfaces in, or None"""
+    for dirpath, dirnames, filenames in os.walk(scripts_root):
+        dirnames[:] = [d for d in dirnames if d != "FauxMIDI"]
+        for filename in filenames:
+            if filename.endswith(".pyc"):
+                try:
+                    with open(os.path.join(dirpath, filename), "rb") as f:
+                        return f.read(4)
+                except OSError:
+                    continue
+    return None
+
+def precompile(script_path, scripts_root, changed, dry_run=False):
+    """Compile the installed script to __pycache__ when Live's embedded Python can load our bytecode"""
+    magic = live_bytecode_magic(scripts_root)
+    if magic is None:
+        return "skipped (no bytecode in Live's scripts to compare with)"
+    if magic != importlib.util.MAGIC_NUMBER:
+        # A .pyc from another Python version would just be ignored by Live
+        return f"skipped (Live's Python is not {sys.version_info.major}.{sys.version_info.minor})"
+    cfile = importlib.util.cache_from_source(str(script_path))
+    if not changed and os.path.exists(cfile):
+        return "unchanged"
+    if dry_run:
+        return "would compile"
+    py_compile.compile(str(script_path), cfile=cfile, doraise=True)
+    return "compiled"
+
+def deploy_installation(installation, render_script, render_agent, apply_agent, force=False, dry_run=False):
+    """Install or upgrade one installation's FauxMIDI script and launch agent; returns its report.
+
+    render_script(installation) -> script text
+    render_agent(installation) -> (plist text, program args)
+    apply_agent(installation, program_args, changed) -> what happened to the loaded agent
+    """
+    started = time.monotonic()
+    report = {"name": installation.name, "script": None, "bytecode": None, "agent": None, "ok": True}
+    scripts_root = remote_scripts_dir(installation.ableton_path)
+    script_path = scripts_root / "FauxMIDI" / "__init__.py"
+    try:
+        if not Path(installation.ableton_path).is_dir():
+            raise FileNotFoundError(f"{installation.ableton_path} not found")
+        changed = write_if_changed(script_path, render_script(installation), force, dry_run)
+        report["script"] = ("would install" if dry_run else "installed") if changed else "unchanged"
+        report["bytecode"] = precompile(script_path, scripts_root, changed, dry_run)
+    except Exception as e:
+        report["script"] = f"failed: {e}"
+        report["ok"] = False
+        # An agent for a Live that cannot load FauxMIDI would only watch a file nobody writes
+        report["agent"] = "skipped"
+        report["seconds"] = round(time.monotonic() - started, 3)
+        return report
+    try:
+        plist_text, program_args = render_agent(installation)
+        changed = write_if_changed(installation.plist_path, plist_text, force, dry_run)
+        if dry_run:
+            report["agent"] = "would install" if changed else "unchanged"
+        else:
+            report["agent"] = apply_agent(installation, program_args, changed)
+    except Exception as e:
+        report["agent"] = f"failed: {e}"
+        report["ok"] = False
+    report["seconds"] = round(time.monotonic() - started, 3)
+    return report
+
+def deploy_all(installations, render_script, render_agent, apply_agent, force=False, dry_run=False,
+               workers=DEPLOY_WORKERS):
+    """Deploy every installation in parallel; reports come back in the order given"""
+    installations = list(installations)
+    if not installations:
+        return []
+    with ThreadPoolExecutor(max_workers=min(workers, len(installations))) as pool:
+        futures = [pool.submit(deploy_installation, installation, render_script, render_agent, apply_agent,
+                               force, dry_run) for installation in installations]
+        return [future.result() for future in futures]
+
+def format_report(reports):
+    lines = []
+    for report in reports:
+        mark = "✅" if report["ok"] else "❌"
+        parts = [f"script {report['script']}"]
+        if report["bytecode"]:
+            parts.append(f"bytecode {report['bytecode']}")
+        parts.append(f"agent {report['agent']}")
+        lines.append(f"{mark} {report['name']}: {', '.join(parts)} ({report['seconds']}s)")
+    return "\n".join(lines) if lines else "No installations to deploy"
+
+def _self_check():
+    """deploy_all against fake Live bundles: first install, an unchanged rerun, a dry run and a missing bundle"""
+    workdir = tempfile.TemporaryDirectory()
+    root = Path(workdir.name)
+    other_magic = bytes([importlib.util.MAGIC_NUMBER[0] ^ 0xFF]) + importlib.util.MAGIC_NUMBER[1:]
+    installations = []
+    for name, magic in (("Matching Live", importlib.util.MAGIC_NUMBER), ("Other Python Live", other_magic),
+                        ("Missing Live", None)):
+        bundle = root / f"{name}.app"
+        if magic is not None:
+            # One of Live's own control surfaces, compiled by its embedded Python
+            cache = remote_scripts_dir(bundle) / "Push2" / "__pycache__"
+            cache.mkdir(parents=True)
+            (cache / "__init__.cpython.pyc").write_bytes(magic + bytes(12))
+        installations.append(SimpleNamespace(name=name, ableton_path=str(bundle),
+                                              plist_path=root / "LaunchAgents" / f"{name}.plist"))
+    version = ["1"]
+    loads = []
+
+    def render_script(installation):
+        return f"# FauxMIDI {version[0]} for {installation.name}\nVERSION = {version[0]!r}\n"
+
+    def render_agent(installation):
+        return f"<plist><!-- {installation.name} build {version[0]} --></plist>\n", ["/fake/AbletonRPC"]
+
+    def apply_agent(installation, program_args, changed):
+        # Stands in for launchctl: an unchanged plist that is already loaded is left alone
+        if not changed and installation.name in loads:
+            return "unchanged"
+        loads.append(installation.name)
+        return "reloaded" if changed else "loaded"
+
+    results = []
+
+    def check(name, ok):
+        results.append(ok)
+        print(f"{'✅' if ok else '❌'} {name}")
+
+    def deploy(**options):
+        reports = {report["name"]: report for report in
+                   deploy_all(installations, render_script, render_agent, apply_agent, **options)}
+        print(format_report(reports.values()))
+        return reports["Matching Live"], reports["Other Python Live"], reports["Missing Live"]
+
+    try:
+        matching, other, missing = deploy()
+        script = remote_scripts_dir(installations[0].ableton_path) / "FauxMIDI" / "__init__.py"
+        check("first deploy installs and compiles where Live's Python matches",
+              (matching["script"], matching["bytecode"], matching["agent"]) == ("installed", "compiled", "reloaded")
+              and os.path.exists(importlib.util.cache_from_source(str(script))))
+        check("bytecode skipped on a magic number mismatch",
+              other["ok"] and other["bytecode"].startswith("skipped (Live's Python"))
+        check("missing bundle fails without installing an agent",
+              not missing["ok"] and missing["agent"] == "skipped" and not installations[2].plist_path.exists())
+
+        mtime = installations[0].plist_path.stat().st_mtime_ns
+        matching, other, missing = deploy()
+        check("unchanged rerun touches nothing",
+              (matching["script"], matching["bytecode"], matching["agent"]) == ("unchanged",) * 3
+              and (other["script"], other["agent"]) == ("unchanged",) * 2
+              and installations[0].plist_path.stat().st_mtime_ns == mtime and len(loads) == 2)
+
+        version[0] = "2"
+        matching, other, missing = deploy(dry_run=True)
+        check("dry run reports changes without writing them",
+              (matching["script"], matching["bytecode"], matching["agent"])
+              == ("would install", "would compile", "would install")
+              and "VERSION = '1'" in script.read_text() and len(loads) == 2)
+
+        matching, other, missing = deploy()
+        check("upgrade rewrites, recompiles and reloads",
+              (matching["script"], matching["bytecode"], matching["agent"]) == ("installed", "compiled", "reloaded")
+              and "VERSION = '2'" in script.read_text() and len(loads) == 4)
+    finally:
+        workdir.cleanup()
+    print(f"{'✅' if all(results) else '❌'} {sum(results)}/{len(results)} checks passed")
+    return all(results)
+
+if __name__ == "__main__":
+    # python deploy.py    check deploy_all against fake Live bundles (no launchctl involved)
+    sys.exit(0 if _self_check() else 1)
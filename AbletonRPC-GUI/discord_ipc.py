@@ -0,0 +1,372 @@
+import json
+import os
+import select
+import socket
+import struct
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+# Discord's local RPC transport: <op:uint32 LE><length:uint32 LE><JSON payload>
+OP_HANDSHAKE = 0
+OP_FRAME = 1
+OP_CLOSE = 2
+OP_PING = 3
+OP_PONG = 4
+HEADER = struct.Struct("<II")
+MAX_PENDING = 64  # unanswered frames remembered for nonce matching
+
+BACKENDS = ("pypresence", "builtin")
+
+class DiscordIPCError(Exception):
+    pass
+
+def ipc_paths():
+    """Candidate discord-ipc-N sockets, in the order the Discord client claims them"""
+    bases = [os.environ.get(name) for name in ("XDG_RUNTIME_DIR", "TMPDIR", "TMP", "TEMP")]
+    bases.append("/tmp")
+    seen = []
+    for base in bases:
+        if base and base not in seen:
+            seen.append(base)
+    # Flatpak/Snap Discord builds put the socket one directory down
+    for base in seen:
+        for sub in ("", "app/com.discordapp.Discord", "snap.discord"):
+            for n in range(10):
+                yield os.path.join(base, sub, f"discord-ipc-{n}")
+
+def _activity(state=None, details=None, start=None, end=None, large_image=None, large_text=None,
+              small_image=None, small_text=None, buttons=None, instance=True):
+    """pypresence-style keyword arguments -> SET_ACTIVITY activity object"""
+    activity = {
+        "state": state,
+        "details": details,
+        "timestamps": {"start": start, "end": end},
+        "assets": {"large_image": large_image, "large_text": large_text,
+                   "small_image": small_image, "small_text": small_text},
+        "buttons": buttons,
+        "instance": instance,
+    }
+    for key in ("timestamps", "assets"):
+        activity[key] = {k: v for k, v in activity[key].items() if v is not None}
+    return {k: v for k, v in activity.items() if v not in (None, {}, [])}
+
+class DiscordIPC:
+    """Minimal Discord RPC client: one persistent socket, pipelined SET_ACTIVITY frames.
+
+    Drop-in for pypresence.Presence as used here (connect/update/clear/close).
+    update() and clear() return as soon as the frame is written; a reader
+    thread matches replies to requests by nonce and reports errors.
+    """
+
+    def __init__(self, client_id, pipe=None, timeout=5):
+        self.client_id = str(client_id)
+        self.pipe = pipe
+        self.timeout = timeout
+        self.sock = None
+        self.reader = None
+        self.send_lock = threading.Lock()
+        self.pending = {}
+        self.pending_cond = threading.Condition()
+        self.connected = False
+        self.last_error = None
+
+    def _candidates(self):
+        if self.pipe is None:
+            return ipc_paths()
+        if isinstance(self.pipe, int):
+            return (path for path in ipc_paths() if path.endswith(f"-{self.pipe}"))
+        return iter([self.pipe])
+
+    def connect(self):
+        self.close()
+        for path in self._candidates():
+            if not os.path.exists(path):
+                continue
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            try:
+                sock.connect(path)
+                self._send_raw(sock, OP_HANDSHAKE, {"v": 1, "client_id": self.client_id})
+                op, reply = self._recv(sock)
+            except (OSError, ValueError):
+                sock.close()
+                continue
+            if op == OP_CLOSE or reply.get("evt") != "READY":
+                sock.close()
+                raise DiscordIPCError(f"Discord rejected the handshake: {reply.get('message', reply)}")
+            sock.settimeout(None)
+            self.sock = sock
+            self.connected = True
+            self.reader = threading.Thread(target=self._read_loop, args=(sock,), daemon=True)
+            self.reader.start()
+            return reply
+        raise DiscordIPCError("Could not find a running Discord client")
+
+    def close(self):
+        sock, self.sock = self.sock, None
+        self.connected = False
+        if sock:
+            try:
+                self._send_raw(sock, OP_CLOSE, {})
+            except OSError:
+                pass
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            sock.close()
+        with self.pending_cond:
+            self.pending.clear()
+            self.pending_cond.notify_all()
+
+    def update(self, pid=None, **activity):
+        return self._command("SET_ACTIVITY", {"pid": pid or os.getpid(), "activity": _activity(**activity)})
+
+    def clear(self, pid=None):
+        return self._command("SET_ACTIVITY", {"pid": pid or os.getpid()})
+
+    def flush(self, timeout=None):
+        """Wait until every frame sent so far has been answered; False on timeout"""
+        deadline = time.monotonic() + (self.timeout if timeout is None else timeout)
+        with self.pending_cond:
+            while self.pending and self.connected:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self.pending_cond.wait(remaining)
+        return not self.pending
+
+    def _command(self, cmd, args):
+        nonce = uuid.uuid4().hex
+        payload = {"cmd": cmd, "args": args, "nonce": nonce}
+        for attempt in (1, 2):
+            if not self.connected:
+                self.connect()
+            try:
+                with self.pending_cond:
+                    if len(self.pending) >= MAX_PENDING:
+                        # Discord stopped answering; forget the oldest rather than grow forever
+                        self.pending.pop(next(iter(self.pending)))
+                    self.pending[nonce] = (cmd, time.monotonic())
+                with self.send_lock:
+                    self._send_raw(self.sock, OP_FRAME, payload)
+                return nonce
+            except (OSError, AttributeError):
+                # Discord restarted under us; reconnect once and resend
+                self.connected = False
+                if attempt == 2:
+                    raise
+
+    @staticmethod
+    def _send_raw(sock, op, payload):
+        data = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        sock.sendall(HEADER.pack(op, len(data)) + data)
+
+    @staticmethod
+    def _recv_exact(sock, size):
+        buf = bytearray()
+        while len(buf) < size:
+            chunk = sock.recv(size - len(buf))
+            if not chunk:
+                raise ConnectionResetError("Discord closed the IPC socket")
+            buf += chunk
+        return bytes(buf)
+
+    @classmethod
+    def _recv(cls, sock):
+        op, length = HEADER.unpack(cls._recv_exact(sock, HEADER.size))
+        return op, json.loads(cls._recv_exact(sock, length) or b"{}")
+
+    def _read_loop(self, sock):
+        try:
+            while True:
+                op, reply = self._recv(sock)
+                if op == OP_PING:
+                    with self.send_lock:
+                        self._send_raw(sock, OP_PONG, reply)
+                elif op == OP_CLOSE:
+                    print(f"⚠️  Discord closed the RPC connection: {reply.get('message', '')}")
+                    break
+                elif op == OP_FRAME:
+                    self._handle_reply(reply)
+        except (OSError, ValueError):
+            pass
+        if sock is self.sock:
+            self.connected = False
+        with self.pending_cond:
+            self.pending_cond.notify_all()
+
+    def _handle_reply(self, reply):
+        error = None
+        with self.pending_cond:
+            request = self.pending.pop(reply.get("nonce"), None)
+            if reply.get("evt") == "ERROR":
+                # Recorded before waking flush(), so a caller that waited sees it
+                error = self.last_error = (reply.get("data") or {}).get("message", "unknown error")
+            self.pending_cond.notify_all()
+        if error is not None:
+            cmd = request[0] if request else reply.get("cmd")
+            print(f"⚠️  Discord rejected {cmd}: {error}")
+
+def create_presence(client_id, backend="pypresence"):
+    """RPC client for an installation's rpc_backend setting"""
+    if backend == "builtin":
+        return DiscordIPC(client_id)
+    # Imported lazily so the built-in backend never pays for pypresence/asyncio
+    from pypresence import Presence # type: ignore
+    return Presence(client_id)
+
+class FakeDiscord:
+    """Local stand-in for the Discord client's IPC socket, for checking DiscordIPC without Discord.
+
+    Replies to everything a batch has sent in reverse order, so nonce matching
+    is exercised; an activity whose state is "reject" gets an ERROR reply and
+    the client id "bad" fails the handshake.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.frames = []
+        self.handshakes = 0
+        self.pongs = 0
+        self.conns = []
+        self.lock = threading.Lock()
+        self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.server.bind(path)
+        self.server.listen(4)
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+
+    def _accept_loop(self):
+        while True:
+            try:
+                conn, _ = self.server.accept()
+            except OSError:
+                return
+            with self.lock:
+                self.conns.append(conn)
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn):
+        try:
+            op, hello = DiscordIPC._recv(conn)
+            self.handshakes += 1
+            if op != OP_HANDSHAKE or hello.get("client_id") == "bad":
+                DiscordIPC._send_raw(conn, OP_CLOSE, {"code": 4000, "message": "Invalid Client ID"})
+                return
+            DiscordIPC._send_raw(conn, OP_FRAME, {"cmd": "DISPATCH", "evt": "READY", "nonce": None,
+                                                  "data": {"v": 1, "user": {"username": "fake"}}})
+            while True:
+                batch = []
+                # Take everything the client pipelined before answering any of it
+                while not batch or select.select([conn], [], [], 0.05)[0]:
+                    op, frame = DiscordIPC._recv(conn)
+                    if op == OP_PONG:
+                        self.pongs += 1
+                    elif op == OP_CLOSE:
+                        return
+                    elif op == OP_FRAME:
+                        self.frames.append(frame)
+                        batch.append(frame)
+                for frame in reversed(batch):
+                    activity = frame.get("args", {}).get("activity") or {}
+                    if activity.get("state") == "reject":
+                        reply = {"cmd": frame["cmd"], "evt": "ERROR", "nonce": frame["nonce"],
+                                 "data": {"code": 4000, "message": 'child "activity" fails'}}
+                    else:
+                        reply = {"cmd": frame["cmd"], "evt": None, "nonce": frame["nonce"], "data": activity}
+                    DiscordIPC._send_raw(conn, OP_FRAME, reply)
+        except (OSError, ValueError):
+            pass
+        finally:
+            conn.close()
+
+    def ping(self):
+        with self.lock:
+            for conn in self.conns:
+                try:
+                    DiscordIPC._send_raw(conn, OP_PING, {"ping": 1})
+                except OSError:
+                    pass
+
+    def drop(self):
+        """Close every client connection, as Discord does when it restarts"""
+        with self.lock:
+            conns, self.conns = self.conns, []
+        for conn in conns:
+            try:
+                conn.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def close(self):
+        self.drop()
+        self.server.close()
+
+def _wait(predicate, timeout=2):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+def _self_check():
+    """DiscordIPC against FakeDiscord: handshake, pipelining, errors, ping and reconnect"""
+    workdir = tempfile.TemporaryDirectory()
+    path = os.path.join(workdir.name, "discord-ipc-0")
+    fake = FakeDiscord(path)
+    results = []
+
+    def check(name, ok):
+        results.append(ok)
+        print(f"{'✅' if ok else '❌'} {name}")
+
+    try:
+        rejected = DiscordIPC("bad", pipe=path, timeout=2)
+        try:
+            rejected.connect()
+            check("rejected handshake raises", False)
+        except DiscordIPCError as e:
+            check("rejected handshake raises", "Invalid Client ID" in str(e))
+
+        client = DiscordIPC("1234", pipe=path, timeout=2)
+        ready = client.connect()
+        check("handshake returns READY", ready.get("evt") == "READY" and client.connected)
+
+        started = time.perf_counter()
+        nonces = [client.update(state=f"Bar {n}", details="Pipelined", start=1700000000) for n in range(20)]
+        sent = time.perf_counter() - started
+        check(f"20 updates pipelined without waiting ({sent * 1000:.1f} ms to send)", client.flush(2))
+        check("frames arrive in order with their nonces",
+              [frame["nonce"] for frame in fake.frames[-20:]] == nonces
+              and fake.frames[-1]["args"]["activity"]["state"] == "Bar 19")
+        check("out-of-order replies all matched", not client.pending)
+
+        client.update(state="reject")
+        client.flush(2)
+        check("ERROR reply recorded", client.last_error == 'child "activity" fails' and not client.pending)
+
+        fake.ping()
+        check("PING answered with PONG", _wait(lambda: fake.pongs == 1))
+
+        fake.drop()
+        check("dropped connection noticed", _wait(lambda: not client.connected))
+        client.update(state="After restart")
+        check("reconnects and resends", client.flush(2) and fake.handshakes == 3
+              and fake.frames[-1]["args"]["activity"]["state"] == "After restart")
+
+        client.clear()
+        check("clear sends an empty SET_ACTIVITY", client.flush(2) and "activity" not in fake.frames[-1]["args"])
+        client.close()
+    finally:
+        fake.close()
+        workdir.cleanup()
+    print(f"{'✅' if all(results) else '❌'} {sum(results)}/{len(results)} checks passed")
+    return all(results)
+
+if __name__ == "__main__":
+    # python discord_ipc.py    check the client against a fake Discord IPC server
+    sys.exit(0 if _self_check() else 1)
@@ -0,0 +1,567 @@
+# Control surface script installed into each Live bundle as FauxMIDI/__init__.py.
+# Kept free of GUI/daemon imports so tools can render it on any machine.
+
+FAUXMIDI_TEMPLATE = """import Live
+import os
+import traceback
+import threading
+import time
+from collections import deque
+from time import perf_counter_ns
+from _Framework.ControlSurface import ControlSurface
+
+# Set ABLETONRPC_PROFILE=1 (or create "<log file>.profile.enable") to time listener callbacks
+PROFILE_CALLBACKS = os.environ.get("ABLETONRPC_PROFILE", "") == "1"
+PROFILE_DUMP_INTERVAL = 60
+HEARTBEAT_INTERVAL = 1.0
+CPU_SAMPLE_INTERVAL = 0.5
+CPU_WINDOW = 8
+# The state file is a full snapshot followed by appended delta records (changed fields only);
+# it is rewritten in full after this many deltas or seconds, whichever comes first
+SNAPSHOT_EVERY = 50
+SNAPSHOT_INTERVAL = 60.0
+FIELD_ORDER = ("PROJECT", "TEMPO", "STATE", "INSTALLATION", "PATH")
+# Header on every snapshot so readers can tell this format from older ones (see state_protocol.py)
+STATE_FORMAT = 2
+
+def create_instance(c_instance):
+    return FauxMIDI(c_instance)
+
+class CallbackProfiler:
+    # Per-callback latency histograms (log2 buckets of microseconds)
+    BUCKETS = 24
+
+    def __init__(self):
+        self.stats = {}
+        self.lock = threading.Lock()
+        self.last_dump = time.time()
+
+    def wrap(self, name, func):
+        def timed(*args, **kwargs):
+            start = perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.record(name, perf_counter_ns() - start)
+        return timed
+
+    def record(self, name, elapsed_ns):
+        bucket = min((elapsed_ns // 1000).bit_length(), self.BUCKETS - 1)
+        with self.lock:
+            stat = self.stats.get(name)
+            if stat is None:
+                # [count, total_ns, max_ns, histogram]
+                stat = self.stats[name] = [0, 0, 0, [0] * self.BUCKETS]
+            stat[0] += 1
+            stat[1] += elapsed_ns
+            if elapsed_ns > stat[2]:
+                stat[2] = elapsed_ns
+            stat[3][bucket] += 1
+
+    def _percentile_us(self, histogram, count, fraction):
+        target = count * fraction
+        seen = 0
+        for bucket, hits in enumerate(histogram):
+            seen += hits
+            if seen >= target:
+                return 1 << bucket
+        return 1 << (self.BUCKETS - 1)
+
+    def summary(self):
+        with self.lock:
+            snapshot = {name: (s[0], s[1], s[2], list(s[3])) for name, s in self.stats.items()}
+        lines = [f"{'callback':<24}{'calls':>8}{'mean_us':>10}{'p50_us':>9}{'p99_us':>9}{'max_us':>10}"]
+        for name in sorted(snapshot):
+            count, total_ns, max_ns, histogram = snapshot[name]
+            if not count:
+                continue
+            lines.append(
+                f"{name:<24}{count:>8}{total_ns / count / 1000:>10.1f}"
+                f"{self._percentile_us(histogram, count, 0.5):>9}"
+                f"{self._percentile_us(histogram, count, 0.99):>9}"
+                f"{max_ns / 1000:>10.1f}"
+            )
+        return "\\n".join(lines)
+
+class StateWriter:
+    # Owns all FauxMIDI file I/O on one background thread so Live's main thread never touches disk.
+    # Overwritten files (state, heartbeat, profile) keep only their newest pending content and are
+    # replaced atomically; appends to the same path coalesce with it so ordering is preserved.
+    # Appended debug lines go through a bounded queue that drops the oldest on overflow.
+    MAX_DEBUG_LINES = 1000
+    REPORT_INTERVAL = 60
+
+    def __init__(self, report_path):
+        self.report_path = report_path
+        self.cond = threading.Condition()
+        self.pending = {}
+        self.debug_lines = deque()
+        self.closed = False
+        self.superseded = 0
+        self.dropped = 0
+        self.writes = 0
+        self.latency_total_ns = 0
+        self.latency_max_ns = 0
+        self.known_dirs = set()
+        self.last_report = time.time()
+        self.thread = threading.Thread(target=self._run, name="FauxMIDI writer", daemon=True)
+        self.thread.start()
+
+    def put_file(self, path, text, sync=True):
+        # Queue a whole-file rewrite; a newer snapshot for the same path replaces an unwritten one
+        with self.cond:
+            if path in self.pending:
+                self.superseded += 1
+            self.pending[path] = (text, sync, perf_counter_ns(), False)
+            self.cond.notify()
+
+    def put_append(self, path, text, sync=True):
+        with self.cond:
+            queued = self.pending.get(path)
+            if queued and queued[0] is not None:
+                # Still unwritten: extend it, keeping its mode (a queued rewrite absorbs the append)
+                self.pending[path] = (queued[0] + text, queued[1] or sync, queued[2], queued[3])
+            else:
+                self.pending[path] = (text, sync, perf_counter_ns(), True)
+            self.cond.notify()
+
+    def put_remove(self, path):
+        # Delete the file in turn with the other writes; anything still queued for it is dropped
+        with self.cond:
+            self.pending[path] = (None, False, perf_counter_ns(), False)
+            self.cond.notify()
+
+    def put_line(self, path, line):
+        with self.cond:
+            if len(self.debug_lines) >= self.MAX_DEBUG_LINES:
+                self.debug_lines.popleft()
+                self.dropped += 1
+            self.debug_lines.append((path, line))
+            self.cond.notify()
+
+    def close(self):
+        # Let the thread drain what is queued and exit; never blocks the caller
+        with self.cond:
+            self.closed = True
+            self.cond.notify()
+
+    def _ensure_dir(self, path):
+        directory = os.path.dirname(path)
+        if directory not in self.known_dirs:
+            os.makedirs(directory, exist_ok=True)
+            self.known_dirs.add(directory)
+
+    def _run(self):
+        while True:
+            with self.cond:
+                while not self.pending and not self.debug_lines and not self.closed:
+                    self.cond.wait(self.REPORT_INTERVAL)
+                    if time.time() - self.last_report >= self.REPORT_INTERVAL:
+                        break
+                pending, self.pending = self.pending, {}
+                lines = list(self.debug_lines)
+                self.debug_lines.clear()
+                closed = self.closed
+
+            for path, (text, sync, queued_ns, append) in pending.items():
+                try:
+                    if text is None:
+                        if os.path.exists(path):
+                            os.remove(path)
+                        continue
+                    self._ensure_dir(path)
+                    # Rewrites go through a temp file so readers never see a half-written snapshot
+                    target = path if append else path + ".tmp"
+                    with open(target, "a" if append else "w", encoding="utf-8") as f:
+                        f.write(text)
+                        if sync:
+                            f.flush()
+                            os.fsync(f.fileno())
+                    if not append:
+                        os.replace(target, path)
+                except Exception:
+                    pass
+                latency = perf_counter_ns() - queued_ns
+                self.writes += 1
+                self.latency_total_ns += latency
+                if latency > self.latency_max_ns:
+                    self.latency_max_ns = latency
+
+            if lines:
+                self._append_lines(lines)
+            since_report = time.time() - self.last_report
+            # Overflow is reported within seconds; routine latency stats once a minute
+            if closed or since_report >= self.REPORT_INTERVAL or (self.dropped and since_report >= 5):
+                self._report()
+            if closed:
+                return
+
+    def _append_lines(self, lines):
+        by_path = {}
+        for path, line in lines:
+            by_path.setdefault(path, []).append(line)
+        for path, path_lines in by_path.items():
+            try:
+                self._ensure_dir(path)
+                with open(path, "a", encoding="utf-8") as f:
+                    f.write("".join(path_lines))
+            except Exception:
+                pass
+
+    def _report(self):
+        self.last_report = time.time()
+        with self.cond:
+            superseded, dropped = self.superseded, self.dropped
+            self.superseded = self.dropped = 0
+        writes, total_ns, max_ns = self.writes, self.latency_total_ns, self.latency_max_ns
+        self.writes = self.latency_total_ns = self.latency_max_ns = 0
+        if not writes and not dropped:
+            return
+        import datetime
+        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        line = (f"[{timestamp}] Writer: {writes} writes, latency mean {total_ns / max(writes, 1) / 1e6:.2f}ms "
+                f"max {max_ns / 1e6:.2f}ms, {superseded} superseded, {dropped} debug lines dropped (queue full)\\n")
+        self._append_lines([(self.report_path, line)])
+
+class FauxMIDI(ControlSurface):
+    def __init__(self, c_instance):
+        super(FauxMIDI, self).__init__(c_instance)
+        self.log_file_path = {LOG_PATH_PLACEHOLDER}
+        self.debug_log_path = self.log_file_path + ".debug"
+        self.writer = StateWriter(self.debug_log_path)
+        self.installation_name = {INSTALL_NAME_PLACEHOLDER}
+        self.last_project_name = None
+        self.name_check_counter = 0
+        self.profile_path = self.log_file_path + ".profile"
+        self.heartbeat_path = self.log_file_path + ".heartbeat"
+        self.heartbeat_seq = 0
+        self.state_seq = 0
+        # Field-level state model: each listener refreshes only its own fields and marks them dirty
+        self.fields = {"INSTALLATION": self.installation_name}
+        self.dirty = set()
+        self.state_lock = threading.Lock()
+        self.deltas_since_snapshot = 0
+        self.last_snapshot = 0.0
+        self.last_heartbeat = 0.0
+        # Fixed-size ring buffers of Live's own engine load, filled from update_display
+        self.cpu_avg_samples = [0.0] * CPU_WINDOW
+        self.cpu_peak_samples = [0.0] * CPU_WINDOW
+        self.cpu_index = 0
+        self.cpu_filled = 0
+        self.last_cpu_sample = 0.0
+        self.app = None
+        self.profiler = None
+        if PROFILE_CALLBACKS or os.path.exists(self.profile_path + ".enable"):
+            self.profiler = CallbackProfiler()
+        self._listeners = {}
+        
+        try:
+            self._debug_log(f"FauxMIDI initializing for {self.installation_name}...")
+            self.app = Live.Application.get_application()
+            self.song = self.app.get_document()
+            self._setup_listeners()
+            self._debug_log("Listeners setup complete")
+            
+            # Start background name monitoring thread
+            self._start_name_monitor()
+            
+            self.log_state()  # Initial state log
+            self._debug_log("Initial state logged successfully")
+        except Exception as e:
+            self._debug_log(f"Initialization error: {e}")
+            self._debug_log(traceback.format_exc())
+
+    def _debug_log(self, message):
+        try:
+            import datetime
+            timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            self.writer.put_line(self.debug_log_path, f"[{timestamp}] [{self.installation_name}] {message}\\n")
+        except:
+            pass
+
+    def update_display(self):
+        # Called by Live on its main thread (~10Hz); if Live hangs, the heartbeat stops
+        super(FauxMIDI, self).update_display()
+        now = time.time()
+        if now - self.last_cpu_sample >= CPU_SAMPLE_INTERVAL:
+            self.last_cpu_sample = now
+            self._sample_cpu()
+        if now - self.last_heartbeat >= HEARTBEAT_INTERVAL:
+            self.last_heartbeat = now
+            self.heartbeat_seq += 1
+            cpu_avg, cpu_peak = self._cpu_usage()
+            self.writer.put_file(self.heartbeat_path,
+                                 f"{now:.3f} {self.heartbeat_seq} {os.getpid()} {cpu_avg:.1f} {cpu_peak:.1f}\\n",
+                                 sync=False)
+
+    def _sample_cpu(self):
+        # Two property reads and two list stores; no allocation on the tick
+        try:
+            i = self.cpu_index
+            self.cpu_avg_samples[i] = float(self.app.average_process_usage)
+            self.cpu_peak_samples[i] = float(self.app.peak_process_usage)
+            self.cpu_index = (i + 1) % CPU_WINDOW
+            if self.cpu_filled < CPU_WINDOW:
+                self.cpu_filled += 1
+        except:
+            pass
+
+    def _cpu_usage(self):
+        # (mean of recent averages, max of recent peaks) as reported by Live
+        n = self.cpu_filled
+        if not n:
+            return 0.0, 0.0
+        if n < CPU_WINDOW:
+            return sum(self.cpu_avg_samples[:n]) / n, max(self.cpu_peak_samples[:n])
+        return sum(self.cpu_avg_samples) / CPU_WINDOW, max(self.cpu_peak_samples)
+
+    def _listener(self, name):
+        # Reuse the same callable so has/remove_*_listener can match it later
+        callback = self._listeners.get(name)
+        if callback is None:
+            callback = {
+                'name': self._on_name,
+                'tempo': self._on_tempo,
+                'is_playing': self._on_transport,
+                'record_mode': self._on_transport,
+            }.get(name, self.log_state)
+            if self.profiler:
+                callback = self.profiler.wrap(name, callback)
+            self._listeners[name] = callback
+        return callback
+
+    def dump_profile(self):
+        if not self.profiler:
+            return
+        try:
+            import datetime
+            timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            report = (f"# FauxMIDI callback profile for {self.installation_name} @ {timestamp}\\n"
+                      + self.profiler.summary() + "\\n")
+            self.writer.put_file(self.profile_path, report, sync=False)
+            self.profiler.last_dump = time.time()
+        except Exception as e:
+            self._debug_log(f"Profile dump error: {e}")
+
+    def _check_name(self):
+        current_name = self._get_enhanced_project_name()
+        if current_name != self.last_project_name:
+            self._debug_log(f"Project name changed: '{self.last_project_name}' -> '{current_name}'")
+            self.last_project_name = current_name
+            self._update_fields(self._read_project)
+
+    def _start_name_monitor(self):
+        check_name = self._check_name
+        if self.profiler:
+            check_name = self.profiler.wrap("name_monitor", check_name)
+
+        def name_monitor():
+            while True:
+                try:
+                    time.sleep(2)
+                    check_name()
+                    if self.profiler:
+                        request_path = self.profile_path + ".request"
+                        if os.path.exists(request_path):
+                            os.remove(request_path)
+                            self.dump_profile()
+                        elif time.time() - self.profiler.last_dump >= PROFILE_DUMP_INTERVAL:
+                            self.dump_profile()
+                except Exception as e:
+                    self._debug_log(f"Name monitor error: {e}")
+                    time.sleep(5)
+        
+        monitor_thread = threading.Thread(target=name_monitor, daemon=True)
+        monitor_thread.start()
+        self._debug_log("Background name monitor started")
+
+    def _get_enhanced_project_name(self):
+        try:
+            # Method 1: Direct song.name
+            raw_name = getattr(self.song, 'name', None)
+            if raw_name and raw_name.strip():
+                name = raw_name[:-4] if raw_name.endswith('.als') else raw_name
+                if name and name != "":
+                    return name
+            
+            # Method 2: Check canonical_parent
+            try:
+                app = Live.Application.get_application()
+                if hasattr(app, 'get_document') and hasattr(app.get_document(), 'canonical_parent'):
+                    doc = app.get_document()
+                    if hasattr(doc, 'canonical_parent') and doc.canonical_parent:
+                        parent_path = str(doc.canonical_parent)
+                        if parent_path and parent_path != "":
+                            filename = os.path.basename(parent_path)
+                            if filename.endswith('.als'):
+                                name = filename[:-4]
+                                return name
+            except Exception as e:
+                self._debug_log(f"Method 2 failed: {e}")
+            
+            # Method 3: Check file_path
+            try:
+                if hasattr(self.song, 'file_path'):
+                    file_path = getattr(self.song, 'file_path', None)
+                    if file_path:
+                        filename = os.path.basename(file_path)
+                        if filename.endswith('.als'):
+                            name = filename[:-4]
+                            return name
+            except Exception as e:
+                self._debug_log(f"Method 3 failed: {e}")
+            
+            # Method 4: Delayed check
+            self.name_check_counter += 1
+            if self.name_check_counter % 5 == 0:
+                raw_name_delayed = getattr(self.song, 'name', None)
+                if raw_name_delayed and raw_name_delayed.strip() and raw_name_delayed != raw_name:
+                    name = raw_name_delayed[:-4] if raw_name_delayed.endswith('.als') else raw_name_delayed
+                    return name
+            
+            return "Unsaved Project"
+            
+        except Exception as e:
+            self._debug_log(f"Enhanced name detection error: {e}")
+            return "Unsaved Project"
+
+    def _get_project_path(self):
+        # Full path of the open set, so the daemon can read its metadata
+        try:
+            file_path = getattr(self.song, 'file_path', None)
+            if file_path and str(file_path).endswith('.als'):
+                return str(file_path)
+            doc = Live.Application.get_application().get_document()
+            parent_path = str(getattr(doc, 'canonical_parent', None) or "")
+            if parent_path.endswith('.als'):
+                return parent_path
+        except Exception as e:
+            self._debug_log(f"Project path lookup failed: {e}")
+        return ""
+
+    def _setup_listeners(self):
+        try:
+            if hasattr(self.song, 'name_has_listener') and not self.song.name_has_listener(self._listener('name')):
+                self.song.add_name_listener(self._listener('name'))
+            if hasattr(self.song, 'tempo_has_listener') and not self.song.tempo_has_listener(self._listener('tempo')):
+                self.song.add_tempo_listener(self._listener('tempo'))
+            if hasattr(self.song, 'is_playing_has_listener') and not self.song.is_playing_has_listener(self._listener('is_playing')):
+                self.song.add_is_playing_listener(self._listener('is_playing'))
+            if hasattr(self.song, 'record_mode_has_listener') and not self.song.record_mode_has_listener(self._listener('record_mode')):
+                self.song.add_record_mode_listener(self._listener('record_mode'))
+                
+            try:
+                app = Live.Application.get_application()
+                if hasattr(app, 'add_document_listener'):
+                    app.add_document_listener(self._listener('document'))
+            except Exception as e:
+                self._debug_log(f"Could not add document listener: {e}")
+                
+        except Exception as e:
+            self._debug_log(f"Listener setup error: {e}")
+
+    def _on_name(self):
+        self._update_fields(self._read_project)
+
+    def _on_tempo(self):
+        self._update_fields(self._read_tempo)
+
+    def _on_transport(self):
+        self._update_fields(self._read_transport)
+
+    def log_state(self):
+        # Refresh every field and write a full snapshot (startup, document changes)
+        self._update_fields(self._read_project, self._read_tempo, self._read_transport, snapshot=True)
+
+    def _read_project(self):
+        return {"PROJECT": self._get_enhanced_project_name(), "PATH": self._get_project_path()}
+
+    def _read_tempo(self):
+        return {"TEMPO": str(int(getattr(self.song, 'tempo', 120)))}
+
+    def _read_transport(self):
+        is_playing = getattr(self.song, 'is_playing', False)
+        record_mode = getattr(self.song, 'record_mode', False)
+        return {"STATE": "Recording" if record_mode else ("Playing" if is_playing else "Stopped")}
+
+    def _update_fields(self, *readers, snapshot=False):
+        # Stamp the record where the change was observed so the daemon can trace its propagation
+        origin = f"ORIGIN:{time.time_ns()} {time.monotonic_ns()}\\n"
+        with self.state_lock:
+            for reader in readers:
+                try:
+                    values = reader()
+                except Exception as e:
+                    self._debug_log(f"{reader.__name__} error: {e}")
+                    values = {"STATE": "Error"}
+                for key, value in values.items():
+                    if self.fields.get(key) != value:
+                        self.fields[key] = value
+                        self.dirty.add(key)
+            self._emit(origin, snapshot)
+
+    def _emit(self, origin, snapshot):
+        if not self.dirty and not snapshot:
+            return
+        now = time.time()
+        snapshot = (snapshot or self.deltas_since_snapshot >= SNAPSHOT_EVERY
+                    or now - self.last_snapshot >= SNAPSHOT_INTERVAL)
+        self.state_seq += 1
+        keys = FIELD_ORDER if snapshot else [key for key in FIELD_ORDER if key in self.dirty]
+        record = "".join(f"{key}:{self.fields[key]}\\n" for key in keys if key in self.fields)
+        # Hand the writer thread an immutable string; no disk I/O on Live's thread
+        if snapshot:
+            cpu_avg, cpu_peak = self._cpu_usage()
+            record = f"FAUXMIDI:{STATE_FORMAT}\\n" + record
+            record += f"CPU:{cpu_avg:.1f} {cpu_peak:.1f}\\nSEQ:{self.state_seq}\\n" + origin
+            self.writer.put_file(self.log_file_path, record)
+            self.deltas_since_snapshot = 0
+            self.last_snapshot = now
+        else:
+            record += f"SEQ:{self.state_seq}\\n" + origin
+            self.writer.put_append(self.log_file_path, record)
+            self.deltas_since_snapshot += 1
+        self.dirty.clear()
+
+    def disconnect(self):
+        try:
+            self._debug_log("FauxMIDI disconnecting...")
+            if hasattr(self, 'song') and self.song:
+                try:
+                    if hasattr(self.song, 'remove_name_listener'):
+                        self.song.remove_name_listener(self._listener('name'))
+                except: pass
+                try:
+                    if hasattr(self.song, 'remove_tempo_listener'):
+                        self.song.remove_tempo_listener(self._listener('tempo'))
+                except: pass
+                try:
+                    if hasattr(self.song, 'remove_is_playing_listener'):
+                        self.song.remove_is_playing_listener(self._listener('is_playing'))
+                except: pass
+                try:
+                    if hasattr(self.song, 'remove_record_mode_listener'):
+                        self.song.remove_record_mode_listener(self._listener('record_mode'))
+                except: pass
+                
+                try:
+                    app = Live.Application.get_application()
+                    if hasattr(app, 'remove_document_listener'):
+                        app.remove_document_listener(self._listener('document'))
+                except: pass
+                
+            self.dump_profile()
+        except Exception as e:
+            self._debug_log(f"Disconnect error: {e}")
+        # Live may keep running without us (surface switched, scripts reloaded); a missing
+        # heartbeat tells the daemon we left, where a stale one would read as a hang
+        self.writer.put_remove(self.heartbeat_path)
+        self.writer.close()
+        
+        super(FauxMIDI, self).disconnect()
+"""
+
+def render_midi_script(log_path, installation_name):
+    """FauxMIDI source for one installation"""
+    script = FAUXMIDI_TEMPLATE.replace("{LOG_PATH_PLACEHOLDER}", repr(str(log_path)))
+    return script.replace("{INSTALL_NAME_PLACEHOLDER}", repr(installation_name))
@@ -0,0 +1,192 @@
+import collections
+import sys
+import threading
+import time
+
+import psutil # type: ignore
+
+from checkpoint import atomic_write_json
+
+# Degradation steps, lightest first. Each level keeps everything the next one drops:
+#   poll         seconds between monitoring-loop ticks
+#   enrichment   .als metadata lookups and optional sinks (overlay, json, metrics, custom)
+#   state        reading and rendering Live's state at all; off = heartbeat-only
+#   election     seconds between leader-election checks (leader.LeaderElection)
+LEVELS = ("normal", "reduced", "essential", "minimal")
+POLICIES = {
+    "normal":    {"poll": 3,  "enrichment": True,  "state": True,  "election": 0.25},
+    "reduced":   {"poll": 6,  "enrichment": True,  "state": True,  "election": 0.5},
+    "essential": {"poll": 10, "enrichment": False, "state": True,  "election": 1},
+    "minimal":   {"poll": 15, "enrichment": False, "state": False, "election": 2},
+}
+DEFAULT_BUDGET = {"cpu_percent": 1.0, "rss_mb": 150}
+SAMPLE_INTERVAL = 10   # seconds between self-measurements
+RECOVER_AFTER = 3      # consecutive calm samples before stepping back up
+CALM_FRACTION = 0.5    # a sample is calm below this fraction of the budget
+HISTORY = 20           # transitions kept for status
+
+def next_level(level, cpu_percent, rss_mb, budget, calm_samples):
+    """(new level, calm_samples, reason) for one measurement against the budget"""
+    index = LEVELS.index(level)
+    over = []
+    if cpu_percent > budget["cpu_percent"]:
+        over.append(f"CPU {cpu_percent:.1f}% > {budget['cpu_percent']}%")
+    if rss_mb > budget["rss_mb"]:
+        over.append(f"RSS {rss_mb:.0f} MB > {budget['rss_mb']} MB")
+    if over:
+        # Any overrun steps down at once; the next sample is measured at the cheaper level
+        return LEVELS[min(index + 1, len(LEVELS) - 1)], 0, ", ".join(over)
+    calm = cpu_percent < budget["cpu_percent"] * CALM_FRACTION and rss_mb < budget["rss_mb"] * CALM_FRACTION
+    calm_samples = calm_samples + 1 if calm else 0
+    if index and calm_samples >= RECOVER_AFTER:
+        return LEVELS[index - 1], 0, f"CPU {cpu_percent:.1f}%, RSS {rss_mb:.0f} MB back under budget"
+    return level, calm_samples, None
+
+class ResourceGovernor:
+    """Keeps the daemon's own CPU time and RSS inside a budget by shedding work in steps.
+
+    A background thread samples psutil.Process() every SAMPLE_INTERVAL. Going
+    over budget moves one level down LEVELS straight away; RECOVER_AFTER calm
+    samples in a row move one level back up, so the daemon never oscillates
+    on a single quiet reading. The monitoring loop reads policy each tick.
+    """
+
+    def __init__(self, budget=None, on_change=None, status_path=None, interval=SAMPLE_INTERVAL):
+        self.budget = dict(DEFAULT_BUDGET, **(budget or {}))
+        self.on_change = on_change
+        self.status_path = status_path
+        self.interval = self.budget.pop("interval", interval)
+        self.level = LEVELS[0]
+        self.since = time.time()
+        self.calm_samples = 0
+        self.cpu_percent = 0.0
+        self.rss_mb = 0.0
+        self.peak_cpu_percent = 0.0
+        self.peak_rss_mb = 0.0
+        self.transitions = collections.deque(maxlen=HISTORY)
+        self.process = psutil.Process()
+        self.last_cpu = None
+
+    def start(self):
+        self.sample()
+        self._write_status()
+        threading.Thread(target=self._run, name="governor", daemon=True).start()
+        print(f"🧮 Resource budget: {self.budget['cpu_percent']}% CPU, {self.budget['rss_mb']} MB RSS")
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.sample()
+            except Exception as e:
+                print(f"⚠️  Resource governor error: {e}")
+
+    @property
+    def policy(self):
+        return POLICIES[self.level]
+
+    def _measure(self):
+        """(CPU % of one core since the last call, RSS in MB)"""
+        times = self.process.cpu_times()
+        cpu = times.user + times.system
+        now = time.monotonic()
+        percent = 0.0
+        if self.last_cpu:
+            elapsed = now - self.last_cpu[1]
+            percent = (cpu - self.last_cpu[0]) / elapsed * 100 if elapsed > 0 else 0.0
+        self.last_cpu = (cpu, now)
+        return percent, self.process.memory_info().rss / (1024 * 1024)
+
+    def sample(self):
+        self.cpu_percent, self.rss_mb = self._measure()
+        self.peak_cpu_percent = max(self.peak_cpu_percent, self.cpu_percent)
+        self.peak_rss_mb = max(self.peak_rss_mb, self.rss_mb)
+        level, self.calm_samples, reason = next_level(self.level, self.cpu_percent, self.rss_mb,
+                                                      self.budget, self.calm_samples)
+        if level != self.level:
+            self._transition(level, reason)
+
+    def _transition(self, level, reason):
+        worse = LEVELS.index(level) > LEVELS.index(self.level)
+        print(f"{'🐢' if worse else '🐇'} Resource governor: {self.level} -> {level} ({reason})")
+        self.transitions.append({"time": time.time(), "from": self.level, "to": level, "reason": reason})
+        self.level = level
+        self.since = time.time()
+        self._write_status()
+        if self.on_change:
+            self.on_change(level)
+
+    def status(self):
+        return {
+            "level": self.level,
+            "since": self.since,
+            "cpu_percent": round(self.cpu_percent, 2),
+            "rss_mb": round(self.rss_mb, 1),
+            "peak_cpu_percent": round(self.peak_cpu_percent, 2),
+            "peak_rss_mb": round(self.peak_rss_mb, 1),
+            "budget": self.budget,
+            "transitions": list(self.transitions),
+        }
+
+    def _write_status(self):
+        # Only on start and on transitions, so the budget itself costs no periodic disk writes
+        if not self.status_path:
+            return
+        try:
+            atomic_write_json(self.status_path, self.status())
+        except OSError as e:
+            print(f"⚠️  Could not write governor status: {e}")
+
+def _prove(seconds=60, budget_percent=DEFAULT_BUDGET["cpu_percent"]):
+    """Run the real daemon loop against a fast simulated Live and check the whole process stays in budget.
+
+    Everything the service runs is measured together: the monitoring loop,
+    leader election, sink workers, the governor itself and Discord reconnect
+    attempts. The first half runs under the normal budget; the second
+    squeezes the budget so the governor must step down to minimal, and
+    checks that the daemon gets cheaper there rather than just slower.
+    """
+    import tempfile
+    import ableton_rpc
+
+    workdir = tempfile.TemporaryDirectory()
+    # Keep the registry, checkpoints and handoff socket away from a real installation's
+    ableton_rpc.CONFIG_DIR = ableton_rpc.Path(workdir.name)
+    installation = ableton_rpc.AbletonInstallation(
+        "Governor proof", "/Applications/Governor Proof.app", f"{workdir.name}/state.txt",
+        rpc_backend="builtin", source={"type": "simulator", "interval": 0.05},
+        sinks=[{"type": "json", "path": f"{workdir.name}/state.json"},
+               {"type": "metrics", "path": f"{workdir.name}/metrics.prom", "interval": 0}],
+        budget={"cpu_percent": budget_percent, "interval": 2})
+    app = ableton_rpc.AbletonRPCApp(installation)
+    threading.Thread(target=app.run_monitoring_loop, name="daemon", daemon=True).start()
+    process = psutil.Process()
+
+    def measure(duration):
+        # Skip the first third of each phase while the governor settles
+        time.sleep(duration / 3)
+        times = process.cpu_times()
+        start = (times.user + times.system, time.monotonic())
+        time.sleep(duration * 2 / 3)
+        times = process.cpu_times()
+        return (times.user + times.system - start[0]) / (time.monotonic() - start[1]) * 100
+
+    try:
+        normal = measure(seconds / 2)
+        level = app.governor.level if app.governor else None
+        print(f"Daemon at '{level}' used {normal:.3f}% CPU against a {budget_percent}% budget")
+        # No process fits in 1 MB, so every sample is over budget and the governor walks all the way down
+        app.governor.budget["rss_mb"] = 1
+        minimal = measure(seconds / 2)
+        squeezed = app.governor.level
+        print(f"Squeezed to '{squeezed}': {minimal:.3f}% CPU "
+              f"(leader checks every {POLICIES[squeezed]['election']}s, polls every {POLICIES[squeezed]['poll']}s)")
+    finally:
+        workdir.cleanup()
+    ok = normal <= budget_percent and squeezed == "minimal" and minimal <= normal
+    print(f"{'✅' if ok else '❌'} daemon {'stays' if ok else 'does not stay'} within budget and sheds work when squeezed")
+    return ok
+
+if __name__ == "__main__":
+    # python governor.py [seconds]: the real daemon loop, driven by a simulated Live, held to its budget
+    sys.exit(0 if _prove(int(sys.argv[1]) if len(sys.argv) > 1 else 60) else 1)
@@ -0,0 +1,136 @@
+import json
+import os
+import socket
+import threading
+import time
+
+HANDOFF_VERSION = 1
+
+def _request(sock_path, message, timeout=2.0):
+    """Send one JSON line to a running daemon and read its one-line reply"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+        s.settimeout(timeout)
+        s.connect(str(sock_path))
+        s.sendall((json.dumps(message) + "\n").encode("utf-8"))
+        data = b""
+        while not data.endswith(b"\n"):
+            chunk = s.recv(65536)
+            if not chunk:
+                break
+            data += chunk
+    return json.loads(data.decode("utf-8") or "{}")
+
+def ping(sock_path, timeout=1.0):
+    """PID of the daemon listening on sock_path, or None"""
+    try:
+        reply = _request(sock_path, {'op': 'ping'}, timeout)
+        return reply.get('pid') if reply.get('ok') else None
+    except (OSError, ValueError):
+        return None
+
+def fetch_state(sock_path, timeout=2.0):
+    """(pid, state) from the running daemon, or None if nothing is listening"""
+    try:
+        reply = _request(sock_path, {'op': 'state', 'version': HANDOFF_VERSION}, timeout)
+    except (OSError, ValueError):
+        return None
+    if not reply.get('ok') or reply.get('version') != HANDOFF_VERSION:
+        return None
+    return reply.get('pid'), reply.get('state') or {}
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+        return True
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+
+def request_exit(sock_path, pid, timeout=5.0):
+    """Tell the old daemon to exit (without clearing presence) and wait for it to go"""
+    try:
+        _request(sock_path, {'op': 'exit'}, timeout)
+    except (OSError, ValueError):
+        pass
+    deadline = time.time() + timeout
+    while pid and _pid_alive(pid) and time.time() < deadline:
+        time.sleep(0.05)
+    return not (pid and _pid_alive(pid))
+
+def wait_for_owner(sock_path, pid, timeout=15.0):
+    """Wait until the daemon answering on sock_path is the given PID"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if ping(sock_path, timeout=0.5) == pid:
+            return True
+        time.sleep(0.2)
+    return False
+
+class HandoffServer:
+    """Answers ping/state/exit requests from a newer daemon for the same installation"""
+
+    def __init__(self, sock_path, get_state, on_exit):
+        self.sock_path = str(sock_path)
+        self.get_state = get_state
+        self.on_exit = on_exit
+        self.sock = None
+
+    def start(self):
+        # Only called once no other daemon answers on this path, so a leftover file is stale
+        try:
+            os.unlink(self.sock_path)
+        except FileNotFoundError:
+            pass
+        os.makedirs(os.path.dirname(self.sock_path), exist_ok=True)
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.bind(self.sock_path)
+        os.chmod(self.sock_path, 0o600)
+        self.sock.listen(4)
+        threading.Thread(target=self._serve, daemon=True).start()
+
+    def close(self):
+        if self.sock:
+            try:
+                self.sock.close()
+            except OSError:
+                pass
+            self.sock = None
+            try:
+                os.unlink(self.sock_path)
+            except OSError:
+                pass
+
+    def _serve(self):
+        while self.sock:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            try:
+                self._handle(conn)
+            except Exception as e:
+                print(f"⚠️  Handoff request failed: {e}")
+            finally:
+                conn.close()
+
+    def _handle(self, conn):
+        conn.settimeout(2.0)
+        data = b""
+        while not data.endswith(b"\n"):
+            chunk = conn.recv(65536)
+            if not chunk:
+                return
+            data += chunk
+        op = json.loads(data.decode("utf-8")).get('op')
+        reply = {'ok': True, 'pid': os.getpid(), 'version': HANDOFF_VERSION}
+        if op == 'state':
+            reply['state'] = self.get_state()
+        elif op not in ('ping', 'exit'):
+            reply = {'ok': False, 'error': f"unknown op {op!r}"}
+        conn.sendall((json.dumps(reply) + "\n").encode("utf-8"))
+        if op == 'exit':
+            # Path ownership passes to the new daemon before we go
+            self.sock.close()
+            self.sock = None
+            self.on_exit()
@@ -0,0 +1,178 @@
+import heapq
+import threading
+import time
+
+from checkpoint import atomic_write_json
+
+# Stage order for one state record: FauxMIDI origin -> daemon stages.
+# Lags use time.monotonic_ns(), which on macOS is the system-wide clock shared by
+# Live and the daemon; the wall-clock origin only places events on the trace timeline.
+STAGES = ("observed", "parsed", "rendered", "sent")
+SEGMENTS = {
+    "observed": "Live → state file → daemon poll",
+    "parsed": "tail + merge",
+    "rendered": "template render",
+    "sent": "sink queue + Discord update",
+}
+BUCKETS = 20  # log2 buckets of lag in milliseconds (<1ms ... >=2^18ms)
+
+class Propagation:
+    __slots__ = ("seq", "origin_wall_ns", "origin_mono_ns", "marks")
+
+    def __init__(self, seq, origin_wall_ns, origin_mono_ns):
+        self.seq = seq
+        self.origin_wall_ns = origin_wall_ns
+        self.origin_mono_ns = origin_mono_ns
+        self.marks = {}
+
+    def mark(self, stage):
+        self.marks[stage] = time.monotonic_ns()
+
+    def total_ns(self):
+        last = max(self.marks.values()) if self.marks else self.origin_mono_ns
+        return last - self.origin_mono_ns
+
+class LatencyTracer:
+    """Per-stage lag histograms plus a Chrome trace of the slowest propagations
+
+    begin/mark run on the daemon loop; a record handed to the sinks with
+    detach() is folded in from the sink's thread with complete().
+    """
+
+    def __init__(self, trace_path, slowest=20, write_interval=30):
+        self.trace_path = trace_path
+        self.slowest_n = slowest
+        self.write_interval = write_interval
+        self.histograms = {stage: [0] * BUCKETS for stage in STAGES}
+        self.histograms["total"] = [0] * BUCKETS
+        self.slowest = []  # min-heap of (total_ns, seq, Propagation)
+        self.current = None
+        self.finished = 0
+        self.dirty = False
+        self.last_write = 0.0
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def parse_origin(value):
+        """'<wall_ns> <mono_ns>' as written by FauxMIDI, or None"""
+        try:
+            wall_ns, mono_ns = value.split()
+            return int(wall_ns), int(mono_ns)
+        except (AttributeError, ValueError):
+            return None
+
+    def begin(self, seq, origin, observed_mono_ns):
+        """Start tracing a record; observed is when the daemon noticed the file change"""
+        self.finish()
+        if origin is None:
+            return
+        try:
+            seq = int(seq)
+        except (TypeError, ValueError):
+            seq = 0
+        self.current = Propagation(seq, origin[0], origin[1])
+        self.current.marks["observed"] = observed_mono_ns
+
+    def mark(self, stage):
+        if self.current is not None:
+            self.current.mark(stage)
+
+    def detach(self):
+        """Hand the current record over to whoever delivers it"""
+        propagation, self.current = self.current, None
+        return propagation
+
+    def finish(self):
+        """Fold the current record into the histograms; False if nothing was being traced"""
+        return self.complete(self.detach())
+
+    def complete(self, propagation):
+        """Fold a (detached) record into the histograms; False for None"""
+        if propagation is None:
+            return False
+        with self.lock:
+            return self._complete(propagation)
+
+    def _complete(self, propagation):
+        previous = propagation.origin_mono_ns
+        for stage in STAGES:
+            at = propagation.marks.get(stage)
+            if at is None:
+                continue
+            self._record(stage, at - previous)
+            previous = at
+        total = propagation.total_ns()
+        self._record("total", total)
+        self.finished += 1
+
+        entry = (total, propagation.seq, propagation)
+        if len(self.slowest) < self.slowest_n:
+            heapq.heappush(self.slowest, entry)
+            self.dirty = True
+        elif total > self.slowest[0][0]:
+            heapq.heapreplace(self.slowest, entry)
+            self.dirty = True
+        if self.dirty and time.time() - self.last_write >= self.write_interval:
+            self.write_trace()
+        return True
+
+    def _record(self, stage, lag_ns):
+        bucket = min(max(0, lag_ns) // 1_000_000, (1 << (BUCKETS - 1)) - 1).bit_length()
+        self.histograms[stage][min(bucket, BUCKETS - 1)] += 1
+
+    def write_trace(self):
+        """Chrome trace-event JSON (chrome://tracing, Perfetto) of the slowest propagations"""
+        events = [
+            {"name": "process_name", "ph": "M", "pid": 1, "args": {"name": "FauxMIDI → file"}},
+            {"name": "process_name", "ph": "M", "pid": 2, "args": {"name": "AbletonRPC daemon"}},
+        ]
+        for total, seq, propagation in sorted(self.slowest, reverse=True):
+            origin_us = propagation.origin_wall_ns / 1000
+            previous = propagation.origin_mono_ns
+            for stage in STAGES:
+                at = propagation.marks.get(stage)
+                if at is None:
+                    continue
+                events.append({
+                    "name": SEGMENTS[stage],
+                    "cat": stage,
+                    "ph": "X",
+                    "pid": 1 if stage == "observed" else 2,
+                    "tid": seq,
+                    "ts": origin_us + (previous - propagation.origin_mono_ns) / 1000,
+                    "dur": max(0, at - previous) / 1000,
+                    "args": {"seq": seq, "total_ms": round(total / 1e6, 3)},
+                })
+                previous = at
+        try:
+            atomic_write_json(self.trace_path, {"traceEvents": events, "displayTimeUnit": "ms"})
+        except OSError as e:
+            print(f"⚠️  Could not write latency trace: {e}")
+        self.dirty = False
+        self.last_write = time.time()
+
+    def summary(self):
+        """One line per stage: count and approximate p50/p99 in ms"""
+        with self.lock:
+            return self._summary()
+
+    def _summary(self):
+        lines = []
+        for stage in STAGES + ("total",):
+            histogram = self.histograms[stage]
+            count = sum(histogram)
+            if not count:
+                continue
+            p50 = self._percentile_ms(histogram, count, 0.5)
+            p99 = self._percentile_ms(histogram, count, 0.99)
+            lines.append(f"{stage:<9} n={count:<6} p50<{p50}ms p99<{p99}ms")
+        return "\n".join(lines)
+
+    @staticmethod
+    def _percentile_ms(histogram, count, fraction):
+        seen = 0
+        for bucket, hits in enumerate(histogram):
+            seen += hits
+            if seen >= count * fraction:
+                return 1 << bucket
+        return 1 << (BUCKETS - 1)
@@ -0,0 +1,158 @@
+import fcntl
+import json
+import os
+import threading
+import time
+
+ELECTION_INTERVAL = 0.25  # seconds between checks of this daemon's status and the registry
+IDLE_INTERVAL = 2.0       # the same while this installation's Live is down
+REFRESH_INTERVAL = 5.0    # a running daemon re-stamps its entry this often when nothing changed
+ENTRY_STALE = REFRESH_INTERVAL * 3  # a daemon that has not checked in for this long is ignored
+
+def _pid_alive(pid):
+    if not pid or pid < 0:
+        return False
+    try:
+        os.kill(pid, 0)
+        return True
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+
+def choose_leader(entries, now, stale=ENTRY_STALE):
+    """Install hash of the running installation with the most recent activity, or None"""
+    candidates = [
+        (entry.get("active", 0), install_hash)
+        for install_hash, entry in entries.items()
+        # Entries are only rewritten on change; a killed daemon is noticed by its PID
+        if entry.get("running") and now - entry.get("seen", 0) < stale and _pid_alive(entry.get("pid", 0))
+    ]
+    return max(candidates)[1] if candidates else None
+
+class LeaderElection:
+    """Decides which per-installation daemon publishes presence when several Live versions run.
+
+    Every daemon writes its entry to a shared registry under an flock when
+    whether its Live is running or when it was last active changes, and
+    re-stamps it every REFRESH_INTERVAL while running. In between it only
+    stats the registry every ELECTION_INTERVAL and re-reads it when another
+    daemon wrote. The most recently active running installation leads; the
+    rest stay quiet. A daemon whose Live closes hands over on its next check,
+    and one that is killed is dropped as soon as its PID is gone. While this
+    installation's Live is down there is nothing to lead, so it only checks
+    its own status every IDLE_INTERVAL.
+    """
+
+    def __init__(self, install_hash, get_status, on_change, registry_path, interval=ELECTION_INTERVAL):
+        self.install_hash = install_hash
+        self.get_status = get_status  # -> (running, last_activity_timestamp)
+        self.on_change = on_change    # called with the new is_leader value from the election thread
+        self.registry_path = str(registry_path)
+        self.lock_path = self.registry_path + ".lock"
+        self.interval = interval
+        self.is_leader = False
+        self.leader = None
+        self.thread = None
+        self.reported = None          # (running, active) last written to the registry
+        self.reported_at = 0.0
+        self.entries = {}
+        self.registry_stamp = None    # (mtime_ns, size) of the registry when entries was read
+        self.read_at = 0.0
+        self.writes = 0
+
+    def start(self):
+        self.tick()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval if self.reported and self.reported[0] else IDLE_INTERVAL)
+            try:
+                self.tick()
+            except Exception as e:
+                print(f"⚠️  Leader election error: {e}")
+
+    def _write(self, status, now):
+        os.makedirs(os.path.dirname(self.registry_path), exist_ok=True)
+        with open(self.lock_path, "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                try:
+                    with open(self.registry_path, "r", encoding="utf-8") as f:
+                        entries = json.load(f)
+                except (OSError, ValueError):
+                    entries = {}
+                running, active = status
+                entries[self.install_hash] = {
+                    "pid": os.getpid(),
+                    "running": running,
+                    "active": active,
+                    "seen": now,
+                }
+                # launchd kills daemons without notice; drop entries whose process is gone
+                entries = {
+                    install_hash: entry for install_hash, entry in entries.items()
+                    if _pid_alive(entry.get("pid", 0)) and now - entry.get("seen", 0) < ENTRY_STALE * 10
+                }
+                # Readers hold the same lock, and the registry is rebuilt within a tick if lost: no fsync
+                with open(self.registry_path, "w", encoding="utf-8") as f:
+                    json.dump(entries, f)
+                self.writes += 1
+                self.entries = entries
+                self.registry_stamp = self._stamp()
+                self.read_at = time.monotonic()
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _stamp(self):
+        try:
+            st = os.stat(self.registry_path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _read(self):
+        """Entries as last written by any daemon; only re-read when the registry changed"""
+        stamp = self._stamp()
+        # Filesystems with coarse mtimes can hide a same-size rewrite; re-read now and then regardless
+        if stamp is not None and stamp == self.registry_stamp and time.monotonic() - self.read_at < REFRESH_INTERVAL:
+            return self.entries
+        self.read_at = time.monotonic()
+        with open(self.lock_path, "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_SH)
+            try:
+                try:
+                    with open(self.registry_path, "r", encoding="utf-8") as f:
+                        self.entries = json.load(f)
+                except (OSError, ValueError):
+                    self.entries = {}
+                self.registry_stamp = self._stamp()
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+        return self.entries
+
+    def tick(self):
+        now = time.time()
+        running, active = self.get_status()
+        status = (bool(running), active)
+        if status != self.reported or (status[0] and now - self.reported_at >= REFRESH_INTERVAL):
+            self._write(status, now)
+            self.reported, self.reported_at = status, now
+        elif not status[0] and not self.is_leader:
+            # Live is down and our entry says so: nothing can change for this daemon
+            return False
+        entries = self._read()
+        if status[0] and self.install_hash not in entries:
+            # Another daemon pruned us or the registry was lost; check in again
+            self._write(status, now)
+            self.reported_at = now
+            entries = self.entries
+        leader = choose_leader(entries, now)
+        is_leader = leader == self.install_hash
+        self.leader = leader
+        if is_leader != self.is_leader:
+            self.is_leader = is_leader
+            self.on_change(is_leader)
+        return is_leader
@@ -0,0 +1,313 @@
+import mmap
+import os
+import queue
+import threading
+
+LEVELS = ("all", "warning", "error")
+PAGE_LINES = 500          # lines loaded on open, on filter change and per "earlier" page
+SCAN_CHUNK = 4 << 20      # bytes mapped per step when scanning backwards
+MAX_READ = 1 << 20        # bytes read per poll while catching up on a fast-growing file
+
+def line_level(line):
+    """'error', 'warning' or 'info' - the daemon and FauxMIDI log with emoji rather than levels"""
+    lowered = line.lower()
+    if "❌" in line or "error" in lowered or "traceback" in lowered or "exception" in lowered:
+        return "error"
+    if "⚠️" in line or "warning" in lowered or "failed" in lowered:
+        return "warning"
+    return "info"
+
+class LineFilter:
+    """Minimum level plus a case-insensitive substring"""
+
+    def __init__(self, level="all", text=""):
+        self.level = level if level in LEVELS else "all"
+        self.text = text.strip().lower()
+
+    @property
+    def passes_everything(self):
+        return self.level == "all" and not self.text
+
+    def __call__(self, line):
+        if self.text and self.text not in line.lower():
+            return False
+        if self.level == "all":
+            return True
+        level = line_level(line)
+        return level == "error" or (self.level == "warning" and level == "warning")
+
+def line_end(path):
+    """Offset just past the last complete line - where tailing starts"""
+    try:
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0:
+                return 0
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return mm.rfind(b"\n") + 1
+    except (OSError, ValueError):
+        return 0
+
+def read_before(path, end, want, line_filter=None, cancelled=None):
+    """Up to `want` matching lines that end before byte offset `end`, oldest first.
+
+    Returns (start, lines) where start is the offset of the oldest line returned,
+    or of the oldest line scanned if fewer than `want` matched. The file is
+    memory-mapped and scanned backwards in chunks, so paging up through a large
+    log costs the same as paging the end of a small one.
+    """
+    if line_filter is not None and line_filter.passes_everything:
+        line_filter = None
+    found = []
+    try:
+        f = open(path, "rb")
+    except OSError:
+        return 0, found
+    with f:
+        size = os.fstat(f.fileno()).st_size
+        end = min(end, size)
+        if end <= 0:
+            return 0, found
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            pos = end
+            while pos > 0 and len(found) < want:
+                if cancelled is not None and cancelled():
+                    break
+                lo = max(0, pos - SCAN_CHUNK)
+                if lo:
+                    # Start the chunk on a line boundary; a line longer than a chunk widens it
+                    cut = mm.rfind(b"\n", lo, pos - 1)
+                    if cut == -1:
+                        cut = mm.rfind(b"\n", 0, pos - 1)
+                    lo = cut + 1
+                segment = mm[lo:pos]
+                if segment.endswith(b"\n"):
+                    segment = segment[:-1]
+                batch = []
+                cursor = lo + len(segment)
+                for raw in reversed(segment.split(b"\n")):
+                    start = cursor - len(raw)
+                    cursor = start - 1
+                    line = raw.decode("utf-8", "replace")
+                    if line_filter is None or line_filter(line):
+                        batch.append(line)
+                        if len(found) + len(batch) >= want:
+                            lo = start
+                            break
+                batch.reverse()
+                found[:0] = batch
+                pos = lo
+    return pos, found
+
+def skip_lines(path, start, count, line_filter=None):
+    """Offset after the next `count` matching lines from `start`"""
+    if line_filter is not None and line_filter.passes_everything:
+        line_filter = None
+    try:
+        f = open(path, "rb")
+    except OSError:
+        return start
+    with f:
+        size = os.fstat(f.fileno()).st_size
+        if start >= size:
+            return start
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            pos = start
+            while count > 0 and pos < size:
+                newline = mm.find(b"\n", pos)
+                if newline == -1:
+                    break
+                if line_filter is None or line_filter(mm[pos:newline].decode("utf-8", "replace")):
+                    count -= 1
+                pos = newline + 1
+            return pos
+
+class LogTailer:
+    """Follows one file from a byte offset; never re-reads what it has already returned.
+
+    detect_rewrites also treats a changed mtime at an unchanged size as the file
+    being rewritten in place. Only the state file is written that way; for an
+    append-only log it would re-read everything after a mere touch.
+    """
+
+    def __init__(self, path, offset=0, detect_rewrites=False):
+        self.path = path
+        self.offset = offset
+        self.detect_rewrites = detect_rewrites
+        self.file = None
+        self.inode = None
+        self.mtime_ns = None
+        self.partial = b""
+        self.restarting = False
+
+    def restart(self):
+        """Read the file again from the start on the next poll (reported as a reset)"""
+        self.offset = 0
+        self.partial = b""
+        self.restarting = True
+
+    def close(self):
+        if self.file:
+            self.file.close()
+        self.file = None
+
+    def _read_new(self, limit):
+        self.file.seek(self.offset)
+        data = self.file.read(limit)
+        self.offset += len(data)
+        return data
+
+    def poll(self):
+        """(new complete lines, reset) - reset means the file was rotated or truncated"""
+        data, reset = self.poll_bytes()
+        if not data:
+            return [], reset
+        return data[:-1].decode("utf-8", "replace").split("\n"), reset
+
+    def poll_bytes(self):
+        """(new complete lines as one bytes buffer ending in a newline, reset)"""
+        reset, self.restarting = self.restarting, False
+        chunks = []
+        carried = b""
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            st = None
+
+        if self.file is not None and (st is None or st.st_ino != self.inode):
+            # Rotated or deleted: finish what was written to the old file, then start the new one from 0
+            carried = self._complete([self._read_new(MAX_READ)])
+            if self.partial:
+                carried += self.partial + b"\n"
+                self.partial = b""
+            self.close()
+            self.offset = 0
+            reset = st is not None
+        if st is None:
+            return carried, reset
+
+        if self.file is None:
+            try:
+                self.file = open(self.path, "rb")
+            except OSError:
+                return carried, reset
+            self.inode = os.fstat(self.file.fileno()).st_ino
+        modified = self.detect_rewrites and self.mtime_ns is not None and st.st_mtime_ns != self.mtime_ns
+        self.mtime_ns = st.st_mtime_ns
+        if st.st_size < self.offset or (modified and st.st_size == self.offset and not self.partial):
+            # Truncated or rewritten in place (e.g. the user cleared the log)
+            self.offset = 0
+            self.partial = b""
+            reset = True
+        if st.st_size > self.offset:
+            chunks.append(self._read_new(min(MAX_READ, st.st_size - self.offset)))
+        return carried + self._complete(chunks), reset
+
+    @property
+    def behind(self):
+        """True while a large backlog is being read MAX_READ at a time"""
+        try:
+            return os.stat(self.path).st_size > self.offset
+        except OSError:
+            return False
+
+    def _complete(self, chunks):
+        """Everything up to the last newline; the unfinished line waits for the next poll"""
+        if not chunks:
+            return b""
+        data = self.partial + b"".join(chunks)
+        cut = data.rfind(b"\n") + 1
+        self.partial = data[cut:]
+        return data[:cut]
+
+class LogView:
+    """Background worker behind the GUI log panel: tails, filters and pages one file.
+
+    The Tk side only posts commands and drains `results`, which holds
+    ("reset", lines, has_more), ("append", lines) and ("prepend", lines, has_more);
+    it calls trimmed() when it drops lines from the top of the widget.
+    """
+
+    def __init__(self, path, interval=0.5):
+        self.interval = interval
+        self.commands = queue.Queue()
+        self.results = queue.Queue()
+        self.filter = LineFilter()
+        self.path = None
+        self.tailer = None
+        self.start = 0
+        self.closed = False
+        self.commands.put(("open", path))
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def open(self, path):
+        self.commands.put(("open", path))
+
+    def set_filter(self, level, text):
+        self.commands.put(("filter", LineFilter(level, text)))
+
+    def load_earlier(self):
+        self.commands.put(("earlier",))
+
+    def trimmed(self, count):
+        """The panel dropped its oldest `count` lines; page back to them next time"""
+        self.commands.put(("trim", count))
+
+    def close(self):
+        self.closed = True
+        self.commands.put(("close",))
+
+    def _superseded(self):
+        # A newer command makes the scan in progress pointless
+        return self.closed or not self.commands.empty()
+
+    def _reload(self):
+        # The view shows the last page of matching lines; tailing continues from the last full line
+        if self.tailer:
+            self.tailer.close()
+        end = line_end(self.path)
+        self.tailer = LogTailer(self.path, end)
+        self.start, lines = read_before(self.path, end, PAGE_LINES, self.filter, self._superseded)
+        if not self._superseded():
+            self.results.put(("reset", lines, self.start > 0))
+
+    def _handle(self, command):
+        if command[0] == "open":
+            self.path = command[1]
+            self._reload()
+        elif command[0] == "filter":
+            self.filter = command[1]
+            self._reload()
+        elif command[0] == "earlier" and self.start > 0:
+            start, lines = read_before(self.path, self.start, PAGE_LINES, self.filter, self._superseded)
+            if not self._superseded():
+                self.start = start
+                self.results.put(("prepend", lines, start > 0))
+        elif command[0] == "trim":
+            self.start = skip_lines(self.path, self.start, command[1], self.filter)
+
+    def _run(self):
+        while not self.closed:
+            try:
+                command = self.commands.get(timeout=0 if self.tailer and self.tailer.behind else self.interval)
+            except queue.Empty:
+                command = None
+            try:
+                if command is not None:
+                    if command[0] == "close":
+                        break
+                    self._handle(command)
+                    continue
+                lines, reset = self.tailer.poll()
+                if reset:
+                    self.start = 0
+                    self.results.put(("reset", [line for line in lines if self.filter(line)], False))
+                elif lines:
+                    lines = [line for line in lines if self.filter(line)]
+                    if lines:
+                        self.results.put(("append", lines))
+            except Exception as e:
+                print(f"⚠️  Log viewer error: {e}")
+        if self.tailer:
+            self.tailer.close()
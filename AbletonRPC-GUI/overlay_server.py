@@ -0,0 +1,225 @@
+import asyncio
+import base64
+import hashlib
+import json
+import struct
+import threading
+
+# Localhost push endpoint for stream overlays (OBS browser sources and the like):
+#   GET /events  Server-Sent Events
+#   GET /ws      WebSocket (text frames)
+#   GET /        a minimal overlay page using /events
+# Every client gets {"type": "full", "state": {...}} on connect, then
+# {"type": "diff", "changes": {...}} with only the keys that changed (null = removed).
+DEFAULT_PORT = 47475
+KEEPALIVE = 15        # seconds between SSE comments / WebSocket pings on an idle connection
+SLOW_CLIENT = 10      # a client whose socket has not drained for this long is dropped
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+OVERLAY_PAGE = """<!doctype html>
+<meta charset="utf-8">
+<style>
+  body { margin: 0; font: 600 28px/1.3 -apple-system, Helvetica, sans-serif; color: #fff;
+         text-shadow: 0 2px 4px #000; background: transparent; }
+  #sub { font-size: 20px; opacity: .85; }
+</style>
+<div id="project"></div><div id="sub"></div>
+<script>
+  let state = {};
+  const show = () => {
+    document.getElementById("project").textContent = state.running ? state.project || "" : "";
+    document.getElementById("sub").textContent = state.running
+      ? [state.state, state.tempo && state.tempo + " BPM", state.key].filter(Boolean).join(" · ") : "";
+  };
+  new EventSource("/events").onmessage = (e) => {
+    const msg = JSON.parse(e.data);
+    if (msg.type === "full") state = msg.state;
+    else for (const [k, v] of Object.entries(msg.changes)) { if (v === null) delete state[k]; else state[k] = v; }
+    show();
+  };
+</script>
+"""
+
+def diff_state(old, new):
+    """Keys whose value changed, with None for keys that disappeared"""
+    changes = {key: value for key, value in new.items() if old.get(key) != value}
+    changes.update({key: None for key in old if key not in new})
+    return changes
+
+class _Client:
+    """One connected overlay; unsent diffs merge so a slow reader only ever gets the newest values"""
+
+    def __init__(self, writer, framing):
+        self.writer = writer
+        self.framing = framing       # "sse" or "ws"
+        self.pending = None
+        self.wakeup = asyncio.Event()
+        self.closed = False
+
+    def offer(self, changes):
+        if self.pending is None:
+            self.pending = dict(changes)
+        else:
+            # Stale intermediate values are dropped here rather than queued behind a slow socket
+            self.pending.update(changes)
+        self.wakeup.set()
+
+    def encode(self, message):
+        data = json.dumps(message, separators=(",", ":"))
+        if self.framing == "sse":
+            return f"data: {data}\n\n".encode("utf-8")
+        return _ws_frame(0x1, data.encode("utf-8"))
+
+    def keepalive(self):
+        return b": keepalive\n\n" if self.framing == "sse" else _ws_frame(0x9, b"")
+
+def _ws_frame(opcode, payload):
+    header = bytes([0x80 | opcode])
+    size = len(payload)
+    if size < 126:
+        header += bytes([size])
+    elif size < 1 << 16:
+        header += bytes([126]) + struct.pack("!H", size)
+    else:
+        header += bytes([127]) + struct.pack("!Q", size)
+    return header + payload
+
+class OverlayServer:
+    """Fans the daemon's state out to overlay clients from one asyncio loop on its own thread"""
+
+    def __init__(self, port=DEFAULT_PORT, host="127.0.0.1"):
+        self.host = host
+        self.port = port
+        self.state = {}
+        self.clients = set()
+        self.loop = None
+        self.server = None
+        self.started = threading.Event()
+        self.error = None
+
+    def start(self):
+        threading.Thread(target=self._thread, name="overlay server", daemon=True).start()
+        self.started.wait(5)
+        if self.error:
+            raise self.error
+        print(f"🎥 Overlay endpoint on http://{self.host}:{self.port}/ (SSE /events, WebSocket /ws)")
+
+    def publish(self, state):
+        """Thread-safe: hand the loop a copy of the latest state"""
+        if self.loop:
+            self.loop.call_soon_threadsafe(self._publish, dict(state))
+
+    def _thread(self):
+        self.loop = asyncio.new_event_loop()
+        try:
+            self.server = self.loop.run_until_complete(
+                asyncio.start_server(self._handle, self.host, self.port))
+            self.port = self.server.sockets[0].getsockname()[1]
+        except OSError as e:
+            self.error = e
+            self.loop = None
+            self.started.set()
+            return
+        self.started.set()
+        self.loop.run_forever()
+
+    def _publish(self, state):
+        changes = diff_state(self.state, state)
+        if not changes:
+            return
+        self.state = state
+        for client in self.clients:
+            client.offer(changes)
+
+    async def _handle(self, reader, writer):
+        try:
+            request = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), 10)
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            writer.close()
+            return
+        lines = request.decode("latin-1").split("\r\n")
+        parts = lines[0].split()
+        path = parts[1].split("?")[0] if len(parts) >= 2 else ""
+        headers = {}
+        for line in lines[1:]:
+            key, sep, value = line.partition(":")
+            if sep:
+                headers[key.strip().lower()] = value.strip()
+
+        if path == "/ws" and headers.get("upgrade", "").lower() == "websocket" and "sec-websocket-key" in headers:
+            accept = base64.b64encode(hashlib.sha1((headers["sec-websocket-key"] + WS_GUID).encode()).digest())
+            writer.write(b"HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                         b"Sec-WebSocket-Accept: " + accept + b"\r\n\r\n")
+            await self._stream(_Client(writer, "ws"), reader)
+        elif path == "/events":
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\nCache-Control: no-cache\r\n"
+                         b"Access-Control-Allow-Origin: *\r\nConnection: keep-alive\r\n\r\n")
+            await self._stream(_Client(writer, "sse"), reader)
+        elif path in ("/", "/index.html"):
+            body = OVERLAY_PAGE.encode("utf-8")
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/html; charset=utf-8\r\n"
+                         b"Content-Length: " + str(len(body)).encode() + b"\r\nConnection: close\r\n\r\n" + body)
+            await self._close(writer)
+        else:
+            writer.write(b"HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+            await self._close(writer)
+
+    async def _stream(self, client, reader):
+        self.clients.add(client)
+        watcher = asyncio.ensure_future(self._watch(client, reader))
+        try:
+            client.writer.write(client.encode({"type": "full", "state": self.state}))
+            await asyncio.wait_for(client.writer.drain(), SLOW_CLIENT)
+            while not client.closed:
+                try:
+                    await asyncio.wait_for(client.wakeup.wait(), KEEPALIVE)
+                except asyncio.TimeoutError:
+                    client.writer.write(client.keepalive())
+                    await asyncio.wait_for(client.writer.drain(), SLOW_CLIENT)
+                    continue
+                client.wakeup.clear()
+                changes, client.pending = client.pending, None
+                if changes:
+                    client.writer.write(client.encode({"type": "diff", "changes": changes}))
+                    # Backpressure: while this waits, newer diffs merge into client.pending
+                    await asyncio.wait_for(client.writer.drain(), SLOW_CLIENT)
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            self.clients.discard(client)
+            watcher.cancel()
+            await self._close(client.writer)
+
+    async def _watch(self, client, reader):
+        """Notice disconnects; for WebSockets also answer pings and honour close frames"""
+        try:
+            while True:
+                if client.framing == "sse":
+                    if not await reader.read(1024):
+                        break
+                    continue
+                head = await reader.readexactly(2)
+                opcode, size = head[0] & 0x0F, head[1] & 0x7F
+                if size == 126:
+                    size = struct.unpack("!H", await reader.readexactly(2))[0]
+                elif size == 127:
+                    size = struct.unpack("!Q", await reader.readexactly(8))[0]
+                mask = await reader.readexactly(4) if head[1] & 0x80 else b"\0\0\0\0"
+                payload = bytes(b ^ mask[i % 4] for i, b in enumerate(await reader.readexactly(size)))
+                if opcode == 0x8:
+                    client.writer.write(_ws_frame(0x8, payload[:2]))
+                    break
+                if opcode == 0x9:
+                    client.writer.write(_ws_frame(0xA, payload))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        client.closed = True
+        client.wakeup.set()
+
+    @staticmethod
+    async def _close(writer):
+        try:
+            writer.close()
+            await writer.wait_closed()
+        except (ConnectionError, OSError):
+            pass
@@ -0,0 +1,119 @@
+import time
+from string import Formatter
+
+# --- TEMPLATE SETTINGS ---
+TEMPLATE_KEYS = ("details", "state", "large_text", "small_image")
+TEMPLATE_FIELDS = ("project", "tempo", "state", "elapsed", "installation", "tracks", "plugins", "key",
+                   "cpu", "cpu_peak")
+
+# Context values arrive as text; numeric format specs like {tempo:.0f} convert these first
+NUMERIC_FIELDS = ("tempo", "tracks", "plugins", "cpu", "cpu_peak")
+NUMERIC_TYPES = "bcdoxXeEfFgGn%"
+# Trial render at compile time, so a bad format spec is caught when the config loads
+SAMPLE_CONTEXT = {"project": "Demo Set", "tempo": "120", "state": "Playing", "elapsed": "12m",
+                  "installation": "Live 12 Suite", "tracks": 8, "plugins": 3, "key": "A minor",
+                  "cpu": "12", "cpu_peak": "30"}
+
+DEFAULT_TEMPLATES = {
+    "details": "{installation}: {project}",
+    "state": "{state} · {tempo} BPM",
+    "large_text": "",
+    "small_image": "",
+}
+
+def format_elapsed(start_time, now=None):
+    """Minute-resolution session length, e.g. '12m' or '1h 05m'"""
+    minutes = max(0, int((now or time.time()) - start_time)) // 60
+    if minutes < 60:
+        return f"{minutes}m"
+    return f"{minutes // 60}h {minutes % 60:02d}m"
+
+def format_number(value, spec):
+    """format() for a numeric spec; a missing or non-numeric value renders empty instead of raising"""
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return ""
+    return format(int(number) if spec[-1] in "bcdoxX" else number, spec)
+
+class CompiledTemplate:
+    """A presence template parsed once into a render function"""
+
+    def __init__(self, source, fields=TEMPLATE_FIELDS):
+        self.source = source
+        self.fields = ()
+        self._render = None
+        self._last_key = None
+        self._last_value = None
+        self._compile(source, fields)
+
+    def _compile(self, source, known_fields):
+        fields = []
+        parts = []
+        for literal, field, spec, conversion in Formatter().parse(source):
+            if literal:
+                parts.append(repr(literal))
+            if field is None:
+                continue
+            if field not in known_fields:
+                raise ValueError(f"Unknown template field '{{{field}}}' (expected one of: {', '.join(known_fields)})")
+            if field not in fields:
+                fields.append(field)
+            arg = f"v{fields.index(field)}"
+            if conversion == "r":
+                arg = f"repr({arg})"
+            elif conversion in ("s", "a"):
+                arg = f"{'ascii' if conversion == 'a' else 'str'}({arg})"
+            if not conversion and field in NUMERIC_FIELDS and spec[-1:] and spec[-1] in NUMERIC_TYPES:
+                parts.append(f"format_number({arg}, {spec!r})")
+            else:
+                parts.append(f"format({arg}, {spec!r})")
+
+        self.fields = tuple(fields)
+        body = " + ".join(parts) if parts else "''"
+        args = ", ".join(f"v{i}" for i in range(len(fields)))
+        self._render = eval(compile(f"lambda {args}: {body}", f"<template {source!r}>", "eval"), {"__builtins__": {"format": format, "repr": repr, "str": str, "ascii": ascii}, "format_number": format_number})
+        try:
+            self.render(SAMPLE_CONTEXT)
+        except (ValueError, TypeError, KeyError, IndexError) as e:
+            raise ValueError(f"Template can't be rendered: {e}") from None
+        finally:
+            self._last_key = self._last_value = None
+
+    def render(self, context):
+        key = tuple(context.get(field, "") for field in self.fields)
+        if key != self._last_key or self._last_value is None:
+            self._last_value = self._render(*key)
+            self._last_key = key
+        return self._last_value
+
+class PresenceTemplates:
+    """The set of compiled templates for one installation"""
+
+    def __init__(self, overrides=None, defaults=DEFAULT_TEMPLATES):
+        self.templates = {}
+        self.defaults = defaults
+        for key in TEMPLATE_KEYS:
+            source = (overrides or {}).get(key, defaults.get(key, ""))
+            try:
+                self.templates[key] = CompiledTemplate(source)
+            except ValueError as e:
+                print(f"⚠️  Invalid {key} template {source!r}: {e} - using default")
+                self.templates[key] = CompiledTemplate(defaults.get(key, ""))
+        # All fields referenced by any template
+        self.fields = frozenset(field for template in self.templates.values() for field in template.fields)
+
+    def render(self, context):
+        """Render to pypresence keyword arguments, dropping empty entries"""
+        activity = {}
+        for key, template in self.templates.items():
+            try:
+                value = template.render(context)
+            except (ValueError, TypeError) as e:
+                # Values the trial render didn't anticipate; never let one template stop presence
+                print(f"⚠️  {key} template {template.source!r} failed: {e} - using default")
+                template = self.templates[key] = CompiledTemplate(self.defaults.get(key, ""))
+                value = template.render(context)
+            if value:
+                activity[key] = value
+        return activity
@@ -0,0 +1,130 @@
+import os
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from als_metadata import extract_metadata
+from checkpoint import atomic_write_json
+
+HOME = os.environ.get("HOME", str(Path.home()))
+INDEX_PATH = Path(HOME) / ".config" / "ableton-discord-rpc" / "project-index.json"
+INDEX_VERSION = 1
+SKIP_DIRS = {"Backup", "Ableton Project Info", "Samples"}
+
+def find_sets(roots):
+    """Yield every .als under the given roots, skipping Live's backup folders"""
+    for root in roots:
+        for dirpath, dirnames, filenames in os.walk(os.path.expanduser(root)):
+            dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS and not d.startswith('.')]
+            for filename in filenames:
+                if filename.endswith('.als') and not filename.startswith('._'):
+                    yield os.path.join(dirpath, filename)
+
+def _index_one(path, size, mtime_ns):
+    """Worker: parse one set in a separate process"""
+    meta = extract_metadata(path)
+    meta.update({
+        'size': size,
+        'mtime_ns': mtime_ns,
+        'last_saved': mtime_ns / 1e9,
+    })
+    return path, meta
+
+def load_index(index_path=INDEX_PATH):
+    try:
+        with open(index_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get('version') == INDEX_VERSION:
+            return data
+    except (OSError, ValueError, AttributeError):
+        pass
+    return {'version': INDEX_VERSION, 'roots': [], 'projects': {}}
+
+def update_index(roots, index_path=INDEX_PATH, workers=None):
+    """Re-parse only sets whose size or mtime changed, across all cores"""
+    started = time.time()
+    index = load_index(index_path)
+    old_projects = index.get('projects', {})
+    projects = {}
+    pending = []
+
+    for path in find_sets(roots):
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        entry = old_projects.get(path)
+        if entry and entry.get('size') == st.st_size and entry.get('mtime_ns') == st.st_mtime_ns:
+            projects[path] = entry
+        else:
+            pending.append((path, st.st_size, st.st_mtime_ns))
+
+    failed = 0
+    if pending:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(_index_one, *job): job[0] for job in pending}
+            for future in as_completed(futures):
+                try:
+                    path, meta = future.result()
+                    projects[path] = meta
+                except Exception as e:
+                    failed += 1
+                    print(f"⚠️  Could not index {futures[future]}: {e}")
+
+    index = {'version': INDEX_VERSION, 'roots': list(roots), 'updated_at': time.time(), 'projects': projects}
+    atomic_write_json(index_path, index)
+    stats = {
+        'total': len(projects),
+        'parsed': len(pending) - failed,
+        'reused': len(projects) - (len(pending) - failed),
+        'removed': len(set(old_projects) - set(projects)),
+        'failed': failed,
+        'seconds': round(time.time() - started, 2),
+    }
+    print(f"🗂️  Indexed {stats['total']} sets ({stats['parsed']} parsed, {stats['reused']} unchanged, "
+          f"{stats['removed']} removed, {stats['failed']} failed) in {stats['seconds']}s")
+    return stats
+
+class ProjectIndex:
+    """Read side of the index used by the daemon; reloads when the file changes"""
+
+    def __init__(self, index_path=INDEX_PATH):
+        self.index_path = index_path
+        self.index_mtime = None
+        self.projects = {}
+        self.by_name = {}
+
+    def _refresh(self):
+        try:
+            mtime = os.path.getmtime(self.index_path)
+        except OSError:
+            self.projects, self.by_name, self.index_mtime = {}, {}, None
+            return
+        if mtime == self.index_mtime:
+            return
+        self.index_mtime = mtime
+        self.projects = load_index(self.index_path).get('projects', {})
+        self.by_name = {}
+        # Newest save wins when several sets share a name
+        for path, entry in sorted(self.projects.items(), key=lambda item: item[1].get('mtime_ns', 0)):
+            self.by_name[Path(path).stem] = entry
+
+    def lookup(self, path):
+        """Entry for an exact path, only if the file is unchanged since indexing"""
+        self._refresh()
+        entry = self.projects.get(path)
+        if not entry:
+            return None
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        if entry.get('size') != st.st_size or entry.get('mtime_ns') != st.st_mtime_ns:
+            return None
+        return entry
+
+    def find_by_name(self, name):
+        """Most recently saved entry whose file name matches a project name"""
+        self._refresh()
+        return self.by_name.get(name)
@@ -0,0 +1,461 @@
+import hmac
+import json
+import random
+import select
+import socket
+import struct
+import sys
+import threading
+import time
+
+# Wire format, network byte order:
+#   frame  = "AR" <version:u8> <type:u8> <length:u32> <payload>
+#   HELLO  = machine name (utf-8), then NUL and the shared token when one is configured
+#   BATCH  = <count:u16> then per source:
+#              <len:u8><source id> <seq:u32> <flags:u8> <nfields:u8>
+#              then per field: <field:u8> <len:u16> <utf-8 value>   (len 0xFFFF = field removed)
+#   QUERY  = the shared token (may be empty); the aggregator answers with STATE = combined state as JSON
+#   DENIED = reason (utf-8); the aggregator sends it before hanging up on a wrong or missing token
+# A BATCH entry flagged FULL replaces the source's state; otherwise it is a delta.
+RELAY_VERSION = 1
+DEFAULT_PORT = 47474
+HEADER = struct.Struct("!2sBBI")
+MAGIC = b"AR"
+HELLO, BATCH, QUERY, STATE, DENIED = 1, 2, 3, 4, 5
+FLAG_FULL = 1
+REMOVED = 0xFFFF
+MAX_FRAME = 1 << 20
+
+FIELDS = ("running", "details", "state", "large_text", "small_image", "start", "installation")
+FIELD_IDS = {name: i for i, name in enumerate(FIELDS)}
+
+BATCH_INTERVAL = 0.25   # sender coalesces changes for this long before a frame goes out
+RECONNECT_MAX = 30      # seconds between reconnect attempts, at most
+MACHINE_GRACE = 15      # aggregator keeps a disconnected machine's state this long
+KEEPALIVE = 5           # an idle sender sends an empty batch this often to notice dead links
+
+class RelayError(ValueError):
+    pass
+
+def encode_frame(frame_type, payload=b""):
+    return HEADER.pack(MAGIC, RELAY_VERSION, frame_type, len(payload)) + payload
+
+def read_frame(sock):
+    """(type, payload) of the next frame; raises ConnectionError at EOF"""
+    magic, version, frame_type, length = HEADER.unpack(_recv_exact(sock, HEADER.size))
+    if magic != MAGIC or version != RELAY_VERSION or length > MAX_FRAME:
+        raise RelayError(f"bad relay frame header {magic!r} v{version} len {length}")
+    return frame_type, _recv_exact(sock, length)
+
+def _recv_exact(sock, size):
+    buf = bytearray()
+    while len(buf) < size:
+        chunk = sock.recv(size - len(buf))
+        if not chunk:
+            raise ConnectionError("relay peer closed the connection")
+        buf += chunk
+    return bytes(buf)
+
+def token_matches(expected, given):
+    """Constant-time token check; an aggregator without a token accepts everyone"""
+    if not expected:
+        return True
+    return hmac.compare_digest(expected.encode("utf-8"), given)
+
+def encode_batch(entries):
+    """entries: [(source, seq, full, {field: value or None})] -> BATCH payload"""
+    out = [struct.pack("!H", len(entries))]
+    for source, seq, full, fields in entries:
+        source_bytes = source.encode("utf-8")[:255]
+        out.append(struct.pack("!B", len(source_bytes)) + source_bytes)
+        known = [(FIELD_IDS[name], value) for name, value in fields.items() if name in FIELD_IDS]
+        out.append(struct.pack("!IBB", seq, FLAG_FULL if full else 0, len(known)))
+        for field_id, value in known:
+            if value is None:
+                out.append(struct.pack("!BH", field_id, REMOVED))
+            else:
+                data = str(value).encode("utf-8")[:REMOVED - 1]
+                out.append(struct.pack("!BH", field_id, len(data)) + data)
+    return b"".join(out)
+
+def decode_batch(payload):
+    entries = []
+    try:
+        (count,), pos = struct.unpack_from("!H", payload), 2
+        for _ in range(count):
+            size = payload[pos]
+            source = payload[pos + 1:pos + 1 + size].decode("utf-8")
+            pos += 1 + size
+            seq, flags, nfields = struct.unpack_from("!IBB", payload, pos)
+            pos += 6
+            fields = {}
+            for _ in range(nfields):
+                field_id, size = struct.unpack_from("!BH", payload, pos)
+                pos += 3
+                if size == REMOVED:
+                    value = None
+                else:
+                    value = payload[pos:pos + size].decode("utf-8")
+                    pos += size
+                if field_id < len(FIELDS):
+                    fields[FIELDS[field_id]] = value
+            entries.append((source, seq, bool(flags & FLAG_FULL), fields))
+    except (struct.error, IndexError, UnicodeDecodeError) as e:
+        raise RelayError(f"malformed relay batch: {e}")
+    return entries
+
+def activity_fields(activity, running, installation, start):
+    """Daemon state -> relay fields (all strings; None removes a field)"""
+    activity = activity or {}
+    fields = {name: activity.get(name) for name in ("details", "state", "large_text", "small_image")}
+    fields.update(running="1" if running else "0", installation=installation,
+                  start=str(start) if start else None)
+    return fields
+
+def combine(machines):
+    """One presence for the whole studio from {(machine, source): fields} - None when nothing is live"""
+    live = [(entry["changed"], key, entry["fields"]) for key, entry in machines.items()
+            if entry["fields"].get("running") == "1"]
+    if not live:
+        return None
+    live.sort(reverse=True)
+    _, (machine, _), primary = live[0]
+    activity = {k: primary[k] for k in ("details", "state", "large_text", "small_image") if primary.get(k)}
+    names = sorted({key[0] for _, key, _ in live})
+    if len(names) > 1:
+        activity["large_text"] = f"{len(names)} machines in session: {', '.join(names)}"
+    else:
+        activity["large_text"] = activity.get("large_text") or machine
+    starts = [int(fields["start"]) for _, _, fields in live if (fields.get("start") or "").isdigit()]
+    if starts:
+        activity["start"] = min(starts)
+    return activity
+
+class RelaySender:
+    """Streams one daemon's presence to the aggregator as batched deltas; reconnects on its own"""
+
+    def __init__(self, host, port, machine, source, token=None):
+        self.address = (host, int(port))
+        self.machine = machine
+        self.source = source
+        self.token = token
+        self.state = {}        # everything the aggregator should know
+        self.dirty = {}        # fields changed since the last frame
+        self.seq = 0
+        self.cond = threading.Condition()
+        self.connected = False
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def publish(self, fields):
+        """Record the daemon's current fields; only differences go on the wire"""
+        with self.cond:
+            for name, value in fields.items():
+                if self.state.get(name) != value:
+                    self.dirty[name] = value
+                    if value is None:
+                        self.state.pop(name, None)
+                    else:
+                        self.state[name] = value
+            if self.dirty:
+                self.cond.notify()
+
+    def _run(self):
+        delay = 1
+        while True:
+            try:
+                with socket.create_connection(self.address, timeout=5) as sock:
+                    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                    hello = self.machine.encode("utf-8")
+                    if self.token:
+                        hello += b"\0" + self.token.encode("utf-8")
+                    sock.sendall(encode_frame(HELLO, hello))
+                    with self.cond:
+                        # The aggregator may have lost us: always resync with a full snapshot
+                        self.seq += 1
+                        snapshot = encode_batch([(self.source, self.seq, True, dict(self.state))])
+                        self.dirty = {}
+                    sock.sendall(encode_frame(BATCH, snapshot))
+                    if not self.connected:
+                        print(f"🔗 Relay connected to {self.address[0]}:{self.address[1]}")
+                    self.connected = True
+                    delay = 1
+                    self._stream(sock)
+            except RelayError as e:
+                print(f"❌ Relay refused by {self.address[0]}:{self.address[1]}: {e}")
+                self.connected = False
+            except OSError as e:
+                if self.connected:
+                    print(f"⚠️  Relay connection lost: {e}")
+                self.connected = False
+            time.sleep(delay)
+            delay = min(delay * 2, RECONNECT_MAX)
+
+    def _stream(self, sock):
+        while True:
+            with self.cond:
+                if not self.dirty:
+                    self.cond.wait(KEEPALIVE)
+                idle = not self.dirty
+            if idle:
+                self._send(sock, encode_batch([]))
+                continue
+            # Let a burst of changes land in one frame
+            time.sleep(BATCH_INTERVAL)
+            with self.cond:
+                self.seq += 1
+                payload = encode_batch([(self.source, self.seq, False, self.dirty)])
+                self.dirty = {}
+            self._send(sock, payload)
+
+    @staticmethod
+    def _check_alive(sock):
+        # The aggregator only writes to us to refuse the token, so a readable socket means it hung up;
+        # reconnecting now resyncs pending changes instead of losing them in a dead socket
+        if select.select([sock], [], [], 0)[0]:
+            try:
+                frame_type, payload = read_frame(sock)
+            except (OSError, RelayError):
+                frame_type = None
+            if frame_type == DENIED:
+                raise RelayError(payload.decode("utf-8", "replace"))
+            raise ConnectionResetError("aggregator closed the connection")
+
+    def _send(self, sock, payload):
+        self._check_alive(sock)
+        sock.sendall(encode_frame(BATCH, payload))
+
+class RelayAggregator:
+    """Accepts relay senders, merges their state and reports combined presence changes"""
+
+    def __init__(self, port=DEFAULT_PORT, on_change=None, host="", token=None):
+        self.address = (host, int(port))
+        self.on_change = on_change
+        self.token = token
+        self.machines = {}     # (machine, source) -> {"fields", "changed", "seq", "connected", "lost_at", "conn"}
+        self.lock = threading.Lock()
+        self.sock = None
+        self.combined = None
+
+    def start(self):
+        self.sock = socket.create_server(self.address)
+        self.address = self.sock.getsockname()[:2]
+        threading.Thread(target=self._serve, daemon=True).start()
+        threading.Thread(target=self._expire, daemon=True).start()
+        print(f"📡 Relay aggregator listening on port {self.address[1]}"
+              + ("" if self.token else " (no token: any machine on the network can relay)"))
+
+    def close(self):
+        sock, self.sock = self.sock, None
+        if sock:
+            # shutdown() wakes the accept() in _serve; close() alone leaves the port bound
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            sock.close()
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                "combined": self.combined,
+                "machines": {f"{machine}/{source}": dict(entry["fields"], connected=entry["connected"])
+                             for (machine, source), entry in self.machines.items()},
+            }
+
+    def _serve(self):
+        while self.sock:
+            try:
+                conn, peer = self.sock.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._handle, args=(conn, peer), daemon=True).start()
+
+    def _handle(self, conn, peer):
+        machine = None
+        keys = set()
+        # Senders send at least a keepalive every KEEPALIVE seconds; silence means the machine is gone
+        conn.settimeout(KEEPALIVE * 3)
+        try:
+            with conn:
+                while True:
+                    frame_type, payload = read_frame(conn)
+                    if frame_type == HELLO:
+                        name, _, token = payload.partition(b"\0")
+                        if not token_matches(self.token, token):
+                            self._deny(conn, peer, "machine")
+                            return
+                        machine = name.decode("utf-8", "replace") or peer[0]
+                    elif frame_type == BATCH and machine is not None:
+                        keys.update(self._apply(machine, decode_batch(payload), conn))
+                    elif frame_type == QUERY:
+                        if not token_matches(self.token, payload):
+                            self._deny(conn, peer, "query")
+                            return
+                        conn.sendall(encode_frame(STATE, json.dumps(self.snapshot()).encode("utf-8")))
+                        return
+                    else:
+                        raise RelayError(f"unexpected frame type {frame_type}")
+        except (OSError, RelayError) as e:
+            if machine:
+                print(f"⚠️  Relay from {machine} dropped: {e}")
+        finally:
+            with self.lock:
+                for key in keys:
+                    entry = self.machines.get(key)
+                    if entry and entry["conn"] is conn:
+                        entry["connected"] = False
+                        entry["lost_at"] = time.time()
+
+    @staticmethod
+    def _deny(conn, peer, what):
+        print(f"🚫 Relay {what} from {peer[0]} refused: wrong or missing token")
+        conn.sendall(encode_frame(DENIED, b"wrong or missing relay token"))
+
+    def _apply(self, machine, entries, conn):
+        keys = []
+        with self.lock:
+            for source, seq, full, fields in entries:
+                key = (machine, source)
+                entry = self.machines.get(key)
+                if entry is None:
+                    entry = self.machines[key] = {"fields": {}, "changed": 0}
+                merged = {} if full else dict(entry["fields"])
+                for name, value in fields.items():
+                    if value is None:
+                        merged.pop(name, None)
+                    else:
+                        merged[name] = value
+                if merged != entry["fields"]:
+                    # A resync after a reconnect is not activity; only real changes move "most recent"
+                    entry["fields"] = merged
+                    entry["changed"] = time.time()
+                entry.update(seq=seq, connected=True, lost_at=None, conn=conn)
+                keys.append(key)
+        self._recombine()
+        return keys
+
+    def _expire(self):
+        while self.sock:
+            time.sleep(1)
+            now = time.time()
+            with self.lock:
+                gone = [key for key, entry in self.machines.items()
+                        if not entry["connected"] and now - entry["lost_at"] > MACHINE_GRACE]
+                for key in gone:
+                    del self.machines[key]
+            if gone:
+                print(f"🔌 Relay forgot {', '.join(f'{m}/{s}' for m, s in gone)} (no reconnect)")
+                self._recombine()
+
+    def _recombine(self):
+        with self.lock:
+            combined = combine(self.machines)
+            changed = combined != self.combined
+            self.combined = combined
+        if changed and self.on_change:
+            self.on_change(combined)
+
+def query_aggregator(host, port=DEFAULT_PORT, timeout=2.0, token=None):
+    """Combined studio state from a running aggregator, for local clients"""
+    with socket.create_connection((host, int(port)), timeout=timeout) as sock:
+        sock.sendall(encode_frame(QUERY, (token or "").encode("utf-8")))
+        frame_type, payload = read_frame(sock)
+    if frame_type == DENIED:
+        raise RelayError(payload.decode("utf-8", "replace"))
+    if frame_type != STATE:
+        raise RelayError(f"unexpected reply type {frame_type}")
+    return json.loads(payload.decode("utf-8"))
+
+class FakeMachine:
+    """Stand-in for a remote studio machine: a RelaySender driven by a random session"""
+
+    SETS = ("Night Drive", "Vocal Comp", "Drum Bus Tests", "Film Cue 3", "Untitled")
+
+    def __init__(self, host, port, name, seed=None, token=None):
+        self.random = random.Random(seed)
+        self.sender = RelaySender(host, port, name, "fake", token)
+        self.name = name
+        self.start = int(time.time())
+        self.project = self.random.choice(self.SETS)
+
+    def step(self):
+        roll = self.random.random()
+        if roll < 0.1:
+            self.project = self.random.choice(self.SETS)
+        running = roll > 0.05
+        state = self.random.choice(("Playing", "Stopped", "Recording"))
+        tempo = self.random.choice((90, 120, 128, 140))
+        activity = {"details": self.project, "state": f"{state} · {tempo} BPM", "large_text": self.name}
+        self.sender.publish(activity_fields(activity, running, self.name, self.start))
+
+def _demo(machines=3, seconds=10, port=0, token="demo-token"):
+    """Aggregator plus fake machines in one process; prints the combined presence as it changes"""
+    aggregator = RelayAggregator(port, on_change=lambda combined: print(f"🎛️  Combined: {combined}"), token=token)
+    aggregator.start()
+    fakes = [FakeMachine("127.0.0.1", aggregator.address[1], f"Studio {chr(65 + i)}", seed=i, token=token)
+             for i in range(machines)]
+    # Someone else on the network without the token must not show up in the studio presence
+    intruder = FakeMachine("127.0.0.1", aggregator.address[1], "Intruder", seed=99, token="guess")
+    deadline = time.time() + seconds
+    blip_at = time.time() + seconds / 2
+    while time.time() < deadline:
+        random.choice(fakes).step()
+        intruder.step()
+        if blip_at and time.time() >= blip_at:
+            # Cut every sender's connection at once; state must survive the reconnect
+            blip_at = None
+            with aggregator.lock:
+                conns = {entry["conn"] for entry in aggregator.machines.values()}
+            for conn in conns:
+                try:
+                    conn.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+            print("✂️  Dropped all relay connections")
+        time.sleep(0.1)
+    time.sleep(BATCH_INTERVAL * 2)
+    snapshot = aggregator.snapshot()
+    print(json.dumps(snapshot, indent=2))
+    try:
+        query_aggregator("127.0.0.1", aggregator.address[1], token="guess")
+        denied = False
+    except RelayError:
+        denied = True
+    aggregator.close()
+    intruded = any(name.startswith("Intruder/") for name in snapshot["machines"])
+    print(f"{'❌' if intruded else '✅'} Sender with the wrong token kept out of the combined state")
+    print(f"{'✅' if denied else '❌'} Query with the wrong token refused")
+    return not intruded and denied
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="AbletonRPC LAN relay tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    demo = sub.add_parser("demo", help="run an aggregator against fake machines on this computer")
+    demo.add_argument("--machines", type=int, default=3)
+    demo.add_argument("--seconds", type=float, default=10)
+    demo.add_argument("--token", default="demo-token")
+    fake = sub.add_parser("fake-machines", help="stream fake machines to a running aggregator")
+    fake.add_argument("host")
+    fake.add_argument("--port", type=int, default=DEFAULT_PORT)
+    fake.add_argument("--machines", type=int, default=3)
+    fake.add_argument("--token", help="shared token from the aggregator's relay section")
+    status = sub.add_parser("status", help="print the combined state from an aggregator")
+    status.add_argument("host", nargs="?", default="127.0.0.1")
+    status.add_argument("--port", type=int, default=DEFAULT_PORT)
+    status.add_argument("--token", help="shared token from the aggregator's relay section")
+    args = parser.parse_args()
+
+    if args.command == "demo":
+        sys.exit(0 if _demo(args.machines, args.seconds, token=args.token) else 1)
+    elif args.command == "fake-machines":
+        fakes = [FakeMachine(args.host, args.port, f"Fake {i + 1}", seed=i, token=args.token) for i in range(args.machines)]
+        while True:
+            random.choice(fakes).step()
+            time.sleep(0.5)
+    else:
+        try:
+            print(json.dumps(query_aggregator(args.host, args.port, token=args.token), indent=2))
+        except (OSError, RelayError) as e:
+            print(f"❌ Could not reach relay aggregator: {e}")
+            sys.exit(1)
@@ -14,7 +14,10 @@ OPTIONS = {
         'LSUIElement': False, 
     },
     'packages': ['pypresence', 'psutil', 'tkinter'],
-    'includes': ['tkinter', 'tkinter.filedialog', 'tkinter.messagebox', 'shutil', 'pathlib', 'subprocess', 'glob'],
+    'includes': ['tkinter', 'tkinter.filedialog', 'tkinter.messagebox', 'shutil', 'pathlib', 'subprocess', 'glob',
+                 'presence_templates', 'als_metadata', 'checkpoint', 'project_index',
+                 'handoff', 'fauxmidi_template', 'latency_trace', 'log_tail',
+                 'discord_ipc', 'leader', 'relay', 'overlay_server', 'state_sources', 'sinks', 'governor', 'state_protocol', 'deploy'],
 }
 
 setup(
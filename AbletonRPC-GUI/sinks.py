@@ -0,0 +1,344 @@
+import importlib
+import os
+import queue
+import tempfile
+import threading
+import time
+
+from checkpoint import atomic_write_json
+from discord_ipc import create_presence
+
+# Last pipeline stage: every output is a sink with its own bounded queue and
+# worker thread, so a slow Discord or disk never holds up the source or the
+# other sinks. The daemon submits one update dict per tick:
+#   running      Live is running and its state is known
+#   leader       this daemon is the elected presence publisher
+#   activity     rendered presence fields, or None
+#   start        session start timestamp
+#   installation installation name
+#   state        raw fields for overlays/files (see AbletonRPCApp._overlay_state)
+#   trace        latency_trace.Propagation for this record, or None
+#   time         wall-clock time of the update
+QUEUE_SIZE = 8                      # per sink; when full the oldest queued update is dropped
+ENTRY_POINT_GROUP = "abletonrpc.sinks"
+DISCORD_RETRY = 10                  # seconds between Discord reconnection attempts
+
+SINK_TYPES = {}
+
+def register_sink(name):
+    """Class decorator adding a sink type usable as {"type": name} in installations.json"""
+    def decorator(cls):
+        SINK_TYPES[name] = cls
+        cls.name = name
+        return cls
+    return decorator
+
+class Sink:
+    """Base class for outputs; subclasses implement handle(update)"""
+
+    name = "sink"
+
+    def start(self):
+        """Called once on the daemon thread before the worker starts"""
+
+    def handle(self, update):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+class SinkWorker:
+    """Runs one sink on its own thread, fed from a bounded latest-wins queue"""
+
+    def __init__(self, sink, queue_size=QUEUE_SIZE, on_handled=None, essential=False):
+        self.sink = sink
+        self.essential = essential
+        self.name = getattr(sink, "name", type(sink).__name__)
+        self.queue = queue.Queue(queue_size)
+        self.on_handled = on_handled
+        self.handled = 0
+        self.dropped = 0
+        self.failed = 0
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, name=f"sink {self.name}", daemon=True)
+        self.thread.start()
+
+    def submit(self, update):
+        while True:
+            try:
+                self.queue.put_nowait(update)
+                return
+            except queue.Full:
+                # Presence is state, not events: a newer update makes the oldest queued one moot
+                try:
+                    self.queue.get_nowait()
+                    self.queue.task_done()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def flush(self, timeout):
+        """Wait until everything submitted so far has been handled; False on timeout"""
+        deadline = time.monotonic() + timeout
+        with self.queue.all_tasks_done:
+            while self.queue.unfinished_tasks:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self.queue.all_tasks_done.wait(remaining)
+        return True
+
+    def _run(self):
+        while True:
+            update = self.queue.get()
+            try:
+                if update is None:
+                    return
+                self.sink.handle(update)
+                self.handled += 1
+                if self.on_handled:
+                    self.on_handled(self.sink, update)
+            except Exception as e:
+                self.failed += 1
+                print(f"⚠️  {self.name} sink failed: {e}")
+            finally:
+                self.queue.task_done()
+
+    def stop(self, timeout=2):
+        self.submit(None)
+        if self.thread:
+            self.thread.join(timeout)
+        close = getattr(self.sink, "close", None)
+        if close:
+            close()
+
+class SinkPipeline:
+    """Fans each update out to every sink's queue without waiting on any of them"""
+
+    def __init__(self, on_handled=None):
+        self.on_handled = on_handled
+        self.workers = []
+
+    def add(self, sink, queue_size=QUEUE_SIZE, essential=False):
+        start = getattr(sink, "start", None)
+        if start:
+            start()
+        worker = SinkWorker(sink, queue_size, self.on_handled, essential)
+        worker.start()
+        self.workers.append(worker)
+        return sink
+
+    def submit(self, update, essential_only=False):
+        """essential_only skips optional sinks; they catch up from the next full update"""
+        for worker in self.workers:
+            if worker.essential or not essential_only:
+                worker.submit(update)
+
+    def flush(self, timeout=5):
+        deadline = time.monotonic() + timeout
+        return all([worker.flush(max(0, deadline - time.monotonic())) for worker in self.workers])
+
+    def stats(self):
+        return {worker.name: {"handled": worker.handled, "dropped": worker.dropped,
+                              "failed": worker.failed, "queued": worker.queue.qsize()}
+                for worker in self.workers}
+
+    def close(self):
+        for worker in self.workers:
+            worker.stop()
+        self.workers = []
+
+def _entry_point(name):
+    """Sink class published by an installed package under the abletonrpc.sinks entry point group"""
+    try:
+        from importlib.metadata import entry_points
+    except ImportError:
+        return None
+    found = entry_points()
+    group = found.select(group=ENTRY_POINT_GROUP) if hasattr(found, "select") else found.get(ENTRY_POINT_GROUP, ())
+    for entry in group:
+        if entry.name == name:
+            return entry.load()
+    return None
+
+def load_sink(config):
+    """(sink, queue_size) for one {"type": ..., ...options} entry from installations.json.
+
+    type is a built-in name, an entry point name, or "package.module:Class".
+    """
+    options = dict(config)
+    kind = options.pop("type", None)
+    queue_size = options.pop("queue_size", QUEUE_SIZE)
+    if not kind:
+        raise ValueError("sink entry has no type")
+    cls = SINK_TYPES.get(kind)
+    if cls is None and ":" in kind:
+        module_name, _, attr = kind.partition(":")
+        cls = getattr(importlib.import_module(module_name), attr)
+    if cls is None:
+        cls = _entry_point(kind)
+    if cls is None:
+        raise ValueError(f"unknown sink type '{kind}'")
+    return cls(**options), queue_size
+
+@register_sink("discord")
+class DiscordSink(Sink):
+    """Rich presence for the elected publisher; clears when Live closes or another daemon leads"""
+
+    def __init__(self, client_id, backend="pypresence", on_sent=None):
+        self.client_id = client_id
+        self.backend = backend
+        self.on_sent = on_sent  # called with each update that reached Discord
+        self.rpc = None
+        self.retry_at = 0.0
+        self.last_payload = None
+
+    def start(self):
+        try:
+            self._connect()
+            print(f"✅ Connected to Discord RPC ({self.backend})")
+        except Exception as e:
+            print(f"⚠️  Discord RPC connection failed: {e}")
+
+    def _connect(self):
+        self.retry_at = time.monotonic() + DISCORD_RETRY
+        rpc = create_presence(self.client_id, self.backend)
+        rpc.connect()
+        self.rpc = rpc
+
+    @property
+    def connected(self):
+        return self.rpc is not None
+
+    def adopt(self, activity):
+        """Treat activity as already shown, e.g. after restoring it from a checkpoint"""
+        self.last_payload = tuple(sorted(activity.items())) if activity else None
+
+    def handle(self, update):
+        activity = update.get("activity") if update.get("running") and update.get("leader", True) else None
+        payload = tuple(sorted(activity.items())) if activity else None
+        if payload == self.last_payload:
+            return
+        if not self.rpc:
+            if time.monotonic() < self.retry_at:
+                return
+            self._connect()
+            print("✅ Reconnected to Discord RPC")
+        try:
+            if activity:
+                self.rpc.update(large_image="ableton_image", start=update.get("start"), **activity)
+            else:
+                self.rpc.clear()
+        except Exception:
+            self.rpc = None
+            raise
+        self.last_payload = payload
+        trace = update.get("trace")
+        if trace is not None:
+            trace.mark("sent")
+        if activity:
+            print(f"📡 Updated Discord: {activity.get('details', '')} | {activity.get('state', '')}")
+        else:
+            print("🔇 Discord presence cleared")
+        if self.on_sent:
+            self.on_sent(update)
+
+    def close(self):
+        if self.rpc:
+            try:
+                self.rpc.close()
+            except Exception:
+                pass
+            self.rpc = None
+
+@register_sink("relay")
+class RelaySink(Sink):
+    """Forwards presence to a studio relay aggregator instead of Discord"""
+
+    def __init__(self, host, port, machine, install_hash, token=None):
+        from relay import RelaySender
+        self.sender = RelaySender(host, port, machine, install_hash, token)
+
+    def handle(self, update):
+        from relay import activity_fields
+        running = bool(update.get("running"))
+        # The sender batches and only puts changed fields on the wire
+        self.sender.publish(activity_fields(update.get("activity"), running, update.get("installation"),
+                                            update.get("start") if running else None))
+        trace = update.get("trace")
+        if trace is not None:
+            trace.mark("sent")
+
+@register_sink("overlay")
+class OverlaySink(Sink):
+    """Localhost SSE/WebSocket endpoint for stream overlays"""
+
+    def __init__(self, port, host="127.0.0.1"):
+        from overlay_server import OverlayServer
+        self.server = OverlayServer(port, host)
+
+    def start(self):
+        self.server.start()
+
+    def handle(self, update):
+        # Clients only receive the keys that changed
+        self.server.publish(update.get("state") or {})
+
+@register_sink("json")
+class JSONFileSink(Sink):
+    """Current state as a JSON file for scripts, widgets and status bars"""
+
+    def __init__(self, path):
+        self.path = os.path.expanduser(path)
+        self.last = None
+
+    def handle(self, update):
+        data = {key: update.get(key) for key in ("running", "installation", "start", "activity", "state")}
+        if data == self.last:
+            return
+        data["updated"] = update.get("time")
+        atomic_write_json(self.path, data)
+        self.last = data
+        del data["updated"]
+
+@register_sink("metrics")
+class MetricsSink(Sink):
+    """Prometheus text-format gauges, for node_exporter's textfile collector"""
+
+    def __init__(self, path, interval=15):
+        self.path = os.path.expanduser(path)
+        self.interval = interval
+        self.updates = 0
+        self.written_at = 0.0
+
+    def handle(self, update):
+        self.updates += 1
+        if time.monotonic() - self.written_at < self.interval and update.get("running"):
+            return
+        state = update.get("state") or {}
+        labels = '{installation="%s"}' % str(update.get("installation", "")).replace('"', "'")
+        try:
+            tempo = float(state.get("tempo") or 0)
+        except ValueError:
+            tempo = 0.0
+        gauges = (
+            ("abletonrpc_live_running", "Live is running", 1 if update.get("running") else 0),
+            ("abletonrpc_live_hung", "Live stopped sending heartbeats", 1 if state.get("hung") else 0),
+            ("abletonrpc_live_playing", "Transport is playing", 1 if state.get("state") == "Playing" else 0),
+            ("abletonrpc_tempo_bpm", "Song tempo", tempo),
+            ("abletonrpc_live_cpu_percent", "Live's CPU meter", state.get("cpu") or 0),
+            ("abletonrpc_session_start_seconds", "Session start as a Unix timestamp", update.get("start") or 0),
+            ("abletonrpc_updates_total", "Updates handled by this sink", self.updates),
+        )
+        text = "".join(f"# HELP {name} {help_text}\n# TYPE {name} {'counter' if name.endswith('_total') else 'gauge'}\n"
+                       f"{name}{labels} {value}\n" for name, help_text, value in gauges)
+        directory = os.path.dirname(self.path) or "."
+        os.makedirs(directory, exist_ok=True)
+        # The collector must never read a half-written file
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".prom")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, self.path)
+        self.written_at = time.monotonic()
@@ -0,0 +1,191 @@
+import os
+import queue
+import socket
+import threading
+import time
+
+from log_tail import LogTailer
+from state_protocol import FORMAT_DELTAS, detect_version
+
+# First pipeline stage: where FauxMIDI state records come from. Every source has
+# poll() -> (bytes of complete lines, reset); reset means the bytes start a fresh
+# snapshot. state_protocol.StateDecoder turns them into a LiveState.
+SOURCE_TYPES = ("file", "socket", "simulator")
+
+class FileSource:
+    """Tails the state file FauxMIDI writes (the default).
+
+    Formats older than the delta log rewrite the whole file in place, and the
+    original script leaves its single line unterminated, so those files are
+    re-read whole whenever they change instead of being tailed.
+    """
+
+    simulated = False
+
+    def __init__(self, path):
+        self.path = path
+        self.tailer = None
+        self.whole_file = None      # None until the format has been seen
+        self.signature = None
+
+    def poll(self):
+        if self.whole_file is not False:
+            return self._poll_whole()
+        data, reset = self.tailer.poll_bytes()
+        if reset:
+            # Rewritten or replaced: look at the format again
+            self.whole_file = None
+            self.signature = None
+            return self._poll_whole()
+        return data, reset
+
+    def _poll_whole(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return b"", False
+        signature = (st.st_ino, st.st_size, st.st_mtime_ns)
+        if signature == self.signature:
+            return b"", False
+        try:
+            with open(self.path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return b"", False
+        self.signature = signature
+        if detect_version(data) >= FORMAT_DELTAS:
+            # Appended deltas from here on; tail from the last complete line
+            cut = data.rfind(b"\n") + 1
+            data = data[:cut]
+            self.whole_file = False
+            self.tailer = LogTailer(self.path, cut, detect_rewrites=True)
+        else:
+            self.whole_file = True
+            if data and not data.endswith(b"\n"):
+                data += b"\n"
+        return data, True
+
+    def restart(self):
+        self.whole_file = None
+        self.signature = None
+
+    def close(self):
+        if self.tailer:
+            self.tailer.close()
+
+class SocketSource:
+    """Unix socket that accepts the same lines pushed by a connected writer.
+
+    Each connection starts over from an empty state, so a writer sends a full
+    snapshot first and changed fields afterwards.
+    """
+
+    simulated = False
+
+    def __init__(self, path):
+        self.path = path
+        self.lines = queue.Queue()
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+        self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.server.bind(path)
+        self.server.listen(2)
+        threading.Thread(target=self._accept_loop, name="state socket", daemon=True).start()
+        print(f"🔌 Accepting state lines on {path}")
+
+    def _accept_loop(self):
+        while True:
+            try:
+                conn, _ = self.server.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._read, args=(conn,), daemon=True).start()
+
+    def _read(self, conn):
+        self.lines.put(None)  # reset marker
+        with conn, conn.makefile("rb") as f:
+            try:
+                for line in f:
+                    if line.endswith(b"\n"):
+                        self.lines.put(line)
+            except OSError:
+                pass
+
+    def poll(self):
+        chunks, reset = [], False
+        while True:
+            try:
+                line = self.lines.get_nowait()
+            except queue.Empty:
+                return b"".join(chunks), reset
+            if line is None:
+                chunks, reset = [], True
+            else:
+                chunks.append(line)
+
+    def restart(self):
+        pass
+
+    def close(self):
+        self.server.close()
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+class SimulatorSource:
+    """Scripted session for trying sinks and templates without Live running"""
+
+    simulated = True
+    PROJECTS = ("Demo Set", "Late Night Sketch", "Client Mix v3")
+
+    def __init__(self, installation_name, interval=5):
+        self.installation_name = installation_name
+        self.interval = interval
+        self.step = -1
+        self.next_at = 0.0
+
+    def _fields(self):
+        project = self.PROJECTS[self.step // 4 % len(self.PROJECTS)]
+        now_ns = time.time_ns()
+        return {
+            "FAUXMIDI": "2",
+            "PROJECT": project,
+            "PATH": "",
+            "TEMPO": f"{120 + self.step % 4 * 4:.1f}",
+            "STATE": "Playing" if self.step % 2 else "Stopped",
+            "INSTALLATION": self.installation_name,
+            "SEQ": str(self.step),
+            "ORIGIN": f"{now_ns} {time.monotonic_ns()}",
+        }
+
+    def poll(self):
+        now = time.monotonic()
+        if now < self.next_at:
+            return b"", False
+        self.next_at = now + self.interval
+        self.step += 1
+        # Every step is a full snapshot, the way FauxMIDI rewrites the file periodically
+        records = "".join(f"{key}:{value}\n" for key, value in self._fields().items())
+        return records.encode("utf-8"), True
+
+    def restart(self):
+        self.step = -1
+        self.next_at = 0.0
+
+    def close(self):
+        pass
+
+def create_source(config, log_path, installation_name):
+    """State source for an installation's "source" setting ({"type": ...}, default: the state file)"""
+    config = config or {}
+    kind = config.get("type", "file")
+    if kind == "socket":
+        return SocketSource(config.get("path") or log_path + ".sock")
+    if kind == "simulator":
+        return SimulatorSource(installation_name, config.get("interval", 5))
+    if kind != "file":
+        print(f"⚠️  Unknown state source '{kind}' - reading the state file")
+    return FileSource(config.get("path") or log_path)
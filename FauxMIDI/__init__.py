@@ -3,10 +3,187 @@ import os
 import traceback
 import threading
 import time
+from collections import deque
+from time import perf_counter_ns
+
+# Set ABLETONRPC_PROFILE=1 (or create "<log file>.profile.enable") to time listener callbacks
+PROFILE_CALLBACKS = os.environ.get("ABLETONRPC_PROFILE", "") == "1"
+PROFILE_DUMP_INTERVAL = 60
 
 def create_instance(c_instance):
     return FauxMIDI(c_instance)
 
+class CallbackProfiler:
+    """Per-callback latency histograms (log2 buckets of microseconds)"""
+    BUCKETS = 24
+
+    def __init__(self):
+        self.stats = {}
+        self.lock = threading.Lock()
+        self.last_dump = time.time()
+
+    def wrap(self, name, func):
+        def timed(*args, **kwargs):
+            start = perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.record(name, perf_counter_ns() - start)
+        return timed
+
+    def record(self, name, elapsed_ns):
+        bucket = min((elapsed_ns // 1000).bit_length(), self.BUCKETS - 1)
+        with self.lock:
+            stat = self.stats.get(name)
+            if stat is None:
+                # [count, total_ns, max_ns, histogram]
+                stat = self.stats[name] = [0, 0, 0, [0] * self.BUCKETS]
+            stat[0] += 1
+            stat[1] += elapsed_ns
+            if elapsed_ns > stat[2]:
+                stat[2] = elapsed_ns
+            stat[3][bucket] += 1
+
+    def _percentile_us(self, histogram, count, fraction):
+        target = count * fraction
+        seen = 0
+        for bucket, hits in enumerate(histogram):
+            seen += hits
+            if seen >= target:
+                return 1 << bucket
+        return 1 << (self.BUCKETS - 1)
+
+    def summary(self):
+        with self.lock:
+            snapshot = {name: (s[0], s[1], s[2], list(s[3])) for name, s in self.stats.items()}
+        lines = [f"{'callback':<24}{'calls':>8}{'mean_us':>10}{'p50_us':>9}{'p99_us':>9}{'max_us':>10}"]
+        for name in sorted(snapshot):
+            count, total_ns, max_ns, histogram = snapshot[name]
+            if not count:
+                continue
+            lines.append(
+                f"{name:<24}{count:>8}{total_ns / count / 1000:>10.1f}"
+                f"{self._percentile_us(histogram, count, 0.5):>9}"
+                f"{self._percentile_us(histogram, count, 0.99):>9}"
+                f"{max_ns / 1000:>10.1f}"
+            )
+        return "\n".join(lines)
+
+class StateWriter:
+    # Owns all FauxMIDI file I/O on one background thread so Live's main thread never touches disk.
+    # Overwritten files (state, heartbeat, profile) keep only their newest pending content;
+    # appended debug lines go through a bounded queue that drops the oldest on overflow.
+    MAX_DEBUG_LINES = 1000
+    REPORT_INTERVAL = 60
+
+    def __init__(self, report_path):
+        self.report_path = report_path
+        self.cond = threading.Condition()
+        self.pending = {}
+        self.debug_lines = deque()
+        self.closed = False
+        self.superseded = 0
+        self.dropped = 0
+        self.writes = 0
+        self.latency_total_ns = 0
+        self.latency_max_ns = 0
+        self.known_dirs = set()
+        self.last_report = time.time()
+        self.thread = threading.Thread(target=self._run, name="FauxMIDI writer", daemon=True)
+        self.thread.start()
+
+    def put_file(self, path, text, sync=True):
+        # Queue a whole-file rewrite; a newer snapshot for the same path replaces an unwritten one
+        with self.cond:
+            if path in self.pending:
+                self.superseded += 1
+            self.pending[path] = (text, sync, perf_counter_ns())
+            self.cond.notify()
+
+    def put_line(self, path, line):
+        with self.cond:
+            if len(self.debug_lines) >= self.MAX_DEBUG_LINES:
+                self.debug_lines.popleft()
+                self.dropped += 1
+            self.debug_lines.append((path, line))
+            self.cond.notify()
+
+    def close(self):
+        # Let the thread drain what is queued and exit; never blocks the caller
+        with self.cond:
+            self.closed = True
+            self.cond.notify()
+
+    def _ensure_dir(self, path):
+        directory = os.path.dirname(path)
+        if directory not in self.known_dirs:
+            os.makedirs(directory, exist_ok=True)
+            self.known_dirs.add(directory)
+
+    def _run(self):
+        while True:
+            with self.cond:
+                while not self.pending and not self.debug_lines and not self.closed:
+                    self.cond.wait(self.REPORT_INTERVAL)
+                    if time.time() - self.last_report >= self.REPORT_INTERVAL:
+                        break
+                pending, self.pending = self.pending, {}
+                lines = list(self.debug_lines)
+                self.debug_lines.clear()
+                closed = self.closed
+
+            for path, (text, sync, queued_ns) in pending.items():
+                try:
+                    self._ensure_dir(path)
+                    with open(path, "w", encoding="utf-8") as f:
+                        f.write(text)
+                        if sync:
+                            f.flush()
+                            os.fsync(f.fileno())
+                except Exception:
+                    pass
+                latency = perf_counter_ns() - queued_ns
+                self.writes += 1
+                self.latency_total_ns += latency
+                if latency > self.latency_max_ns:
+                    self.latency_max_ns = latency
+
+            if lines:
+                self._append_lines(lines)
+            since_report = time.time() - self.last_report
+            # Overflow is reported within seconds; routine latency stats once a minute
+            if closed or since_report >= self.REPORT_INTERVAL or (self.dropped and since_report >= 5):
+                self._report()
+            if closed:
+                return
+
+    def _append_lines(self, lines):
+        by_path = {}
+        for path, line in lines:
+            by_path.setdefault(path, []).append(line)
+        for path, path_lines in by_path.items():
+            try:
+                self._ensure_dir(path)
+                with open(path, "a", encoding="utf-8") as f:
+                    f.write("".join(path_lines))
+            except Exception:
+                pass
+
+    def _report(self):
+        self.last_report = time.time()
+        with self.cond:
+            superseded, dropped = self.superseded, self.dropped
+            self.superseded = self.dropped = 0
+        writes, total_ns, max_ns = self.writes, self.latency_total_ns, self.latency_max_ns
+        self.writes = self.latency_total_ns = self.latency_max_ns = 0
+        if not writes and not dropped:
+            return
+        import datetime
+        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        line = (f"[{timestamp}] Writer: {writes} writes, latency mean {total_ns / max(writes, 1) / 1e6:.2f}ms "
+                f"max {max_ns / 1e6:.2f}ms, {superseded} superseded, {dropped} debug lines dropped (queue full)\n")
+        self._append_lines([(self.report_path, line)])
+
 class FauxMIDI:
     def __init__(self, c_instance):
         self.c_instance = c_instance
@@ -14,6 +191,12 @@ class FauxMIDI:
         self.name_check_counter = 0
         self.log_file_path = "/Volumes/Charidrive/rpctemp/CurrentProjectLog.txt"
         self.debug_log_path = self.log_file_path + ".debug"
+        self.writer = StateWriter(self.debug_log_path)
+        self.profile_path = self.log_file_path + ".profile"
+        self.profiler = None
+        if PROFILE_CALLBACKS or os.path.exists(self.profile_path + ".enable"):
+            self.profiler = CallbackProfiler()
+        self._listeners = {}
         
         try:
             self._debug_log("Enhanced FauxMIDI initializing...")
@@ -31,24 +214,56 @@ class FauxMIDI:
         try:
             import datetime
             timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            os.makedirs(os.path.dirname(self.debug_log_path), exist_ok=True)
-            with open(self.debug_log_path, "a", encoding="utf-8") as f:
-                f.write(f"[{timestamp}] {message}\n")
-                f.flush()
-                os.fsync(f.fileno())
+            self.writer.put_line(self.debug_log_path, f"[{timestamp}] {message}\n")
         except:
             pass
 
+    def _listener(self, name):
+        # Reuse the same callable so has/remove_*_listener can match it later
+        callback = self._listeners.get(name)
+        if callback is None:
+            callback = self.log_project_name
+            if self.profiler:
+                callback = self.profiler.wrap(name, callback)
+            self._listeners[name] = callback
+        return callback
+
+    def dump_profile(self):
+        if not self.profiler:
+            return
+        try:
+            import datetime
+            timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            report = f"# FauxMIDI callback profile @ {timestamp}\n" + self.profiler.summary() + "\n"
+            self.writer.put_file(self.profile_path, report, sync=False)
+            self.profiler.last_dump = time.time()
+        except Exception as e:
+            self._debug_log(f"Profile dump error: {e}")
+
+    def _check_name(self):
+        current_name = self._get_enhanced_project_name()
+        if current_name != self.last_project_name:
+            self._debug_log(f"Project name changed: '{self.last_project_name}' -> '{current_name}'")
+            self.last_project_name = current_name
+            self.log_project_name()
+
     def _start_name_monitor(self):
+        check_name = self._check_name
+        if self.profiler:
+            check_name = self.profiler.wrap("name_monitor", check_name)
+
         def name_monitor():
             while True:
                 try:
                     time.sleep(2)
-                    current_name = self._get_enhanced_project_name()
-                    if current_name != self.last_project_name:
-                        self._debug_log(f"Project name changed: '{self.last_project_name}' -> '{current_name}'")
-                        self.last_project_name = current_name
-                        self.log_project_name()
+                    check_name()
+                    if self.profiler:
+                        request_path = self.profile_path + ".request"
+                        if os.path.exists(request_path):
+                            os.remove(request_path)
+                            self.dump_profile()
+                        elif time.time() - self.profiler.last_dump >= PROFILE_DUMP_INTERVAL:
+                            self.dump_profile()
                 except Exception as e:
                     self._debug_log(f"Name monitor error: {e}")
                     time.sleep(5)
@@ -114,26 +329,26 @@ class FauxMIDI:
 
     def _setup_listeners(self):
         try:
-            if hasattr(self.song, 'name_has_listener') and not self.song.name_has_listener(self.log_project_name):
-                self.song.add_name_listener(self.log_project_name)
+            if hasattr(self.song, 'name_has_listener') and not self.song.name_has_listener(self._listener('name')):
+                self.song.add_name_listener(self._listener('name'))
                 self._debug_log("Added name listener")
             
-            if hasattr(self.song, 'tempo_has_listener') and not self.song.tempo_has_listener(self.log_project_name):
-                self.song.add_tempo_listener(self.log_project_name)
+            if hasattr(self.song, 'tempo_has_listener') and not self.song.tempo_has_listener(self._listener('tempo')):
+                self.song.add_tempo_listener(self._listener('tempo'))
                 self._debug_log("Added tempo listener")
             
-            if hasattr(self.song, 'is_playing_has_listener') and not self.song.is_playing_has_listener(self.log_project_name):
-                self.song.add_is_playing_listener(self.log_project_name)
+            if hasattr(self.song, 'is_playing_has_listener') and not self.song.is_playing_has_listener(self._listener('is_playing')):
+                self.song.add_is_playing_listener(self._listener('is_playing'))
                 self._debug_log("Added playing listener")
             
-            if hasattr(self.song, 'record_mode_has_listener') and not self.song.record_mode_has_listener(self.log_project_name):
-                self.song.add_record_mode_listener(self.log_project_name)
+            if hasattr(self.song, 'record_mode_has_listener') and not self.song.record_mode_has_listener(self._listener('record_mode')):
+                self.song.add_record_mode_listener(self._listener('record_mode'))
                 self._debug_log("Added record listener")
                 
             try:
                 app = Live.Application.get_application()
                 if hasattr(app, 'add_document_listener'):
-                    app.add_document_listener(self.log_project_name)
+                    app.add_document_listener(self._listener('document'))
                     self._debug_log("Added document listener")
             except Exception as e:
                 self._debug_log(f"Could not add document listener: {e}")
@@ -147,33 +362,22 @@ class FauxMIDI:
             self._debug_log("log_project_name called")
             final_name = self._get_enhanced_project_name()
             self._debug_log(f"Final project name: '{final_name}'")
-            os.makedirs(os.path.dirname(self.log_file_path), exist_ok=True)
             
-            with open(self.log_file_path, "w", encoding="utf-8") as log_file:
-                if final_name and final_name not in ["Loading...", "Unsaved Project"]:
-                    log_file.write(f"Current Project Name: {final_name}")
-                    self._debug_log(f"Wrote project name: '{final_name}'")
-                else:
-                    log_file.write("Current Project Name: Unsaved Project")
-                    self._debug_log("Wrote: Unsaved Project")
-                
-                log_file.flush()
-                os.fsync(log_file.fileno())
-                
-            self._debug_log(f"Successfully wrote to {self.log_file_path}")
+            if final_name and final_name not in ["Loading...", "Unsaved Project"]:
+                record = f"Current Project Name: {final_name}"
+                self._debug_log(f"Queued project name: '{final_name}'")
+            else:
+                record = "Current Project Name: Unsaved Project"
+                self._debug_log("Queued: Unsaved Project")
+            
+            # Hand the writer thread an immutable snapshot; no disk I/O on Live's thread
+            self.writer.put_file(self.log_file_path, record)
                 
         except Exception as e:
             self._debug_log(f"log_project_name error: {e}")
             self._debug_log(traceback.format_exc())
-            
-            try:
-                os.makedirs(os.path.dirname(self.log_file_path), exist_ok=True)
-                with open(self.log_file_path, "w", encoding="utf-8") as log_file:
-                    log_file.write(f"Current Project Name: Error - {str(e)}")
-                    log_file.flush()
-                self._debug_log("Wrote error state to main log")
-            except Exception as fallback_error:
-                self._debug_log(f"Fallback logging also failed: {fallback_error}")
+            self.writer.put_file(self.log_file_path, f"Current Project Name: Error - {str(e)}")
+            self._debug_log("Queued error state for main log")
 
     def disconnect(self):
         try:
@@ -181,28 +385,28 @@ class FauxMIDI:
             if hasattr(self, 'song') and self.song:
                 try:
                     if hasattr(self.song, 'remove_name_listener'):
-                        self.song.remove_name_listener(self.log_project_name)
+                        self.song.remove_name_listener(self._listener('name'))
                         self._debug_log("Removed name listener")
                 except: 
                     pass
                 
                 try:
                     if hasattr(self.song, 'remove_tempo_listener'):
-                        self.song.remove_tempo_listener(self.log_project_name)
+                        self.song.remove_tempo_listener(self._listener('tempo'))
                         self._debug_log("Removed tempo listener")
                 except: 
                     pass
                 
                 try:
                     if hasattr(self.song, 'remove_is_playing_listener'):
-                        self.song.remove_is_playing_listener(self.log_project_name)
+                        self.song.remove_is_playing_listener(self._listener('is_playing'))
                         self._debug_log("Removed playing listener")
                 except: 
                     pass
                 
                 try:
                     if hasattr(self.song, 'remove_record_mode_listener'):
-                        self.song.remove_record_mode_listener(self.log_project_name)
+                        self.song.remove_record_mode_listener(self._listener('record_mode'))
                         self._debug_log("Removed record listener")
                 except: 
                     pass
@@ -210,11 +414,13 @@ class FauxMIDI:
                 try:
                     app = Live.Application.get_application()
                     if hasattr(app, 'remove_document_listener'):
-                        app.remove_document_listener(self.log_project_name)
+                        app.remove_document_listener(self._listener('document'))
                         self._debug_log("Removed document listener")
                 except: 
                     pass
                 
             self._debug_log("All listeners removed successfully")
+            self.dump_profile()
         except Exception as e:
-            self._debug_log(f"Disconnect error: {e}")
\ No newline at end of file
+            self._debug_log(f"Disconnect error: {e}")
+        self.writer.close()
\ No newline at end of file
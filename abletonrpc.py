@@ -1,20 +1,59 @@
 import os
+import sys
 import time
-from pypresence import Presence  # type: ignore
 import psutil  # type: ignore
 import threading
 
+# Shared helpers live next to the GUI app
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "AbletonRPC-GUI"))
+from presence_templates import PresenceTemplates, format_elapsed  # noqa: E402
+from sinks import DiscordSink, SinkPipeline, load_sink  # noqa: E402
+from state_protocol import decode  # noqa: E402
+
 # --- CONFIGURATION ---
 temp_file_path = "/Volumes/Charidrive/rpctemp/CurrentProjectLog.txt" # Replace with a desired path on your own machine
 client_id = "CLIENT_ID_HERE" # Replace with your own Discord Application Client ID
-
-# --- CONNECT RPC ---
-RPC = Presence(client_id)
-try:
-    RPC.connect()
-    print("RPC Connected.")
-except Exception as e:
-    print(f"RPC Connection Error: {e}")
+rpc_backend = "pypresence" # or "builtin" for the lightweight client in AbletonRPC-GUI/discord_ipc.py
+# Outputs besides Discord, e.g. {"type": "json", "path": "~/ableton-state.json"} (see README)
+extra_sinks = []
+
+# Presence text. Available fields: {project}, {elapsed}, {installation} ({tempo}/{state} stay empty here)
+project_templates = {
+    "details": "{project}",
+    "state": "Working on a project",
+    "large_text": "{installation}",
+}
+idle_templates = {
+    "details": "Cooking up new music",
+    "state": "Not working on a project",
+    "large_text": "{installation}",
+}
+
+# Templates are compiled once here; rendering reuses the last result when fields are unchanged
+PROJECT_PRESENCE = PresenceTemplates(project_templates)
+IDLE_PRESENCE = PresenceTemplates(idle_templates)
+
+# --- OUTPUT SINKS ---
+# Discord and every extra sink run on their own threads, so a slow one never delays the file loop
+PIPELINE = SinkPipeline()
+PIPELINE.add(DiscordSink(client_id, rpc_backend))
+for sink_config in extra_sinks:
+    try:
+        sink, queue_size = load_sink(sink_config)
+        PIPELINE.add(sink, queue_size)
+    except Exception as e:
+        print(f"Sink Error ({sink_config.get('type')}): {e}")
+
+def publish(activity, project="", start=None):
+    """Queue presence for every sink; None clears it"""
+    PIPELINE.submit({
+        "running": activity is not None,
+        "activity": activity,
+        "start": start,
+        "installation": "Ableton Live",
+        "state": {"running": activity is not None, "project": project, "installation": "Ableton Live"},
+        "time": time.time(),
+    })
 
 # --- STRICT PROCESS CHECK ---
 def is_ableton_running():
@@ -65,7 +104,7 @@ def toggle_broadcast():
             state = "enabled" if broadcasting else "disabled"
             print(f"Rich Presence {state}.")
             if not broadcasting:
-                RPC.clear()
+                publish(None)
 
 threading.Thread(target=toggle_broadcast, daemon=True).start()
 
@@ -89,7 +128,7 @@ while True:
         elif not currently_running and ableton_was_running:
             # Ableton JUST closed (Transition On -> Off)
             print("Ableton closed.")
-            RPC.clear()
+            publish(None)
             ableton_was_running = False
             time.sleep(5)
             continue
@@ -116,17 +155,13 @@ while True:
             time.sleep(0.1) # Debounce write
 
             try:
-                with open(temp_file_path, "r", encoding="utf-8") as file:
-                    content = file.read().strip()
+                with open(temp_file_path, "rb") as file:
+                    content = file.read()
             except Exception:
                 continue
 
-            # Extract Name
-            new_project_name = ""
-            if "Current Project Name:" in content:
-                parts = content.split("Current Project Name:")
-                if len(parts) > 1:
-                    new_project_name = parts[1].strip()
+            # Extract Name (legacy FauxMIDI and the generated script's format both work)
+            new_project_name = decode(content).project or ""
 
             print(f"Read from file: '{new_project_name}'")
 
@@ -139,21 +174,15 @@ while True:
                     start_time = int(time.time())
 
                 if broadcasting:
+                    context = {
+                        "project": new_project_name,
+                        "installation": "Ableton Live",
+                        "elapsed": format_elapsed(start_time),
+                    }
                     if new_project_name:
-                        RPC.update(
-                            state="Working on a project",
-                            details=new_project_name,
-                            large_image="ableton_image",
-                            large_text="Ableton Live",
-                            start=start_time
-                        )
+                        publish(PROJECT_PRESENCE.render(context), new_project_name, start_time)
                     else:
-                        RPC.update(
-                            state="Not working on a project",
-                            details="Cooking up new music",
-                            large_image="ableton_image",
-                            large_text="Ableton Live"
-                        )
+                        publish(IDLE_PRESENCE.render(context))
         
         time.sleep(1)
 
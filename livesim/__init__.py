@@ -0,0 +1,4 @@
+"""Plain-Python stand-in for Live's object model, for exercising FauxMIDI off-Live"""
+from .fake_live import Application, Song, FaultPlan, install
+from .scenario import Event, ScenarioError, parse_scenario, load_scenario
+from .runner import LiveSimulator, CallbackStats, VARIANTS, format_report, load_variant
@@ -0,0 +1,39 @@
+import argparse
+import sys
+import tempfile
+
+from .runner import VARIANTS, LiveSimulator, format_report
+from .scenario import ScenarioError, load_scenario
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m livesim",
+                                     description="Run FauxMIDI against a simulated Live and report callback cost")
+    parser.add_argument("scenarios", nargs="+", help="scenario files (see livesim/scenarios)")
+    parser.add_argument("--variant", choices=VARIANTS + ("both",), default="both")
+    parser.add_argument("--repeat", type=int, default=1, help="run each scenario N times for steadier numbers")
+    parser.add_argument("--workdir", help="where FauxMIDI writes its logs (default: a temp dir)")
+    parser.add_argument("--fast", action="store_true",
+                        help="apply events back to back instead of at their 'at' times (callback cost only)")
+    args = parser.parse_args(argv)
+
+    variants = VARIANTS if args.variant == "both" else (args.variant,)
+    workdir = args.workdir or tempfile.mkdtemp(prefix="livesim-")
+    failed = False
+    for path in args.scenarios:
+        try:
+            events = load_scenario(path)
+        except (OSError, ScenarioError) as e:
+            print(f"❌ {path}: {e}")
+            failed = True
+            continue
+        print(f"🎛️  {path} ({len(events)} events) - logs in {workdir}")
+        for variant in variants:
+            sim = LiveSimulator(variant, workdir)
+            for _ in range(args.repeat):
+                sim.run(events, realtime=not args.fast)
+            print(format_report(sim))
+            failed = failed or not sim.ok
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,158 @@
+import sys
+import time
+import types
+
+# Properties FauxMIDI reads or listens to
+SONG_PROPERTIES = ("name", "tempo", "is_playing", "record_mode", "file_path", "canonical_parent")
+APP_PROPERTIES = ("average_process_usage", "peak_process_usage")
+
+class FaultPlan:
+    """Per-property faults: slow reads and raised exceptions"""
+
+    def __init__(self):
+        self.slow = {}
+        self.errors = {}
+
+    def apply(self, prop):
+        delay = self.slow.get(prop)
+        if delay:
+            time.sleep(delay)
+        error = self.errors.get(prop)
+        if error:
+            raise error(f"injected fault reading '{prop}'")
+
+class _Observable:
+    """Live-style property with add_/remove_/has_ listener methods"""
+
+    def __init__(self, name):
+        self.name = name
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        obj._faults.apply(self.name)
+        return obj._values.get(self.name)
+
+    def __set__(self, obj, value):
+        obj._values[self.name] = value
+        obj._fire(self.name)
+
+class _ListenerHost:
+    def __init__(self, faults, stats):
+        self._faults = faults
+        self._stats = stats
+        self._values = {}
+        self._listeners = {}
+
+    def _fire(self, prop):
+        # Live calls listeners synchronously on its main thread
+        for callback in list(self._listeners.get(prop, ())):
+            self._stats.call(prop, callback)
+
+    def _add(self, prop, callback):
+        callbacks = self._listeners.setdefault(prop, [])
+        if callback in callbacks:
+            raise RuntimeError(f"Listener already connected to '{prop}'")
+        callbacks.append(callback)
+
+    def _remove(self, prop, callback):
+        callbacks = self._listeners.get(prop, [])
+        if callback not in callbacks:
+            raise RuntimeError(f"Listener not connected to '{prop}'")
+        callbacks.remove(callback)
+
+    def _has(self, prop, callback):
+        return callback in self._listeners.get(prop, ())
+
+    def listener_count(self):
+        return sum(len(callbacks) for callbacks in self._listeners.values())
+
+def _listener_methods(cls, props):
+    for prop in props:
+        setattr(cls, prop, _Observable(prop))
+        setattr(cls, f"add_{prop}_listener", lambda self, cb, p=prop: self._add(p, cb))
+        setattr(cls, f"remove_{prop}_listener", lambda self, cb, p=prop: self._remove(p, cb))
+        setattr(cls, f"{prop}_has_listener", lambda self, cb, p=prop: self._has(p, cb))
+    return cls
+
+class Song(_ListenerHost):
+    def __init__(self, faults, stats):
+        super().__init__(faults, stats)
+        self._values.update({
+            'name': "",
+            'tempo': 120.0,
+            'is_playing': False,
+            'record_mode': False,
+            'file_path': None,
+            'canonical_parent': None,
+        })
+
+_listener_methods(Song, SONG_PROPERTIES)
+
+class Application(_ListenerHost):
+    def __init__(self, faults, stats):
+        super().__init__(faults, stats)
+        self._values.update({'average_process_usage': 0.0, 'peak_process_usage': 0.0})
+        self.song = Song(faults, stats)
+
+    def get_document(self):
+        return self.song
+
+    def new_document(self):
+        self.song = Song(self._faults, self._stats)
+        self._fire("document")
+        return self.song
+
+    def add_document_listener(self, callback):
+        self._add("document", callback)
+
+    def remove_document_listener(self, callback):
+        self._remove("document", callback)
+
+    def document_has_listener(self, callback):
+        return self._has("document", callback)
+
+for _prop in APP_PROPERTIES:
+    setattr(Application, _prop, _Observable(_prop))
+
+class ControlSurface:
+    """Just enough of _Framework.ControlSurface for FauxMIDI"""
+
+    def __init__(self, c_instance):
+        self._c_instance = c_instance
+
+    def update_display(self):
+        pass
+
+    def disconnect(self):
+        pass
+
+    def application(self):
+        return sys.modules["Live"].Application.get_application()
+
+class CInstance:
+    def __init__(self):
+        self.messages = []
+
+    def show_message(self, message):
+        self.messages.append(message)
+
+    def log_message(self, message):
+        self.messages.append(message)
+
+def install(app):
+    """Register fake Live and _Framework modules so FauxMIDI imports resolve to the simulator"""
+    live = types.ModuleType("Live")
+    application_module = types.ModuleType("Live.Application")
+    application_module.get_application = lambda: app
+    live.Application = application_module
+    sys.modules["Live"] = live
+    sys.modules["Live.Application"] = application_module
+
+    framework = types.ModuleType("_Framework")
+    control_surface = types.ModuleType("_Framework.ControlSurface")
+    control_surface.ControlSurface = ControlSurface
+    framework.ControlSurface = control_surface
+    sys.modules["_Framework"] = framework
+    sys.modules["_Framework.ControlSurface"] = control_surface
+    return live
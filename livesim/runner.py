@@ -0,0 +1,175 @@
+import re
+import sys
+import time
+import types
+from pathlib import Path
+from time import perf_counter_ns
+
+from .fake_live import APP_PROPERTIES, Application, CInstance, FaultPlan, install
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+GUI_DIR = str(REPO_ROOT / "AbletonRPC-GUI")
+if GUI_DIR not in sys.path:
+    sys.path.insert(0, GUI_DIR)
+from state_protocol import decode  # noqa: E402
+
+VARIANTS = ("legacy", "template")
+# Fields each variant writes; expectations on anything else are skipped
+VARIANT_FIELDS = {"legacy": {"PROJECT"}}
+
+class CallbackStats:
+    """Wall time of every callback the fake Live invokes, grouped by what fired it"""
+
+    def __init__(self):
+        self.samples = {}
+        self.errors = []
+
+    def timed(self, key, func, *args):
+        start = perf_counter_ns()
+        try:
+            return func(*args)
+        except Exception as e:
+            # Live would log this to Log.txt and carry on
+            self.errors.append((key, f"{type(e).__name__}: {e}"))
+        finally:
+            self.samples.setdefault(key, []).append(perf_counter_ns() - start)
+
+    def call(self, prop, callback):
+        self.timed(f"{prop}_listener", callback)
+
+    def rows(self):
+        for key in sorted(self.samples):
+            samples = sorted(self.samples[key])
+            count = len(samples)
+            yield (key, count, sum(samples) / count / 1000, samples[count // 2] / 1000,
+                   samples[min(count - 1, int(count * 0.99))] / 1000, samples[-1] / 1000)
+
+def load_variant(variant, log_path):
+    """Execute one FauxMIDI variant as a fresh module writing to log_path"""
+    if variant == "legacy":
+        source = (REPO_ROOT / "FauxMIDI" / "__init__.py").read_text(encoding="utf-8")
+        source, count = re.subn(r'self\.log_file_path = "[^"]*"',
+                                lambda _: f"self.log_file_path = {str(log_path)!r}", source, count=1)
+        if not count:
+            raise RuntimeError("Could not redirect the legacy FauxMIDI log path")
+    elif variant == "template":
+        from fauxmidi_template import render_midi_script
+        source = render_midi_script(log_path, "Simulated Live")
+    else:
+        raise ValueError(f"Unknown FauxMIDI variant {variant!r}")
+    module = types.ModuleType(f"FauxMIDI_{variant}")
+    exec(compile(source, f"<FauxMIDI {variant}>", "exec"), module.__dict__)
+    return module
+
+class LiveSimulator:
+    """Drives one FauxMIDI variant through a scenario against the fake Live object model"""
+
+    def __init__(self, variant, workdir):
+        self.variant = variant
+        self.faults = FaultPlan()
+        self.stats = CallbackStats()
+        self.app = Application(self.faults, self.stats)
+        install(self.app)
+        self.log_path = Path(workdir) / variant / "CurrentProjectLog.txt"
+        self.module = load_variant(variant, self.log_path)
+        self.script = None
+        self.results = []
+        self.leaks = 0
+
+    def start(self):
+        self.script = self.stats.timed("init", self.module.create_instance, CInstance())
+
+    def stop(self):
+        if self.script is not None:
+            self.stats.timed("disconnect", self.script.disconnect)
+            # Anything still registered after disconnect would leak into the next set
+            self.leaks += self.app.listener_count() + self.app.song.listener_count()
+            self.script = None
+
+    def read_state(self):
+        # Same decoder as the daemon; the legacy line comes back as PROJECT
+        try:
+            with open(self.log_path, "rb") as f:
+                return decode(f.read()).as_dict()
+        except OSError:
+            return {}
+
+    def apply(self, event):
+        verb, args = event.verb, event.args
+        if verb == "set":
+            target = self.app if args[0] in APP_PROPERTIES else self.app.song
+            setattr(target, args[0], args[1])
+        elif verb == "load":
+            self.stop()
+            song = self.app.new_document()
+            song._values["name"] = args[0]
+            song._values["file_path"] = args[1] if len(args) > 1 else None
+            self.start()
+        elif verb == "slow":
+            self.faults.slow[args[0]] = args[1]
+        elif verb == "raise":
+            self.faults.errors[args[0]] = args[1]
+        elif verb == "heal":
+            self.faults.slow.pop(args[0], None)
+            self.faults.errors.pop(args[0], None)
+        elif verb == "tick":
+            update_display = getattr(self.script, "update_display", None)
+            if update_display:
+                for _ in range(args[0]):
+                    self.stats.timed("update_display", update_display)
+        elif verb == "wait":
+            time.sleep(args[0])
+        elif verb == "expect":
+            self._expect(event)
+
+    def _expect(self, event):
+        field, expected = event.args
+        known = VARIANT_FIELDS.get(self.variant)
+        if known is not None and field not in known:
+            self.results.append((event.line, field, expected, None, None))
+            return
+        # Give asynchronous writers a moment to land the record
+        deadline = time.time() + 0.5
+        actual = self.read_state().get(field)
+        while actual != expected and time.time() < deadline:
+            time.sleep(0.01)
+            actual = self.read_state().get(field)
+        self.results.append((event.line, field, expected, actual, actual == expected))
+
+    def run(self, events, realtime=True):
+        """Apply events at their scenario times, so FauxMIDI's own timers see a real timeline.
+
+        A 'wait' pushes the rest of the timeline back by its duration. An event
+        that falls behind (slow faults, many ticks) runs as soon as it can.
+        realtime=False applies everything back to back, for callback cost only.
+        """
+        self.start()
+        started = time.monotonic()
+        for event in events:
+            if realtime:
+                delay = started + event.time - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+            self.apply(event)
+            if event.verb == "wait":
+                started += event.args[0]
+        self.stop()
+        return self
+
+    @property
+    def ok(self):
+        return not self.leaks and all(result[4] is not False for result in self.results)
+
+def format_report(sim):
+    lines = [f"== FauxMIDI {sim.variant} ==",
+             f"{'callback':<26}{'calls':>7}{'mean_us':>10}{'p50_us':>10}{'p99_us':>10}{'max_us':>10}"]
+    for key, count, mean, p50, p99, worst in sim.stats.rows():
+        lines.append(f"{key:<26}{count:>7}{mean:>10.1f}{p50:>10.1f}{p99:>10.1f}{worst:>10.1f}")
+    for key, error in sim.stats.errors:
+        lines.append(f"  ! {key} raised {error}")
+    for lineno, field, expected, actual, passed in sim.results:
+        mark = "skip" if passed is None else ("ok  " if passed else "FAIL")
+        lines.append(f"  {mark} line {lineno}: {field} == {expected!r} (got {actual!r})")
+    if sim.leaks:
+        lines.append(f"  FAIL {sim.leaks} listener(s) still registered after disconnect")
+    return "\n".join(lines)
@@ -0,0 +1,121 @@
+import shlex
+
+from .fake_live import SONG_PROPERTIES, APP_PROPERTIES
+
+# One event per line, run at its time (seconds since the scenario started; --fast ignores times):
+#
+#   at 0.5 set tempo 128             set a song/app property and fire its listeners
+#   at 1.0 set name none             values: numbers, true/false, none, or (quoted) text
+#   at 1.0 load "Beat.als" /path     open a new set: Live rebuilds the control surface
+#   at 2.0 slow tempo 40ms           reads of a property take this long
+#   at 2.0 raise name RuntimeError   reads of a property raise
+#   at 3.0 heal name                 remove faults from a property
+#   at 3.0 tick 20                   call update_display (Live's ~100ms main-thread tick)
+#   at 4.0 expect TEMPO 128          check a field in the state file FauxMIDI wrote
+#   at 4.0 wait 2.5                  pause here, pushing every later event back by 2.5s
+#
+# Blank lines and '#' comments are ignored.
+
+VERBS = {"set", "load", "slow", "raise", "heal", "tick", "expect", "wait"}
+SETTABLE = set(SONG_PROPERTIES) | set(APP_PROPERTIES)
+EXCEPTIONS = {
+    "RuntimeError": RuntimeError,
+    "AttributeError": AttributeError,
+    "ValueError": ValueError,
+    "TypeError": TypeError,
+}
+
+class ScenarioError(ValueError):
+    pass
+
+class Event:
+    __slots__ = ("time", "verb", "args", "line")
+
+    def __init__(self, time, verb, args, line):
+        self.time = time
+        self.verb = verb
+        self.args = args
+        self.line = line
+
+    def __repr__(self):
+        return f"Event({self.time}, {self.verb!r}, {self.args!r})"
+
+def parse_value(text):
+    lowered = text.lower()
+    if lowered in ("none", "null"):
+        return None
+    if lowered in ("true", "false"):
+        return lowered == "true"
+    try:
+        return int(text)
+    except ValueError:
+        pass
+    try:
+        return float(text)
+    except ValueError:
+        return text
+
+def parse_duration(text):
+    """'40ms', '1.5s' or plain seconds"""
+    if text.endswith("ms"):
+        return float(text[:-2]) / 1000
+    if text.endswith("s"):
+        return float(text[:-1])
+    return float(text)
+
+def _parse_line(tokens, lineno):
+    if len(tokens) < 3 or tokens[0] != "at":
+        raise ScenarioError(f"line {lineno}: expected 'at <time> <verb> ...'")
+    try:
+        when = parse_duration(tokens[1])
+    except ValueError:
+        raise ScenarioError(f"line {lineno}: bad time {tokens[1]!r}")
+    verb, args = tokens[2], tokens[3:]
+    if verb not in VERBS:
+        raise ScenarioError(f"line {lineno}: unknown verb {verb!r}")
+
+    if verb == "set":
+        if len(args) != 2 or args[0] not in SETTABLE:
+            raise ScenarioError(f"line {lineno}: usage 'set <{'|'.join(sorted(SETTABLE))}> <value>'")
+        args = [args[0], parse_value(args[1])]
+    elif verb == "load":
+        if not 1 <= len(args) <= 2:
+            raise ScenarioError(f"line {lineno}: usage 'load <name> [path]'")
+    elif verb == "slow":
+        if len(args) != 2 or args[0] not in SETTABLE:
+            raise ScenarioError(f"line {lineno}: usage 'slow <property> <duration>'")
+        args = [args[0], parse_duration(args[1])]
+    elif verb == "raise":
+        if not 1 <= len(args) <= 2 or args[0] not in SETTABLE:
+            raise ScenarioError(f"line {lineno}: usage 'raise <property> [ExceptionName]'")
+        exc_name = args[1] if len(args) == 2 else "RuntimeError"
+        if exc_name not in EXCEPTIONS:
+            raise ScenarioError(f"line {lineno}: unsupported exception {exc_name!r}")
+        args = [args[0], EXCEPTIONS[exc_name]]
+    elif verb == "heal":
+        if len(args) != 1:
+            raise ScenarioError(f"line {lineno}: usage 'heal <property>'")
+    elif verb == "tick":
+        args = [int(args[0]) if args else 1]
+    elif verb == "expect":
+        if len(args) != 2:
+            raise ScenarioError(f"line {lineno}: usage 'expect <FIELD> <value>'")
+    elif verb == "wait":
+        if len(args) != 1:
+            raise ScenarioError(f"line {lineno}: usage 'wait <duration>'")
+        args = [parse_duration(args[0])]
+    return Event(when, verb, args, lineno)
+
+def parse_scenario(text):
+    """Events sorted by time; ties keep file order"""
+    events = []
+    for lineno, raw in enumerate(text.splitlines(), 1):
+        tokens = shlex.split(raw, comments=True)
+        if tokens:
+            events.append(_parse_line(tokens, lineno))
+    events.sort(key=lambda event: (event.time, event.line))
+    return events
+
+def load_scenario(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return parse_scenario(f.read())